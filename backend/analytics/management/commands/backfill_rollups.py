@@ -0,0 +1,45 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from analytics.rollups import backfill, default_backfill_start
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild court occupancy/revenue rollups for a date range (default: "
+        "the first booking through today). Run once for history, then daily "
+        "with --days 2 so days without bookings still get their open minutes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--start", help="First date, YYYY-MM-DD.")
+        parser.add_argument("--end", help="Last date, YYYY-MM-DD (default today).")
+        parser.add_argument(
+            "--days",
+            type=int,
+            help="Only the last N days up to --end (instead of --start).",
+        )
+
+    def handle(self, *args, **opts):
+        end = self.parse(opts, "end") or timezone.localdate()
+        if opts["days"]:
+            start = end - timedelta(days=opts["days"] - 1)
+        else:
+            start = self.parse(opts, "start") or default_backfill_start()
+        if start > end:
+            raise CommandError("--start must not be after --end.")
+        written = backfill(start, end)
+        self.stdout.write(
+            self.style.SUCCESS(f"Rolled up {written} court-days from {start} to {end}.")
+        )
+
+    def parse(self, opts, name):
+        if not opts[name]:
+            return None
+        value = parse_date(opts[name])
+        if value is None:
+            raise CommandError(f"--{name} must be YYYY-MM-DD.")
+        return value
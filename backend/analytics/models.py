@@ -0,0 +1,57 @@
+from django.db import models
+
+from courts.models import Court
+
+
+class CourtDailyRollup(models.Model):
+    """
+    Occupancy and revenue for one court-day. Maintained by
+    analytics/rollups.py; never edited directly.
+    """
+
+    court = models.ForeignKey(
+        Court, related_name="daily_rollups", on_delete=models.CASCADE
+    )
+    date = models.DateField()
+    # open minutes from CourtAvailability, and the part of them booked
+    available_minutes = models.PositiveIntegerField(default=0)
+    booked_minutes = models.PositiveIntegerField(default=0)
+    # confirmed/completed bookings and their total_price
+    bookings = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    cancellations = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["court", "date"], name="daily_rollup_court_date_uniq"
+            ),
+        ]
+        indexes = [models.Index(fields=["date"])]
+
+    def __str__(self):
+        return f"{self.court_id} {self.date}"
+
+
+class CourtHourlyRollup(models.Model):
+    """Open and booked minutes for one hour of a court-day (see above)."""
+
+    court = models.ForeignKey(
+        Court, related_name="hourly_rollups", on_delete=models.CASCADE
+    )
+    date = models.DateField()
+    hour = models.PositiveSmallIntegerField()
+    available_minutes = models.PositiveSmallIntegerField(default=0)
+    booked_minutes = models.PositiveSmallIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["court", "date", "hour"],
+                name="hourly_rollup_court_date_hour_uniq",
+            ),
+        ]
+        indexes = [models.Index(fields=["date"])]
+
+    def __str__(self):
+        return f"{self.court_id} {self.date} {self.hour:02d}:00"
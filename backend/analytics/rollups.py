@@ -0,0 +1,191 @@
+# analytics/rollups.py
+"""
+Pre-aggregated occupancy and revenue per court, for owner dashboards.
+
+Every court-day with open time or bookings gets one ``CourtDailyRollup`` row
+(open and booked minutes, confirmed revenue, bookings and cancellations) and
+one ``CourtHourlyRollup`` row per open hour. Dashboards then sum a few
+hundred small rows instead of scanning years of bookings.
+
+Minutes come from the same per-minute bitmaps as the slot engine
+(courts/slots.py): booked minutes are the open minutes covered by confirmed
+or completed bookings, so occupancy never exceeds 100%. Revenue is the
+``total_price`` of those bookings.
+
+Booking writes queue a job that refreshes their court-day (see
+analytics.signals and analytics.tasks), outside the request.
+``backfill_rollups`` (re)builds any date range; run it once for history and
+daily for yesterday and today, so days nobody booked still get their open
+minutes. Availability is not versioned: rollups are computed from the
+current weekly schedule, and schedule edits only refresh today onwards.
+"""
+
+from datetime import timedelta
+from decimal import Decimal
+from itertools import chain
+
+from django.db import transaction
+from django.db.models import Max, Min
+from django.utils import timezone
+
+from bookings.models import ArchivedBooking, Booking
+from courts.models import Court, CourtAvailability
+from courts.slots import busy_span, weekday_name, window_span
+from .models import CourtDailyRollup, CourtHourlyRollup
+
+# statuses whose bookings count as booked time and revenue
+ROLLUP_STATUSES = ("confirmed", "completed")
+HOUR_MASK = (1 << 60) - 1
+COURT_BATCH_SIZE = 200
+DATE_CHUNK_DAYS = 31
+
+
+def date_range(start, end):
+    return [start + timedelta(days=n) for n in range((end - start).days + 1)]
+
+
+def compute_rollups(court_ids, dates):
+    """Unsaved daily and hourly rollup rows for every court-day (three queries)."""
+    open_masks = {}
+    windows = CourtAvailability.objects.filter(
+        court_id__in=court_ids,
+        day_of_week__in={weekday_name(day) for day in dates},
+    ).values_list("court_id", "day_of_week", "start_time", "end_time")
+    for court_id, day_of_week, start, end in windows:
+        key = (court_id, day_of_week)
+        open_masks[key] = open_masks.get(key, 0) | window_span(start, end)
+
+    # (court_id, date) -> [booked mask, bookings, revenue, cancellations]
+    stats = {}
+    # archived bookings (bookings/archive.py) still count for their days
+    bookings = chain.from_iterable(
+        model.objects.filter(
+            court_id__in=court_ids,
+            booking_date__in=dates,
+            status__in=[*ROLLUP_STATUSES, "cancelled"],
+        ).values_list(
+            "court_id",
+            "booking_date",
+            "start_time",
+            "end_time",
+            "status",
+            "total_price",
+        )
+        for model in (Booking, ArchivedBooking)
+    )
+    for court_id, day, start, end, status, price in bookings:
+        day_stats = stats.setdefault((court_id, day), [0, 0, Decimal(0), 0])
+        if status == "cancelled":
+            day_stats[3] += 1
+        else:
+            day_stats[0] |= busy_span(start, end)
+            day_stats[1] += 1
+            day_stats[2] += price
+
+    daily, hourly = [], []
+    for court_id in court_ids:
+        for day in dates:
+            open_mask = open_masks.get((court_id, weekday_name(day)), 0)
+            booked_mask, count, revenue, cancellations = stats.get(
+                (court_id, day), (0, 0, Decimal(0), 0)
+            )
+            if not (open_mask or count or cancellations):
+                continue
+            booked_mask &= open_mask
+            daily.append(
+                CourtDailyRollup(
+                    court_id=court_id,
+                    date=day,
+                    available_minutes=open_mask.bit_count(),
+                    booked_minutes=booked_mask.bit_count(),
+                    bookings=count,
+                    revenue=revenue,
+                    cancellations=cancellations,
+                )
+            )
+            for hour in range(24):
+                available = (open_mask >> (hour * 60)) & HOUR_MASK
+                if available:
+                    booked = (booked_mask >> (hour * 60)) & HOUR_MASK
+                    hourly.append(
+                        CourtHourlyRollup(
+                            court_id=court_id,
+                            date=day,
+                            hour=hour,
+                            available_minutes=available.bit_count(),
+                            booked_minutes=booked.bit_count(),
+                        )
+                    )
+    return daily, hourly
+
+
+def replace_rollups(court_ids, dates):
+    """Recompute the rollups of ``court_ids`` on ``dates``; returns daily rows."""
+    daily, hourly = compute_rollups(court_ids, dates)
+    CourtDailyRollup.objects.filter(court_id__in=court_ids, date__in=dates).delete()
+    CourtHourlyRollup.objects.filter(court_id__in=court_ids, date__in=dates).delete()
+    CourtDailyRollup.objects.bulk_create(daily, batch_size=1000)
+    CourtHourlyRollup.objects.bulk_create(hourly, batch_size=2000)
+    return len(daily)
+
+
+def refresh_court_days(court_id, dates):
+    """Recompute one court's rollups on ``dates``."""
+    dates = sorted(set(dates))
+    if not dates:
+        return
+    with transaction.atomic():
+        # serialize refreshes per court so the last writer sees every commit
+        locked = list(
+            Court.objects.select_for_update()
+            .filter(pk=court_id)
+            .values_list("pk", flat=True)
+        )
+        if locked:
+            replace_rollups([court_id], dates)
+
+
+def refresh_court_weekdays(court_id, weekdays):
+    """
+    Recompute ``court_id``'s rollups on ``weekdays`` from today up to its last
+    rolled-up date, after a schedule change. Past days keep the open minutes
+    they were rolled up with.
+    """
+    today = timezone.localdate()
+    last = CourtDailyRollup.objects.filter(court_id=court_id).aggregate(
+        last=Max("date")
+    )["last"]
+    if last is None or last < today:
+        return
+    refresh_court_days(
+        court_id,
+        [day for day in date_range(today, last) if weekday_name(day) in weekdays],
+    )
+
+
+def default_backfill_start():
+    """The earliest booking date, archived ones included, or today."""
+    firsts = [
+        model.objects.aggregate(first=Min("booking_date"))["first"]
+        for model in (Booking, ArchivedBooking)
+    ]
+    return min(filter(None, firsts), default=timezone.localdate())
+
+
+def backfill(start, end, court_ids=None):
+    """
+    Rebuild every court's rollups (or ``court_ids``') for ``start``..``end``,
+    COURT_BATCH_SIZE courts and DATE_CHUNK_DAYS days per transaction.
+    Returns the number of daily rows written.
+    """
+    if court_ids is None:
+        court_ids = list(Court.objects.order_by("pk").values_list("pk", flat=True))
+    dates = date_range(start, end)
+    written = 0
+    for offset in range(0, len(dates), DATE_CHUNK_DAYS):
+        chunk = dates[offset : offset + DATE_CHUNK_DAYS]
+        for batch_start in range(0, len(court_ids), COURT_BATCH_SIZE):
+            batch = court_ids[batch_start : batch_start + COURT_BATCH_SIZE]
+            with transaction.atomic():
+                written += replace_rollups(batch, chunk)
+    return written
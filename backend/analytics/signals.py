@@ -0,0 +1,41 @@
+# analytics/signals.py
+from django.dispatch import receiver
+
+from bookings.signals import (
+    booking_days_changed,
+    bookings_bulk_created,
+    bookings_bulk_expired,
+    by_court,
+)
+from courts.signals import availability_weekdays_changed
+from .tasks import refresh_rollup_days, refresh_rollup_weekdays
+
+# Rollups are recomputed by a job worker, outside the request that wrote the
+# booking or schedule; dashboards catch up once the job has run.
+
+
+def queue_rollup_refresh(days):
+    for court_id, dates in days.items():
+        refresh_rollup_days.enqueue(
+            court_id=court_id, dates=sorted(day.isoformat() for day in dates)
+        )
+
+
+@receiver(booking_days_changed)
+def refresh_booking_rollups(sender, days, **kwargs):
+    queue_rollup_refresh(days)
+
+
+@receiver(availability_weekdays_changed)
+def refresh_availability_rollups(sender, weekdays, **kwargs):
+    for court_id, names in weekdays.items():
+        refresh_rollup_weekdays.enqueue(court_id=court_id, weekdays=sorted(names))
+
+
+@receiver(bookings_bulk_created)
+@receiver(bookings_bulk_expired)
+def refresh_bulk_booking_rollups(sender, bookings, **kwargs):
+    # already running after commit
+    queue_rollup_refresh(
+        by_court((booking.court_id, booking.booking_date) for booking in bookings)
+    )
@@ -0,0 +1,19 @@
+# analytics/tasks.py
+from datetime import date
+
+from jobs.queue import task
+
+from .rollups import refresh_court_days, refresh_court_weekdays
+
+# Rollup refreshes after booking and schedule writes (see analytics.signals);
+# dates travel as ISO strings.
+
+
+@task
+def refresh_rollup_days(court_id, dates):
+    refresh_court_days(court_id, [date.fromisoformat(day) for day in dates])
+
+
+@task
+def refresh_rollup_weekdays(court_id, weekdays):
+    refresh_court_weekdays(court_id, set(weekdays))
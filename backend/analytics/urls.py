@@ -0,0 +1,7 @@
+from rest_framework.routers import DefaultRouter
+from .views import CourtAnalyticsViewSet
+
+router = DefaultRouter()
+router.register(r"courts", CourtAnalyticsViewSet, basename="court-analytics")
+
+urlpatterns = router.urls
@@ -0,0 +1,143 @@
+from datetime import timedelta
+
+from django.db.models import Sum
+from django.db.models.functions import ExtractIsoWeekDay
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from rest_framework import decorators, permissions, viewsets
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+from courts.slots import WEEKDAY_NAMES
+from users.permissions import IsAdmin, IsOwnerRole
+from .models import CourtDailyRollup, CourtHourlyRollup
+
+DEFAULT_RANGE_DAYS = 30
+MAX_RANGE_DAYS = 2 * 366
+
+
+def occupancy(booked, available):
+    return round(booked / available, 4) if available else None
+
+
+def money(value):
+    # same "123.00" strings DRF renders for DecimalFields
+    return f"{value:.2f}"
+
+
+class CourtAnalyticsViewSet(viewsets.ViewSet):
+    """
+    Owner dashboards over the precomputed rollups (analytics/rollups.py).
+    Every action takes ``start``/``end`` (YYYY-MM-DD, default the last 30
+    days) and an optional ``court`` id; owners only see their own courts.
+    """
+
+    def get_permissions(self):
+        return [permissions.IsAuthenticated(), (IsOwnerRole | IsAdmin)()]
+
+    def filter_rollups(self, queryset):
+        params = self.request.query_params
+        dates = {}
+        for param in ("start", "end"):
+            if params.get(param):
+                dates[param] = parse_date(params[param])
+                if dates[param] is None:
+                    raise ValidationError({param: "Expected YYYY-MM-DD."})
+        end = dates.get("end") or timezone.localdate()
+        start = dates.get("start") or end - timedelta(days=DEFAULT_RANGE_DAYS - 1)
+        if start > end:
+            raise ValidationError({"start": "Must not be after end."})
+        if (end - start).days >= MAX_RANGE_DAYS:
+            raise ValidationError(
+                {"start": f"Ranges are limited to {MAX_RANGE_DAYS} days."}
+            )
+
+        queryset = queryset.filter(date__range=(start, end))
+        user = self.request.user
+        if not (user.is_staff or getattr(user, "role", "") == "admin"):
+            queryset = queryset.filter(court__owner_id=user.pk)
+        if params.get("court"):
+            if not params["court"].isdigit():
+                raise ValidationError({"court": "Expected a court id."})
+            queryset = queryset.filter(court_id=params["court"])
+        return queryset, {"start": start, "end": end}
+
+    @decorators.action(detail=False, methods=["get"], url_path="summary")
+    def summary(self, request):
+        """Totals per court over the range."""
+        queryset, period = self.filter_rollups(CourtDailyRollup.objects.all())
+        rows = (
+            queryset.values("court_id", "court__name")
+            .annotate(
+                available_minutes=Sum("available_minutes"),
+                booked_minutes=Sum("booked_minutes"),
+                bookings=Sum("bookings"),
+                revenue=Sum("revenue"),
+                cancellations=Sum("cancellations"),
+            )
+            .order_by("court__name", "court_id")
+        )
+        courts = [
+            {
+                "court": row["court_id"],
+                "court_name": row["court__name"],
+                "available_minutes": row["available_minutes"],
+                "booked_minutes": row["booked_minutes"],
+                "occupancy": occupancy(row["booked_minutes"], row["available_minutes"]),
+                "bookings": row["bookings"],
+                "revenue": money(row["revenue"]),
+                "cancellations": row["cancellations"],
+            }
+            for row in rows
+        ]
+        return Response({**period, "courts": courts})
+
+    @decorators.action(detail=False, methods=["get"], url_path="daily")
+    def daily(self, request):
+        """One point per date, summed over the selected courts."""
+        queryset, period = self.filter_rollups(CourtDailyRollup.objects.all())
+        rows = (
+            queryset.values("date")
+            .annotate(
+                available_minutes=Sum("available_minutes"),
+                booked_minutes=Sum("booked_minutes"),
+                bookings=Sum("bookings"),
+                revenue=Sum("revenue"),
+                cancellations=Sum("cancellations"),
+            )
+            .order_by("date")
+        )
+        days = [
+            {
+                **row,
+                "revenue": money(row["revenue"]),
+                "occupancy": occupancy(row["booked_minutes"], row["available_minutes"]),
+            }
+            for row in rows
+        ]
+        return Response({**period, "days": days})
+
+    @decorators.action(detail=False, methods=["get"], url_path="hourly")
+    def hourly(self, request):
+        """Weekday x hour occupancy heatmap over the range."""
+        queryset, period = self.filter_rollups(CourtHourlyRollup.objects.all())
+        rows = (
+            queryset.annotate(weekday=ExtractIsoWeekDay("date"))
+            .values("weekday", "hour")
+            .annotate(
+                available_minutes=Sum("available_minutes"),
+                booked_minutes=Sum("booked_minutes"),
+            )
+            .order_by("weekday", "hour")
+        )
+        cells = [
+            {
+                "weekday": WEEKDAY_NAMES[row["weekday"] - 1],
+                "hour": row["hour"],
+                "available_minutes": row["available_minutes"],
+                "booked_minutes": row["booked_minutes"],
+                "occupancy": occupancy(row["booked_minutes"], row["available_minutes"]),
+            }
+            for row in rows
+        ]
+        return Response({**period, "hours": cells})
@@ -1,6 +1,13 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class BookingsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "bookings"
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from .conflicts import install_overlap_constraint
+
+        post_migrate.connect(install_overlap_constraint, sender=self)
@@ -0,0 +1,94 @@
+# bookings/archive.py
+"""
+Archival of finished bookings.
+
+Hot queries (slot grids, availability search, conflict checks) only look at
+today and the future, but ``bookings_booking`` and its indexes would keep
+every booking ever made. ``archive_bookings`` moves bookings that are over
+(confirmed, completed, cancelled or expired, dated more than
+``BOOKING_ARCHIVE_AFTER_DAYS`` ago) into ``ArchivedBooking``, in batches of
+one INSERT plus one DELETE per transaction. Nothing marks a past confirmed
+booking completed, so those are archived as they are. Pending bookings stay
+until they are confirmed, cancelled or expire.
+
+Archived bookings remain visible to owners and admins through the
+``archived`` action of ``BookingViewSet``, and the analytics rollups read
+both tables, so archiving changes no dashboard number. On PostgreSQL the
+emptied monthly partitions are then dropped by ``partition_bookings`` (see
+bookings.partitions).
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connections, router, transaction
+from django.utils import timezone
+
+from .models import ArchivedBooking, Booking
+
+ARCHIVE_STATUSES = ("confirmed", "completed", "cancelled", "expired")
+DEFAULT_ARCHIVE_AFTER_DAYS = 90
+ARCHIVE_BATCH_SIZE = 1000
+
+# every column the archive keeps, by attname
+COPIED_FIELDS = [
+    field.attname
+    for field in ArchivedBooking._meta.concrete_fields
+    if field.name != "archived_at"
+]
+
+
+def archive_cutoff():
+    """Bookings dated before this are archived."""
+    days = getattr(settings, "BOOKING_ARCHIVE_AFTER_DAYS", DEFAULT_ARCHIVE_AFTER_DAYS)
+    # today's bookings may still be in progress
+    return timezone.localdate() - timedelta(days=max(days, 1))
+
+
+def archivable(before):
+    return Booking.objects.filter(booking_date__lt=before, status__in=ARCHIVE_STATUSES)
+
+
+def archive_batch(before, batch_size=ARCHIVE_BATCH_SIZE):
+    """Move up to ``batch_size`` archivable bookings; returns how many moved."""
+    using = router.db_for_write(Booking)
+    with transaction.atomic(using=using):
+        rows = list(
+            archivable(before)
+            .using(using)
+            .select_for_update(skip_locked=True)
+            .order_by("booking_date", "id")
+            .values(*COPIED_FIELDS)[:batch_size]
+        )
+        if not rows:
+            return 0
+        now = timezone.now()
+        ArchivedBooking.objects.using(using).bulk_create(
+            [ArchivedBooking(**row, archived_at=now) for row in rows]
+        )
+        # Raw SQL rather than QuerySet.delete(), which would load the rows
+        # again and send post_delete for each: its handlers queue index and
+        # rollup refreshes, but archived bookings are past and no longer
+        # occupy a slot, so listing caches and the availability index are
+        # unaffected, and rollups read the archive as well. Nothing
+        # references bookings, so there is no cascade to run either. The
+        # booking_date bound lets PostgreSQL prune partitions.
+        ids = [row["id"] for row in rows]
+        with connections[using].cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {Booking._meta.db_table} WHERE booking_date < %s "
+                f"AND id IN ({', '.join(['%s'] * len(ids))})",
+                [before, *ids],
+            )
+    return len(rows)
+
+
+def archive(before=None, batch_size=ARCHIVE_BATCH_SIZE):
+    """Archive every finished booking dated before ``before``; returns the count."""
+    before = before or archive_cutoff()
+    total = 0
+    while True:
+        moved = archive_batch(before, batch_size)
+        total += moved
+        if moved < batch_size:
+            return total
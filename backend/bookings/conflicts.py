@@ -0,0 +1,283 @@
+# bookings/conflicts.py
+"""
+Race-free booking creation.
+
+On PostgreSQL an exclusion constraint (installed after ``migrate``) forbids two
+active bookings of the same court from overlapping, so creating a booking is a
+single INSERT and the database rejects the loser of any race. Backends without
+exclusion constraints lock the court row for the court-day check instead.
+"""
+
+from django.db import IntegrityError, connections, router, transaction
+from django.db.models import Q
+from rest_framework import serializers
+
+from courts.models import Court, CourtAvailability
+from courts.slots import busy_span, window_span, weekday_name
+from .holds import expire, new_hold, occupying, stale_holds
+from .models import Booking
+from .signals import bookings_bulk_created
+
+ACTIVE_STATUSES = ["pending", "confirmed"]
+OVERLAP_CONSTRAINT = "bookings_booking_no_overlap"
+CONFLICT_MESSAGE = "This slot is already booked."
+
+# SQLSTATE exclusion_violation
+EXCLUSION_VIOLATION = "23P01"
+
+OVERLAP_EXCLUSION = """
+EXCLUDE USING gist (
+    court_id WITH =,
+    tsrange(booking_date + start_time, booking_date + end_time, '[)') WITH &&
+)
+WHERE (status IN ('pending', 'confirmed'))
+"""
+
+# A partitioned table (bookings.partitions) carries the constraint on each
+# partition instead: bookings never span days, so overlaps stay within one.
+INSTALL_SQL = f"""
+CREATE EXTENSION IF NOT EXISTS btree_gist;
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_constraint WHERE conname = '{OVERLAP_CONSTRAINT}'
+    ) AND NOT EXISTS (
+        SELECT 1 FROM pg_partitioned_table
+        WHERE partrelid = 'bookings_booking'::regclass
+    ) THEN
+        ALTER TABLE bookings_booking ADD CONSTRAINT {OVERLAP_CONSTRAINT}
+        {OVERLAP_EXCLUSION};
+    END IF;
+END $$;
+"""
+
+
+def overlaps(start_time, end_time):
+    """Q for bookings whose time range overlaps ``[start_time, end_time)``."""
+    return ~(Q(end_time__lte=start_time) | Q(start_time__gte=end_time))
+
+
+def overlapping(court_id, booking_date, start_time, end_time):
+    """Active bookings on the court-day that overlap ``[start_time, end_time)``."""
+    return Booking.objects.filter(
+        occupying(),
+        overlaps(start_time, end_time),
+        court_id=court_id,
+        booking_date=booking_date,
+    )
+
+
+def expire_overlapping(court_id, dates, start_time, end_time, using, exclude=None):
+    """
+    Expire stale holds in the way of a new booking (or of booking ``exclude``
+    moving). Reads already ignore them, but the exclusion constraint still
+    sees a pending row.
+    """
+    queryset = (
+        stale_holds()
+        .using(using)
+        .filter(
+            overlaps(start_time, end_time),
+            court_id=court_id,
+            booking_date__in=dates,
+        )
+    )
+    if exclude is not None:
+        queryset = queryset.exclude(pk=exclude)
+    return expire(queryset)
+
+
+def lock_court(court_id, using):
+    """
+    Serialize booking writers per court; SQLite already serializes write
+    transactions (use "transaction_mode": "IMMEDIATE" to lock at BEGIN).
+    """
+    list(
+        Court.objects.using(using)
+        .select_for_update()
+        .filter(pk=court_id)
+        .values_list("pk", flat=True)
+    )
+
+
+def uses_exclusion_constraint(using):
+    return connections[using].vendor == "postgresql"
+
+
+def install_overlap_constraint(sender, using="default", **kwargs):
+    """post_migrate handler: add the exclusion constraint on PostgreSQL."""
+    if not uses_exclusion_constraint(using):
+        return
+    if not router.allow_migrate_model(using, Booking):
+        return
+    with connections[using].cursor() as cursor:
+        cursor.execute(INSTALL_SQL)
+
+
+def is_overlap_violation(exc):
+    cause = exc.__cause__
+    code = getattr(cause, "sqlstate", None) or getattr(cause, "pgcode", None)
+    return code == EXCLUSION_VIOLATION
+
+
+def create_booking(**fields):
+    """
+    Insert a pending booking with a checkout hold (bookings/holds.py) unless
+    it overlaps an active one on the same court-day.
+    Raises ``serializers.ValidationError`` on conflict.
+    """
+    using = router.db_for_write(Booking)
+    fields = {**new_hold(), **fields}
+    court = fields["court"]
+    if uses_exclusion_constraint(using):
+        try:
+            with transaction.atomic(using=using):
+                expire_overlapping(
+                    court.pk,
+                    [fields["booking_date"]],
+                    fields["start_time"],
+                    fields["end_time"],
+                    using,
+                )
+                return Booking.objects.using(using).create(**fields)
+        except IntegrityError as exc:
+            if is_overlap_violation(exc):
+                raise serializers.ValidationError(CONFLICT_MESSAGE)
+            raise
+
+    with transaction.atomic(using=using):
+        lock_court(court.pk, using)
+        if (
+            overlapping(
+                court.pk,
+                fields["booking_date"],
+                fields["start_time"],
+                fields["end_time"],
+            )
+            .using(using)
+            .exists()
+        ):
+            raise serializers.ValidationError(CONFLICT_MESSAGE)
+        return Booking.objects.using(using).create(**fields)
+
+
+def update_booking(booking, **fields):
+    """
+    Save ``fields`` onto ``booking`` unless its new time range overlaps
+    another active booking on the same court-day, checked the same way as
+    ``create_booking``. Raises ``serializers.ValidationError`` on conflict.
+    """
+    using = router.db_for_write(Booking)
+    for name, value in fields.items():
+        setattr(booking, name, value)
+    court_id = booking.court_id
+    try:
+        with transaction.atomic(using=using):
+            if uses_exclusion_constraint(using):
+                expire_overlapping(
+                    court_id,
+                    [booking.booking_date],
+                    booking.start_time,
+                    booking.end_time,
+                    using,
+                    exclude=booking.pk,
+                )
+            else:
+                lock_court(court_id, using)
+                if (
+                    overlapping(
+                        court_id,
+                        booking.booking_date,
+                        booking.start_time,
+                        booking.end_time,
+                    )
+                    .using(using)
+                    .exclude(pk=booking.pk)
+                    .exists()
+                ):
+                    raise serializers.ValidationError(CONFLICT_MESSAGE)
+            booking.save(using=using)
+    except IntegrityError as exc:
+        if is_overlap_violation(exc):
+            raise serializers.ValidationError(CONFLICT_MESSAGE)
+        raise
+    return booking
+
+
+def create_bookings(user, court, dates, start_time, end_time, prices):
+    """
+    All-or-nothing insert of one booking per date for the same time range,
+    each at its ``prices[date]``.
+
+    Availability and conflicts are checked for every date with one query
+    each while the court row is locked, then all rows go in with a single
+    bulk_create. Raises ``serializers.ValidationError`` listing the dates
+    that fall outside the court's availability or clash with bookings.
+    """
+    using = router.db_for_write(Booking)
+    need = busy_span(start_time, end_time)
+    try:
+        with transaction.atomic(using=using):
+            lock_court(court.pk, using)
+
+            weekly = {}
+            for day_of_week, start, end in (
+                CourtAvailability.objects.using(using)
+                .filter(
+                    court=court,
+                    day_of_week__in={weekday_name(day) for day in dates},
+                )
+                .values_list("day_of_week", "start_time", "end_time")
+            ):
+                weekly[day_of_week] = weekly.get(day_of_week, 0) | window_span(
+                    start, end
+                )
+            unavailable = [
+                day for day in dates if weekly.get(weekday_name(day), 0) & need != need
+            ]
+
+            clashes = set(
+                Booking.objects.using(using)
+                .filter(
+                    overlaps(start_time, end_time),
+                    occupying(),
+                    court=court,
+                    booking_date__in=dates,
+                )
+                .values_list("booking_date", flat=True)
+            )
+
+            if unavailable or clashes:
+                errors = {}
+                if unavailable:
+                    errors["unavailable"] = [day.isoformat() for day in unavailable]
+                if clashes:
+                    errors["conflicts"] = [day.isoformat() for day in sorted(clashes)]
+                raise serializers.ValidationError(errors)
+
+            expire_overlapping(court.pk, dates, start_time, end_time, using)
+            # one hold covers the whole series
+            hold = new_hold()
+            bookings = Booking.objects.using(using).bulk_create(
+                [
+                    Booking(
+                        user=user,
+                        court=court,
+                        booking_date=day,
+                        start_time=start_time,
+                        end_time=end_time,
+                        total_price=prices[day],
+                        **hold,
+                    )
+                    for day in dates
+                ]
+            )
+            transaction.on_commit(
+                lambda: bookings_bulk_created.send(sender=Booking, bookings=bookings),
+                using=using,
+            )
+    except IntegrityError as exc:
+        if is_overlap_violation(exc):
+            raise serializers.ValidationError(CONFLICT_MESSAGE)
+        raise
+    return bookings
@@ -0,0 +1,145 @@
+# bookings/exports.py
+"""
+Streaming booking exports.
+
+Rows are read with ``values_list(...).iterator(chunk_size=...)`` (a server-side
+cursor on PostgreSQL) and written straight into the response in batches, so
+memory stays flat no matter how many bookings are exported and no model
+instances or serializers are involved.
+
+Under ASGI, Django can only stream an async iterator: a sync one is read to
+the end (in a thread) before the first byte goes out. ``stream_export``
+therefore picks the async variant for ASGI requests and the plain generator
+for WSGI ones.
+"""
+
+import csv
+import json
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+
+EXPORT_CHUNK_SIZE = 2000
+# rows per yielded response chunk
+ROWS_PER_WRITE = 500
+
+EXPORT_COLUMNS = [
+    ("id", "id"),
+    ("court", "court_id"),
+    ("court_name", "court__name"),
+    ("user", "user_id"),
+    ("user_email", "user__email"),
+    ("booking_date", "booking_date"),
+    ("start_time", "start_time"),
+    ("end_time", "end_time"),
+    ("status", "status"),
+    ("total_price", "total_price"),
+    ("created_at", "created_at"),
+]
+
+CONTENT_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+
+class Echo:
+    """File-like object whose write() returns the value, for csv.writer."""
+
+    def write(self, value):
+        return value
+
+
+def export_rows(queryset):
+    """Plain tuples in EXPORT_COLUMNS order, streamed from the database."""
+    return queryset.values_list(*(path for _, path in EXPORT_COLUMNS)).iterator(
+        chunk_size=EXPORT_CHUNK_SIZE
+    )
+
+
+async def aexport_rows(queryset):
+    """
+    export_rows() for async iteration. Not ``aiterator()``: for values_list()
+    querysets it runs the query on the event loop's thread, which Django
+    refuses. Each chunk is fetched in a thread instead.
+    """
+    rows = await sync_to_async(export_rows)(queryset)
+    while True:
+        chunk = await sync_to_async(list)(islice(rows, EXPORT_CHUNK_SIZE))
+        for row in chunk:
+            yield row
+        if len(chunk) < EXPORT_CHUNK_SIZE:
+            return
+
+
+def to_text(value):
+    if value is None:
+        return ""
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
+
+
+def csv_format():
+    """``(header, encode_row)`` for CSV."""
+    writer = csv.writer(Echo())
+    header = writer.writerow([name for name, _ in EXPORT_COLUMNS])
+    return header, lambda row: writer.writerow([to_text(value) for value in row])
+
+
+def ndjson_format():
+    """``(header, encode_row)`` for NDJSON, which has no header."""
+    names = [name for name, _ in EXPORT_COLUMNS]
+
+    def encode(row):
+        record = {
+            name: (
+                value
+                if isinstance(value, (int, str)) or value is None
+                else to_text(value)
+            )
+            for name, value in zip(names, row)
+        }
+        return json.dumps(record) + "\n"
+
+    return "", encode
+
+
+def stream(queryset, output):
+    header, encode = FORMATS[output]()
+    if header:
+        yield header
+    batch = []
+    for row in export_rows(queryset):
+        batch.append(encode(row))
+        if len(batch) >= ROWS_PER_WRITE:
+            yield "".join(batch)
+            batch = []
+    if batch:
+        yield "".join(batch)
+
+
+async def astream(queryset, output):
+    """stream() as an async generator."""
+    header, encode = FORMATS[output]()
+    if header:
+        yield header
+    batch = []
+    async for row in aexport_rows(queryset):
+        batch.append(encode(row))
+        if len(batch) >= ROWS_PER_WRITE:
+            yield "".join(batch)
+            batch = []
+    if batch:
+        yield "".join(batch)
+
+
+def stream_export(request, queryset, output):
+    """The export's chunks, as the server running ``request`` can stream them."""
+    if isinstance(getattr(request, "_request", request), ASGIRequest):
+        return astream(queryset, output)
+    return stream(queryset, output)
+
+
+FORMATS = {"csv": csv_format, "ndjson": ndjson_format}
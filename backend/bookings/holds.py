@@ -0,0 +1,140 @@
+# bookings/holds.py
+"""
+Checkout holds.
+
+New bookings start as ``pending`` with a hold: a random ``hold_token`` and a
+``hold_expires_at`` deadline (``BOOKING_HOLD_SECONDS`` from creation). The
+checkout flow confirms the hold with its token before the deadline;
+otherwise the slot frees itself:
+
+* Reads treat a pending booking past its deadline as free straight away
+  (``occupying()``), so abandoned checkouts stop blocking searches and slot
+  grids immediately.
+* Rows are marked ``expired`` in bulk by the ``expire_holds`` command (run it
+  every minute), which also refreshes the derived availability data, and
+  inline right before an insert they would clash with (the PostgreSQL
+  exclusion constraint only sees the status column; see bookings.conflicts).
+
+Pending bookings without a hold (created before holds existed) keep their
+slot until someone confirms or cancels them.
+"""
+
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Booking
+from .signals import bookings_bulk_expired
+
+DEFAULT_HOLD_SECONDS = 10 * 60
+SWEEP_BATCH_SIZE = 500
+
+
+def hold_ttl():
+    return timedelta(
+        seconds=getattr(settings, "BOOKING_HOLD_SECONDS", DEFAULT_HOLD_SECONDS)
+    )
+
+
+def new_hold(now=None):
+    """Fields for a fresh hold on a new pending booking."""
+    now = now or timezone.now()
+    return {"hold_token": uuid.uuid4(), "hold_expires_at": now + hold_ttl()}
+
+
+def occupying(now=None):
+    """Q for bookings that currently take up their slot."""
+    now = now or timezone.now()
+    return Q(status="confirmed") | (
+        Q(status="pending")
+        & (Q(hold_expires_at__isnull=True) | Q(hold_expires_at__gt=now))
+    )
+
+
+def stale_holds(now=None):
+    return Booking.objects.filter(
+        status="pending", hold_expires_at__lte=now or timezone.now()
+    )
+
+
+def expire(queryset, limit=None, now=None):
+    """
+    Mark the stale holds in ``queryset`` (at most ``limit``) expired with one
+    UPDATE. After commit, ``bookings_bulk_expired`` refreshes caches, the
+    availability index and slot subscribers for the affected court-days.
+    Returns the number of bookings expired.
+    """
+    now = now or timezone.now()
+    with transaction.atomic():
+        # rows another sweeper or checkout holds are left for the next pass
+        rows = (
+            queryset.filter(status="pending", hold_expires_at__lte=now)
+            .select_for_update(skip_locked=True)
+            .values_list("pk", "court_id", "booking_date")
+        )
+        rows = list(rows[:limit] if limit else rows)
+        if not rows:
+            return 0
+        # update() skips auto_now
+        Booking.objects.filter(pk__in=[pk for pk, _, _ in rows]).update(
+            status="expired", updated_at=now
+        )
+        expired = [
+            Booking(pk=pk, court_id=court_id, booking_date=day)
+            for pk, court_id, day in rows
+        ]
+        transaction.on_commit(
+            lambda: bookings_bulk_expired.send(sender=Booking, bookings=expired)
+        )
+    return len(rows)
+
+
+def sweep(batch_size=SWEEP_BATCH_SIZE):
+    """Expire every stale hold, ``batch_size`` rows per transaction."""
+    total = 0
+    while True:
+        expired = expire(stale_holds().order_by("hold_expires_at"), batch_size)
+        total += expired
+        if expired < batch_size:
+            return total
+
+
+def confirm(user, token):
+    """
+    Confirm ``user``'s pending bookings held under ``token`` (one booking, or
+    a whole recurring series). Returns them, or an empty list if the hold is
+    unknown or already expired.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        bookings = list(
+            Booking.objects.select_for_update().filter(
+                user_id=user.pk,
+                hold_token=token,
+                status="pending",
+                hold_expires_at__gt=now,
+            )
+        )
+        for booking in bookings:
+            booking.status = "confirmed"
+            booking.hold_expires_at = None
+            booking.save(update_fields=["status", "hold_expires_at", "updated_at"])
+    return bookings
+
+
+def release(user, token):
+    """Cancel ``user``'s pending bookings held under ``token``; returns the count."""
+    with transaction.atomic():
+        bookings = list(
+            Booking.objects.select_for_update().filter(
+                user_id=user.pk, hold_token=token, status="pending"
+            )
+        )
+        for booking in bookings:
+            booking.status = "cancelled"
+            booking.save(update_fields=["status", "updated_at"])
+    return len(bookings)
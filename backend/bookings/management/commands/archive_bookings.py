@@ -0,0 +1,32 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from bookings.archive import ARCHIVE_BATCH_SIZE, archive, archive_cutoff
+
+
+class Command(BaseCommand):
+    help = (
+        "Move finished bookings (confirmed, completed, cancelled or expired) "
+        "dated more than BOOKING_ARCHIVE_AFTER_DAYS ago into the archive "
+        "table. Run daily, before partition_bookings."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            help="Archive bookings older than this many days instead.",
+        )
+        parser.add_argument("--batch-size", type=int, default=ARCHIVE_BATCH_SIZE)
+
+    def handle(self, *args, **opts):
+        if opts["days"] is None:
+            before = archive_cutoff()
+        elif opts["days"] < 1:
+            raise CommandError("--days must be at least 1.")
+        else:
+            before = timezone.localdate() - timedelta(days=opts["days"])
+        moved = archive(before, opts["batch_size"])
+        self.stdout.write(f"Archived {moved} bookings dated before {before}.")
@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from bookings.holds import SWEEP_BATCH_SIZE, sweep
+
+
+class Command(BaseCommand):
+    help = (
+        "Mark pending bookings whose checkout hold ran out as expired and "
+        "refresh the derived availability data. Run every minute, or keep it "
+        "running with --every."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=SWEEP_BATCH_SIZE)
+        parser.add_argument(
+            "--every",
+            type=int,
+            default=0,
+            help="Keep sweeping every N seconds instead of exiting.",
+        )
+
+    def handle(self, *args, **opts):
+        while True:
+            expired = sweep(opts["batch_size"])
+            self.stdout.write(f"Expired {expired} stale holds.")
+            if not opts["every"]:
+                return
+            time.sleep(opts["every"])
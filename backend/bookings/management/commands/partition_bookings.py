@@ -0,0 +1,59 @@
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+
+from bookings.archive import archive_cutoff
+from bookings.partitions import maintain, supports_partitions
+
+
+class Command(BaseCommand):
+    help = (
+        "PostgreSQL only: create the monthly partitions of the bookings table "
+        "for the coming BOOKING_PARTITION_MONTHS_AHEAD months and drop the "
+        "emptied ones older than the archive cutoff. Run daily, after "
+        "archive_bookings. --convert partitions the table in the first place."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+        parser.add_argument(
+            "--months-ahead",
+            type=int,
+            help="Months of partitions to keep ahead of today.",
+        )
+        parser.add_argument(
+            "--convert",
+            action="store_true",
+            help=(
+                "Partition the table if it is still plain. This copies every "
+                "row under an exclusive lock: run it in a maintenance window."
+            ),
+        )
+        parser.add_argument(
+            "--keep-empty",
+            action="store_true",
+            help="Do not drop old empty partitions.",
+        )
+
+    def handle(self, *args, **opts):
+        using = opts["database"]
+        if not supports_partitions(using):
+            self.stdout.write("Partitioning needs PostgreSQL; nothing to do.")
+            return
+        changes = maintain(
+            using,
+            ahead=opts["months_ahead"],
+            drop_before=None if opts["keep_empty"] else archive_cutoff(),
+            convert_table=opts["convert"],
+        )
+        if not changes["partitioned"]:
+            self.stdout.write(
+                "The bookings table is not partitioned; run with --convert "
+                "(in a maintenance window) to partition it."
+            )
+            return
+        if changes["converted"]:
+            self.stdout.write("Converted the bookings table to monthly partitions.")
+        self.stdout.write(
+            f"Created {len(changes['created'])} and dropped "
+            f"{len(changes['dropped'])} partitions."
+        )
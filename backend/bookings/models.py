@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models import Q
 from django.conf import settings
 from common.models import BaseModel
 from courts.models import Court
@@ -12,6 +13,7 @@ class Booking(BaseModel):
         ("confirmed", "Confirmed"),
         ("cancelled", "Cancelled"),
         ("completed", "Completed"),
+        ("expired", "Expired"),
     ]
 
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="bookings")
@@ -21,12 +23,61 @@ class Booking(BaseModel):
     end_time = models.TimeField()
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="pending")
     total_price = models.DecimalField(max_digits=8, decimal_places=2, default=0.0)
+    # checkout hold on a pending booking (see bookings/holds.py)
+    hold_token = models.UUIDField(null=True, blank=True, db_index=True, editable=False)
+    hold_expires_at = models.DateTimeField(null=True, blank=True, editable=False)
 
     class Meta:
         indexes = [
             models.Index(fields=["court", "booking_date"]),
             models.Index(fields=["status"]),
+            # keyset pagination order (common/pagination.py)
+            models.Index(fields=["booking_date", "start_time", "id"]),
+            models.Index(fields=["user", "booking_date", "start_time", "id"]),
+            # hold sweeper: only pending rows carry a live deadline
+            models.Index(
+                fields=["hold_expires_at"],
+                condition=Q(status="pending"),
+                name="booking_pending_hold_idx",
+            ),
         ]
 
     def __str__(self):
         return f"{self.user} - {self.court.name} ({self.booking_date} {self.start_time}-{self.end_time})"
+
+
+class ArchivedBooking(models.Model):
+    """
+    Cold storage for finished bookings that ``archive_bookings`` moved out of
+    ``Booking`` (see bookings/archive.py). Rows keep their booking's id and
+    columns and are never written again.
+    """
+
+    id = models.BigIntegerField(primary_key=True)
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="archived_bookings"
+    )
+    court = models.ForeignKey(
+        Court, on_delete=models.CASCADE, related_name="archived_bookings"
+    )
+    booking_date = models.DateField()
+    start_time = models.TimeField()
+    end_time = models.TimeField()
+    status = models.CharField(max_length=20, choices=Booking.STATUS_CHOICES)
+    total_price = models.DecimalField(max_digits=8, decimal_places=2)
+    hold_token = models.UUIDField(null=True, blank=True)
+    hold_expires_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            # owner listings and rollup backfills
+            models.Index(fields=["court", "booking_date"]),
+            # keyset pagination order (common/pagination.py)
+            models.Index(fields=["booking_date", "start_time", "id"]),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} - {self.court_id} ({self.booking_date}, archived)"
@@ -0,0 +1,242 @@
+# bookings/partitions.py
+"""
+Range partitioning of ``bookings_booking`` by ``booking_date`` (PostgreSQL).
+
+Hot queries (slot grids, availability search, conflict checks) filter on
+today and future dates, so with one partition per month they are pruned to
+the current and coming months, and the indexes they scan stay the same size
+however much history accumulates. ``archive_bookings`` (bookings/archive.py)
+empties old months, and ``partition_bookings`` then drops them.
+
+``partition_bookings --convert`` converts the plain table once. It copies
+every row under an exclusive lock, so run it in a maintenance window;
+nothing converts the table implicitly. After that, ``partition_bookings``
+keeps ``BOOKING_PARTITION_MONTHS_AHEAD`` months of partitions ahead of
+today: run it daily after ``archive_bookings``. Dates outside the created
+months land in a DEFAULT partition, whose rows move to their month's
+partition when it is created.
+
+The model is unchanged: PostgreSQL requires the partition key in the
+primary key, so the table's key becomes ``(id, booking_date)``, and ids stay
+unique because they all come from one identity sequence. The overlap
+exclusion constraint (bookings.conflicts) is added to every partition.
+Other backends (SQLite) keep the plain table.
+"""
+
+import re
+from datetime import date
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.utils import timezone
+
+from .conflicts import OVERLAP_EXCLUSION
+from .models import Booking
+
+TABLE = Booking._meta.db_table
+DEFAULT_PARTITION = f"{TABLE}_default"
+DEFAULT_MONTHS_AHEAD = 12
+PARTITION_NAME = re.compile(rf"^{TABLE}_y(\d{{4}})m(\d{{2}})$")
+
+
+def month_start(day):
+    return day.replace(day=1)
+
+
+def add_months(day, count):
+    """First day of the month ``count`` months after ``day``'s."""
+    index = day.year * 12 + day.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def next_month(day):
+    return add_months(day, 1)
+
+
+def month_range(first, last):
+    """First days of the months from ``first`` to ``last``, inclusive."""
+    month, months = month_start(first), []
+    while month <= last:
+        months.append(month)
+        month = next_month(month)
+    return months
+
+
+def horizon(ahead=None):
+    """First day of the last month kept partitioned ahead of today."""
+    ahead = months_ahead() if ahead is None else ahead
+    return add_months(timezone.localdate(), ahead)
+
+
+def partition_name(month):
+    return f"{TABLE}_y{month.year}m{month.month:02d}"
+
+
+def months_ahead():
+    return getattr(settings, "BOOKING_PARTITION_MONTHS_AHEAD", DEFAULT_MONTHS_AHEAD)
+
+
+def supports_partitions(using):
+    return connections[using].vendor == "postgresql"
+
+
+def is_partitioned(cursor):
+    cursor.execute(
+        "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table "
+        "WHERE partrelid = to_regclass(%s))",
+        [TABLE],
+    )
+    return cursor.fetchone()[0]
+
+
+def table_exists(cursor, name):
+    cursor.execute("SELECT to_regclass(%s) IS NOT NULL", [name])
+    return cursor.fetchone()[0]
+
+
+def add_overlap_constraint(cursor, table):
+    cursor.execute(
+        f"ALTER TABLE {table} ADD CONSTRAINT {table}_no_overlap {OVERLAP_EXCLUSION}"
+    )
+
+
+def create_partition(cursor, month):
+    """
+    Attach ``month``'s partition, moving in any of its rows that were stored
+    in the DEFAULT partition meanwhile.
+    """
+    name = partition_name(month)
+    cursor.execute(
+        f"CREATE TABLE {name} (LIKE {TABLE} "
+        "INCLUDING DEFAULTS INCLUDING CONSTRAINTS INCLUDING STORAGE)"
+    )
+    add_overlap_constraint(cursor, name)
+    cursor.execute(
+        f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} "
+        "WHERE booking_date >= %s AND booking_date < %s RETURNING *) "
+        f"INSERT INTO {name} SELECT * FROM moved",
+        [month, next_month(month)],
+    )
+    # indexes, the primary key and foreign keys are cloned from the parent
+    cursor.execute(
+        f"ALTER TABLE {TABLE} ATTACH PARTITION {name} "
+        f"FOR VALUES FROM ('{month.isoformat()}') "
+        f"TO ('{next_month(month).isoformat()}')"
+    )
+
+
+def convert(cursor):
+    """Replace the plain table by a partitioned one holding the same rows."""
+    old = f"{TABLE}_unpartitioned"
+    # run the deferred foreign key checks of rows this transaction already
+    # wrote; the old table cannot be dropped while they are pending
+    cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+    cursor.execute(f"LOCK TABLE {TABLE} IN ACCESS EXCLUSIVE MODE")
+    # secondary indexes and foreign keys, recreated on the new table; the
+    # primary key and exclusion constraint are rebuilt per partition
+    cursor.execute(
+        "SELECT pg_get_indexdef(i.indexrelid) FROM pg_index i "
+        "WHERE i.indrelid = %s::regclass AND NOT i.indisunique "
+        "AND NOT EXISTS (SELECT 1 FROM pg_constraint c "
+        "WHERE c.conindid = i.indexrelid)",
+        [TABLE],
+    )
+    indexes = [row[0] for row in cursor.fetchall()]
+    cursor.execute(
+        "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+        "WHERE conrelid = %s::regclass AND contype = 'f'",
+        [TABLE],
+    )
+    foreign_keys = cursor.fetchall()
+    cursor.execute(f"SELECT min(booking_date), max(booking_date) FROM {TABLE}")
+    first, last = cursor.fetchone()
+
+    cursor.execute(f"ALTER TABLE {TABLE} RENAME TO {old}")
+    cursor.execute(
+        f"CREATE TABLE {TABLE} (LIKE {old} INCLUDING DEFAULTS INCLUDING IDENTITY "
+        "INCLUDING CONSTRAINTS INCLUDING STORAGE) PARTITION BY RANGE (booking_date)"
+    )
+    cursor.execute(f"CREATE TABLE {DEFAULT_PARTITION} PARTITION OF {TABLE} DEFAULT")
+    today = timezone.localdate()
+    for month in month_range(min(first or today, today), max(last or today, horizon())):
+        cursor.execute(
+            f"CREATE TABLE {partition_name(month)} PARTITION OF {TABLE} "
+            f"FOR VALUES FROM ('{month.isoformat()}') "
+            f"TO ('{next_month(month).isoformat()}')"
+        )
+    # load before indexing; the identity carries on after the highest id
+    cursor.execute(f"INSERT INTO {TABLE} OVERRIDING SYSTEM VALUE SELECT * FROM {old}")
+    cursor.execute(
+        "SELECT setval(pg_get_serial_sequence(%s, 'id'), "
+        f"coalesce((SELECT max(id) FROM {TABLE}), 0) + 1, false)",
+        [TABLE],
+    )
+    cursor.execute(f"DROP TABLE {old}")
+
+    cursor.execute(f"ALTER TABLE {TABLE} ADD PRIMARY KEY (id, booking_date)")
+    for definition in indexes:
+        cursor.execute(definition)
+    for name, definition in foreign_keys:
+        cursor.execute(f"ALTER TABLE {TABLE} ADD CONSTRAINT {name} {definition}")
+    cursor.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+    for partition in partitions(cursor):
+        add_overlap_constraint(cursor, partition)
+
+
+def partitions(cursor):
+    cursor.execute(
+        "SELECT inhrelid::regclass::text FROM pg_inherits "
+        "WHERE inhparent = %s::regclass",
+        [TABLE],
+    )
+    return [row[0] for row in cursor.fetchall()]
+
+
+def ensure_partitions(cursor, ahead=None):
+    """Create the missing partitions up to ``ahead`` months from now."""
+    created = []
+    for month in month_range(timezone.localdate(), horizon(ahead)):
+        if not table_exists(cursor, partition_name(month)):
+            create_partition(cursor, month)
+            created.append(partition_name(month))
+    return created
+
+
+def drop_empty_partitions(cursor, before):
+    """Drop the empty partitions of months that end before ``before``."""
+    dropped = []
+    for name in partitions(cursor):
+        match = PARTITION_NAME.match(name)
+        if not match:
+            continue
+        month = date(int(match[1]), int(match[2]), 1)
+        if next_month(month) > before:
+            continue
+        cursor.execute(f"SELECT NOT EXISTS (SELECT 1 FROM {name})")
+        if cursor.fetchone()[0]:
+            cursor.execute(f"DROP TABLE {name}")
+            dropped.append(name)
+    return dropped
+
+
+def maintain(using="default", ahead=None, drop_before=None, convert_table=False):
+    """
+    Create upcoming partitions of ``bookings_booking`` and drop empty ones
+    before ``drop_before``; with ``convert_table``, partition a plain table
+    first. Returns a dict of what changed; ``partitioned`` is False when the
+    table is (still) plain, in which case nothing else was done.
+    """
+    changes = {"partitioned": False, "converted": False, "created": [], "dropped": []}
+    if not supports_partitions(using):
+        return changes
+    with transaction.atomic(using=using), connections[using].cursor() as cursor:
+        if not is_partitioned(cursor):
+            if not convert_table:
+                return changes
+            convert(cursor)
+            changes["converted"] = True
+        changes["partitioned"] = True
+        changes["created"] = ensure_partitions(cursor, ahead)
+        if drop_before is not None:
+            changes["dropped"] = drop_empty_partitions(cursor, drop_before)
+    return changes
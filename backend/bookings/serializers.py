@@ -1,7 +1,22 @@
 from rest_framework import serializers
+from django.utils import timezone
 from .models import Booking
+from .conflicts import create_booking, create_bookings, update_booking
+from common.rows import (
+    RowSerializer,
+    format_datetime,
+    format_decimal,
+    format_iso,
+    format_str,
+    quantum,
+)
 from courts.models import Court
-from datetime import datetime
+from courts.pricing import get_price_table
+from courts.slots import WEEKDAY_NAMES, weekday_name
+from datetime import datetime, timedelta
+
+# Upper bound on occurrences created by one bulk request.
+MAX_BULK_OCCURRENCES = 52
 
 
 class BookingSerializer(serializers.ModelSerializer):
@@ -21,46 +36,194 @@ class BookingSerializer(serializers.ModelSerializer):
             "end_time",
             "status",
             "total_price",
+            "hold_token",
+            "hold_expires_at",
         ]
-        read_only_fields = ["status", "total_price"]
+        read_only_fields = ["user", "status", "total_price"]
 
     def validate(self, data):
-        """Ensure booking is within court availability & no overlap"""
-        court = data["court"]
-        booking_date = data["booking_date"]
-        start_time = data["start_time"]
-        end_time = data["end_time"]
+        """
+        Field-level checks only; overlap detection happens atomically in
+        create() and update() (see bookings.conflicts).
+        """
+        # partial updates keep the booking's other values
+        current = self.instance
+        court = data.get("court", getattr(current, "court", None))
+        booking_date = data.get("booking_date", getattr(current, "booking_date", None))
+        start_time = data.get("start_time", getattr(current, "start_time", None))
+        end_time = data.get("end_time", getattr(current, "end_time", None))
 
         if start_time >= end_time:
             raise serializers.ValidationError("End time must be after start time.")
 
-        # check overlaps with existing bookings
-        existing_bookings = Booking.objects.filter(
-            court=court, booking_date=booking_date, status__in=["pending", "confirmed"]
+        # time-of-day rates (courts/pricing.py)
+        data["total_price"] = get_price_table(court).price(
+            booking_date, start_time, end_time
         )
 
-        for booking in existing_bookings:
-            if not (end_time <= booking.start_time or start_time >= booking.end_time):
-                raise serializers.ValidationError("This slot is already booked.")
-
-        # price calculation
-        duration_hours = (
-            datetime.combine(booking_date, end_time)
-            - datetime.combine(booking_date, start_time)
-        ).seconds / 3600
-        data["total_price"] = duration_hours * float(court.price_per_hour)
-
         # No past-dated bookings
-        if booking_date < date.today():
+        today = timezone.localdate()
+        if booking_date < today:
             raise serializers.ValidationError("Booking date cannot be in the past.")
 
         # Same-day: no past time
-        if booking_date == date.today():
-            if datetime.combine(booking_date, end_time) <= now():
+        if booking_date == today:
+            if timezone.make_aware(datetime.combine(booking_date, end_time)) <= (
+                timezone.now()
+            ):
                 raise serializers.ValidationError("Time window must be in the future.")
 
         return data
 
     def create(self, validated_data):
-        booking = Booking.objects.create(**validated_data)
-        return booking
+        return create_booking(**validated_data)
+
+    def update(self, instance, validated_data):
+        return update_booking(instance, **validated_data)
+
+
+class BookingRowSerializer(RowSerializer):
+    """BookingSerializer's output from ``values()`` rows (list endpoint)."""
+
+    columns = (
+        "id",
+        "court_id",
+        "court__name",
+        "user_id",
+        "user__email",
+        "booking_date",
+        "start_time",
+        "end_time",
+        "status",
+        "total_price",
+        "hold_token",
+        "hold_expires_at",
+    )
+
+    price_quantum = quantum(Booking, "total_price")
+
+    def to_representation(self, row):
+        return {
+            "id": row["id"],
+            "court": row["court_id"],
+            "court_name": row["court__name"],
+            "user": row["user_id"],
+            "user_email": row["user__email"],
+            "booking_date": format_iso(row["booking_date"]),
+            "start_time": format_iso(row["start_time"]),
+            "end_time": format_iso(row["end_time"]),
+            "status": row["status"],
+            "total_price": format_decimal(row["total_price"], self.price_quantum),
+            "hold_token": format_str(row["hold_token"]),
+            "hold_expires_at": format_datetime(row["hold_expires_at"]),
+        }
+
+
+class RecurrenceSerializer(serializers.Serializer):
+    """
+    Weekly RRULE subset: FREQ=WEEKLY with INTERVAL, BYDAY and COUNT or UNTIL.
+    ``weekdays`` defaults to the weekday of ``start_date``.
+    """
+
+    start_date = serializers.DateField()
+    interval = serializers.IntegerField(min_value=1, max_value=4, default=1)
+    weekdays = serializers.ListField(
+        child=serializers.ChoiceField(choices=WEEKDAY_NAMES),
+        required=False,
+        allow_empty=False,
+    )
+    count = serializers.IntegerField(
+        min_value=1, max_value=MAX_BULK_OCCURRENCES, required=False
+    )
+    until = serializers.DateField(required=False)
+
+    def validate(self, data):
+        if ("count" in data) == ("until" in data):
+            raise serializers.ValidationError("Give exactly one of count or until.")
+        if "until" in data and data["until"] < data["start_date"]:
+            raise serializers.ValidationError("until must not be before start_date.")
+        return data
+
+    @staticmethod
+    def expand(rule):
+        """Occurrence dates for a validated rule, capped at one over the limit."""
+        start = rule["start_date"]
+        weekdays = set(rule.get("weekdays") or [weekday_name(start)])
+        offsets = sorted(WEEKDAY_NAMES.index(day) for day in weekdays)
+        week_start = start - timedelta(days=start.weekday())
+        limit = min(
+            rule.get("count", MAX_BULK_OCCURRENCES + 1), MAX_BULK_OCCURRENCES + 1
+        )
+        until = rule.get("until")
+
+        dates = []
+        while len(dates) < limit:
+            for offset in offsets:
+                day = week_start + timedelta(days=offset)
+                if day < start:
+                    continue
+                if until and day > until:
+                    return dates
+                dates.append(day)
+                if len(dates) == limit:
+                    break
+            week_start += timedelta(weeks=rule["interval"])
+        return dates
+
+
+class BulkBookingSerializer(serializers.Serializer):
+    """
+    Book the same time range on many dates, given either as an explicit
+    ``dates`` list or a weekly ``recurrence``. Created all-or-nothing.
+    """
+
+    court = serializers.PrimaryKeyRelatedField(queryset=Court.objects.all())
+    start_time = serializers.TimeField()
+    end_time = serializers.TimeField()
+    dates = serializers.ListField(
+        child=serializers.DateField(),
+        required=False,
+        allow_empty=False,
+        max_length=MAX_BULK_OCCURRENCES,
+    )
+    recurrence = RecurrenceSerializer(required=False)
+
+    def validate(self, data):
+        if ("dates" in data) == ("recurrence" in data):
+            raise serializers.ValidationError(
+                "Give exactly one of dates or recurrence."
+            )
+        if data["start_time"] >= data["end_time"]:
+            raise serializers.ValidationError("End time must be after start time.")
+
+        if "recurrence" in data:
+            dates = RecurrenceSerializer.expand(data.pop("recurrence"))
+        else:
+            dates = sorted(set(data["dates"]))
+        if len(dates) > MAX_BULK_OCCURRENCES:
+            raise serializers.ValidationError(
+                f"At most {MAX_BULK_OCCURRENCES} occurrences per request."
+            )
+
+        now = timezone.now()
+        if timezone.make_aware(datetime.combine(dates[0], data["end_time"])) <= now:
+            raise serializers.ValidationError("Occurrences must be in the future.")
+        data["dates"] = dates
+        return data
+
+    def create(self, validated_data):
+        court = validated_data["court"]
+        start_time = validated_data["start_time"]
+        end_time = validated_data["end_time"]
+        prices = get_price_table(court)
+        return create_bookings(
+            user=validated_data["user"],
+            court=court,
+            dates=validated_data["dates"],
+            start_time=start_time,
+            end_time=end_time,
+            prices={
+                day: prices.price(day, start_time, end_time)
+                for day in validated_data["dates"]
+            },
+        )
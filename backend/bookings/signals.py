@@ -0,0 +1,46 @@
+# bookings/signals.py
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import Signal, receiver
+
+from .models import Booking
+
+# Sent after commit when bookings are inserted with bulk_create (which skips
+# post_save). Receivers get ``bookings``: the list of created Booking rows.
+bookings_bulk_created = Signal()
+
+# Sent after commit when pending bookings' holds are expired in bulk with
+# update() (see bookings.holds). Same ``bookings`` argument; the instances
+# only carry pk, court_id and booking_date.
+bookings_bulk_expired = Signal()
+
+# Sent inside the writing transaction when a booking is saved or deleted.
+# Receivers get ``days``: ``{court_id: {booking_date, ...}}``, the court-day
+# the booking was loaded with plus the one it has now (two when it moved).
+booking_days_changed = Signal()
+
+
+def by_court(keys):
+    """
+    ``{court_id: {value, ...}}`` from ``(court_id, value)`` pairs, skipping
+    pairs with either half unset (an unsaved or half-built row).
+    """
+    grouped = {}
+    for court_id, value in keys:
+        if court_id is not None and value:
+            grouped.setdefault(court_id, set()).add(value)
+    return grouped
+
+
+@receiver(post_init, sender=Booking)
+def remember_booking_day(sender, instance, **kwargs):
+    instance._loaded_day = (instance.court_id, instance.booking_date)
+
+
+@receiver(post_save, sender=Booking)
+@receiver(post_delete, sender=Booking)
+def announce_booking_days(sender, instance, **kwargs):
+    current = (instance.court_id, instance.booking_date)
+    days = by_court({instance._loaded_day, current})
+    instance._loaded_day = current
+    if days:
+        booking_days_changed.send(sender=Booking, days=days)
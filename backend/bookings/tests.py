@@ -1,3 +1,577 @@
-from django.test import TestCase
+import json
+from datetime import time, timedelta
+from io import StringIO
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import IntegrityError, connection, transaction
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from analytics.models import CourtDailyRollup
+from analytics.tasks import refresh_rollup_days
+from common.querystats import QueryBudgetExceeded, assert_max_queries
+from courts import cache as court_cache
+from courts.models import AvailabilityIndexWindow, CourtAvailability, CourtFreeInterval
+from courts.slots import weekday_name
+from courts.tasks import refresh_availability_days
+from courts.tests import bearer, login, make_court
+from jobs.models import Job
+from jobs.queue import get_backend
+
+from .archive import archive
+from .partitions import (
+    DEFAULT_PARTITION,
+    add_months,
+    maintain,
+    month_range,
+    month_start,
+    partition_name,
+    partitions,
+)
+from .holds import hold_ttl, occupying
+from .models import ArchivedBooking, Booking
+
+User = get_user_model()
+
+
+def future_day(weekday=0):
+    """The next ``weekday`` (0 = Monday) at least a week from today."""
+    day = timezone.localdate() + timedelta(days=7)
+    return day + timedelta(days=(weekday - day.weekday()) % 7)
+
+
+class BookingTestCase(TestCase):
+    def setUp(self):
+        self.court = make_court()
+        self.player = User.objects.create_user(username="player", password="pw")
+        self.day = future_day()
+        login(self.client, self.player)
+
+    def book(self, start, end, day=None, user=None, **fields):
+        return Booking.objects.create(
+            user=user or self.player,
+            court=self.court,
+            booking_date=day or self.day,
+            start_time=start,
+            end_time=end,
+            **fields,
+        )
+
+
+class BookingUpdateTests(BookingTestCase):
+    def setUp(self):
+        super().setUp()
+        other = User.objects.create_user(username="other", password="pw")
+        self.taken = self.book(time(10, 0), time(11, 0), user=other, status="confirmed")
+        self.booking = self.book(time(12, 0), time(13, 0))
+        self.url = reverse("booking-detail", args=[self.booking.pk])
+
+    def patch(self, **data):
+        return self.client.patch(self.url, data, content_type="application/json")
+
+    def test_moving_onto_another_booking_is_rejected(self):
+        response = self.patch(start_time="10:30", end_time="11:30")
+        self.assertEqual(response.status_code, 400)
+        self.booking.refresh_from_db()
+        self.assertEqual(self.booking.start_time, time(12, 0))
+
+    def test_moving_to_a_free_range_reprices(self):
+        response = self.patch(start_time="11:00", end_time="13:00")
+        self.assertEqual(response.status_code, 200)
+        self.booking.refresh_from_db()
+        self.assertEqual(
+            (self.booking.start_time, self.booking.end_time), (time(11), time(13))
+        )
+        self.assertEqual(self.booking.total_price, 40)
+
+    def test_a_booking_does_not_conflict_with_itself(self):
+        response = self.patch(end_time="13:30")
+        self.assertEqual(response.status_code, 200)
+
+    def test_moving_to_another_day_checks_that_day(self):
+        next_week = self.day + timedelta(days=7)
+        self.book(time(12, 0), time(13, 0), day=next_week, status="confirmed")
+        response = self.patch(booking_date=next_week.isoformat())
+        self.assertEqual(response.status_code, 400)
+
+    def test_full_update(self):
+        response = self.client.put(
+            self.url,
+            {
+                "court": self.court.pk,
+                "booking_date": self.day.isoformat(),
+                "start_time": "10:00",
+                "end_time": "12:00",
+            },
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 400)
+
+
+class BulkBookingTests(BookingTestCase):
+    def setUp(self):
+        super().setUp()
+        for day_of_week in ("monday", "wednesday"):
+            CourtAvailability.objects.create(
+                court=self.court,
+                day_of_week=day_of_week,
+                start_time=time(8, 0),
+                end_time=time(22, 0),
+            )
+        self.url = reverse("booking-bulk")
+        self.weeks = [self.day + timedelta(weeks=week) for week in range(3)]
+
+    def post(self, **data):
+        data = {
+            "court": self.court.pk,
+            "start_time": "18:00",
+            "end_time": "19:00",
+            **data,
+        }
+        return self.client.post(self.url, data, content_type="application/json")
+
+    def test_creates_every_date_under_one_hold(self):
+        response = self.post(dates=[day.isoformat() for day in self.weeks])
+        self.assertEqual(response.status_code, 201)
+        bookings = Booking.objects.order_by("booking_date")
+        self.assertEqual([b.booking_date for b in bookings], self.weeks)
+        self.assertEqual({b.hold_token for b in bookings}, {bookings[0].hold_token})
+        self.assertEqual({b.status for b in bookings}, {"pending"})
+
+    def test_weekly_recurrence(self):
+        response = self.post(
+            recurrence={
+                "start_date": self.day.isoformat(),
+                "weekdays": ["monday", "wednesday"],
+                "count": 4,
+            }
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(
+            [booking["booking_date"] for booking in response.json()],
+            [
+                day.isoformat()
+                for day in (
+                    self.day,
+                    self.day + timedelta(days=2),
+                    self.day + timedelta(days=7),
+                    self.day + timedelta(days=9),
+                )
+            ],
+        )
+
+    def test_any_conflict_rejects_the_whole_series(self):
+        other = User.objects.create_user(username="other", password="pw")
+        clash = self.book(
+            time(18, 30),
+            time(19, 30),
+            day=self.weeks[1],
+            user=other,
+            status="confirmed",
+        )
+        response = self.post(dates=[day.isoformat() for day in self.weeks])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {"conflicts": [self.weeks[1].isoformat()]})
+        self.assertEqual(list(Booking.objects.all()), [clash])
+
+    def test_dates_outside_availability_are_rejected(self):
+        tuesday = self.day + timedelta(days=1)
+        response = self.post(dates=[self.day.isoformat(), tuesday.isoformat()])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {"unavailable": [tuesday.isoformat()]})
+        response = self.post(dates=[self.day.isoformat()], end_time="22:30")
+        self.assertEqual(response.json(), {"unavailable": [self.day.isoformat()]})
+        self.assertFalse(Booking.objects.exists())
+
+    def test_stale_holds_do_not_conflict(self):
+        other = User.objects.create_user(username="other", password="pw")
+        stale = self.book(
+            time(18, 0),
+            time(19, 0),
+            day=self.weeks[0],
+            user=other,
+            hold_expires_at=timezone.now() - timedelta(minutes=1),
+        )
+        response = self.post(dates=[day.isoformat() for day in self.weeks])
+        self.assertEqual(response.status_code, 201)
+        stale.refresh_from_db()
+        self.assertEqual(stale.status, "expired")
+
+    def test_request_validation(self):
+        both = self.post(
+            dates=[self.day.isoformat()],
+            recurrence={"start_date": self.day.isoformat(), "count": 2},
+        )
+        self.assertEqual(both.status_code, 400)
+        backwards = self.post(dates=[self.day.isoformat()], end_time="17:00")
+        self.assertEqual(backwards.status_code, 400)
+        past = self.post(dates=[(timezone.localdate() - timedelta(days=1)).isoformat()])
+        self.assertEqual(past.status_code, 400)
+
+    def test_only_players_book(self):
+        login(self.client, self.court.owner)
+        response = self.post(dates=[self.day.isoformat()])
+        self.assertEqual(response.status_code, 403)
+
+
+class ListQueryCountTests(BookingTestCase):
+    """The booking list endpoints stay within their QUERY_BUDGETS, N+1 free."""
+
+    def setUp(self):
+        super().setUp()
+        self.admin = User.objects.create_user(
+            username="admin", password="pw", role="admin"
+        )
+        second = make_court(owner=self.court.owner, name="Second")
+        past = timezone.localdate() - timedelta(days=200)
+        for week in range(4):
+            for court in (self.court, second):
+                for day in (self.day, past):
+                    Booking.objects.create(
+                        user=self.player,
+                        court=court,
+                        booking_date=day + timedelta(weeks=week),
+                        start_time=time(9, 0),
+                        end_time=time(10, 0),
+                        status="confirmed",
+                    )
+        archive(before=past + timedelta(weeks=2))
+
+    def assert_within_budget(self, name, user, count):
+        login(self.client, user)
+        with assert_max_queries(settings.QUERY_BUDGETS[name], max_duplicates=0):
+            response = self.client.get(reverse(name))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["count"], count)
+
+    def test_booking_list(self):
+        self.assert_within_budget("booking-list", self.player, 12)
+        self.assert_within_budget("booking-list", self.court.owner, 12)
+        self.assert_within_budget("booking-list", self.admin, 12)
+
+    def test_archived_list(self):
+        self.assert_within_budget("booking-archived", self.court.owner, 4)
+        self.assert_within_budget("booking-archived", self.admin, 4)
+
+
+class QueryBudgetMiddlewareTests(BookingTestCase):
+    def post_booking(self):
+        return self.client.post(
+            reverse("booking-list"),
+            {
+                "court": self.court.pk,
+                "booking_date": self.day.isoformat(),
+                "start_time": "09:00",
+                "end_time": "10:00",
+            },
+            content_type="application/json",
+        )
+
+    @override_settings(QUERY_BUDGET_STRICT=True, QUERY_BUDGETS={"booking-list": 0})
+    def test_url_name_budgets_apply_to_reads_only(self):
+        self.assertEqual(self.post_booking().status_code, 201)
+        with self.assertRaises(QueryBudgetExceeded):
+            self.client.get(reverse("booking-list"))
+
+    @override_settings(QUERY_BUDGET_STRICT=True, QUERY_BUDGETS={"POST booking-list": 0})
+    def test_method_budgets(self):
+        self.assertEqual(self.client.get(reverse("booking-list")).status_code, 200)
+        with self.assertRaises(QueryBudgetExceeded):
+            self.post_booking()
+
+
+@override_settings(JOBS_BACKEND="jobs.queue.DatabaseBackend")
+class RefreshJobTests(BookingTestCase):
+    """Rollups and the availability index are refreshed by jobs."""
+
+    def setUp(self):
+        super().setUp()
+        CourtAvailability.objects.create(
+            court=self.court,
+            day_of_week=weekday_name(self.day),
+            start_time=time(9, 0),
+            end_time=time(12, 0),
+        )
+        AvailabilityIndexWindow.objects.create(start_date=self.day, end_date=self.day)
+        Job.objects.all().delete()
+
+    def queued(self):
+        return list(Job.objects.order_by("name", "pk").values_list("name", "kwargs"))
+
+    def test_booking_requests_only_queue_the_refreshes(self):
+        budget = settings.QUERY_BUDGETS["POST booking-list"]
+        with assert_max_queries(budget):
+            response = self.client.post(
+                reverse("booking-list"),
+                {
+                    "court": self.court.pk,
+                    "booking_date": self.day.isoformat(),
+                    "start_time": "10:00",
+                    "end_time": "11:00",
+                },
+                content_type="application/json",
+            )
+        self.assertEqual(response.status_code, 201)
+        dates = [self.day.isoformat()]
+        self.assertEqual(
+            self.queued(),
+            [
+                (refresh_rollup_days.name, {"court_id": self.court.pk, "dates": dates}),
+                (
+                    refresh_availability_days.name,
+                    {"court_id": self.court.pk, "dates": dates},
+                ),
+            ],
+        )
+        self.assertFalse(CourtFreeInterval.objects.exists())
+
+        Booking.objects.update(status="confirmed")
+        self.assertEqual(get_backend().run_pending(), 2)
+        self.assertEqual(
+            list(CourtFreeInterval.objects.values_list("start_minute", "end_minute")),
+            [(540, 600), (660, 720)],
+        )
+        rollup = CourtDailyRollup.objects.get()
+        self.assertEqual((rollup.available_minutes, rollup.booked_minutes), (180, 60))
+
+    def test_moved_bookings_refresh_both_courts(self):
+        booking = self.book(time(10, 0), time(11, 0))
+        other = make_court()
+        Job.objects.all().delete()
+        booking.court = other
+        booking.save()
+        self.assertEqual(
+            {(name, kwargs["court_id"]) for name, kwargs in self.queued()},
+            {
+                (task.name, court.pk)
+                for task in (refresh_rollup_days, refresh_availability_days)
+                for court in (self.court, other)
+            },
+        )
+
+
+class ExportTests(BookingTestCase):
+    def setUp(self):
+        super().setUp()
+        self.booking = self.book(time(9, 0), time(10, 0), status="confirmed")
+        login(self.client, self.court.owner)
+        self.url = reverse("booking-export")
+
+    def test_wsgi_streams_a_generator(self):
+        response = self.client.get(self.url, {"output": "ndjson"})
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.is_async)
+        rows = [json.loads(line) for line in response.getvalue().splitlines()]
+        self.assertEqual([row["id"] for row in rows], [self.booking.pk])
+
+    async def test_asgi_streams_an_async_iterator(self):
+        # a sync iterator would be read to the end before the first byte
+        response = await self.async_client.get(
+            self.url,
+            {"output": "csv"},
+            headers={"Authorization": bearer(self.court.owner)},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.is_async)
+        self.assertTrue(hasattr(response.streaming_content, "__aiter__"))
+        chunks = [chunk async for chunk in response.streaming_content]
+        lines = b"".join(chunks).decode().splitlines()
+        self.assertEqual(lines[0].split(",")[0], "id")
+        self.assertEqual(
+            [line.split(",")[0] for line in lines[1:]], [str(self.booking.pk)]
+        )
+
+
+class HoldTests(BookingTestCase):
+    def create(self, start="09:00", end="10:00"):
+        return self.client.post(
+            reverse("booking-list"),
+            {
+                "court": self.court.pk,
+                "booking_date": self.day.isoformat(),
+                "start_time": start,
+                "end_time": end,
+            },
+            content_type="application/json",
+        )
+
+    def post(self, action, token):
+        return self.client.post(
+            reverse(f"booking-{action}"),
+            {"hold_token": str(token)},
+            content_type="application/json",
+        )
+
+    def test_new_bookings_are_held(self):
+        before = timezone.now()
+        response = self.create()
+        self.assertEqual(response.status_code, 201)
+        booking = Booking.objects.get()
+        self.assertEqual(booking.status, "pending")
+        self.assertIsNotNone(booking.hold_token)
+        self.assertGreaterEqual(booking.hold_expires_at, before + hold_ttl())
+
+    def test_confirm(self):
+        self.create()
+        booking = Booking.objects.get()
+        response = self.post("confirm", booking.hold_token)
+        self.assertEqual(response.status_code, 200)
+        booking.refresh_from_db()
+        self.assertEqual(booking.status, "confirmed")
+        self.assertIsNone(booking.hold_expires_at)
+        # a hold confirms once
+        self.assertEqual(self.post("confirm", booking.hold_token).status_code, 404)
+
+    def test_only_the_holder_confirms(self):
+        self.create()
+        booking = Booking.objects.get()
+        other = User.objects.create_user(username="other", password="pw")
+        login(self.client, other)
+        self.assertEqual(self.post("confirm", booking.hold_token).status_code, 404)
+        self.assertEqual(self.post("release", booking.hold_token).status_code, 404)
+
+    def test_lapsed_hold_cannot_be_confirmed_and_frees_the_slot(self):
+        self.create()
+        booking = Booking.objects.get()
+        later = booking.hold_expires_at + timedelta(seconds=1)
+        with mock.patch("django.utils.timezone.now", return_value=later):
+            self.assertEqual(self.post("confirm", booking.hold_token).status_code, 404)
+            other = User.objects.create_user(username="other", password="pw")
+            login(self.client, other)
+            self.assertEqual(self.create("09:30", "10:30").status_code, 201)
+            # expired by the insert on PostgreSQL, by the sweeper otherwise
+            self.assertFalse(Booking.objects.filter(occupying(), pk=booking.pk))
+
+    def test_live_hold_blocks_the_slot(self):
+        self.create()
+        self.assertEqual(self.create("09:30", "10:30").status_code, 400)
+
+    def test_release_frees_the_slot(self):
+        self.create()
+        booking = Booking.objects.get()
+        self.assertEqual(self.post("release", booking.hold_token).status_code, 204)
+        booking.refresh_from_db()
+        self.assertEqual(booking.status, "cancelled")
+        self.assertEqual(self.create().status_code, 201)
+        self.assertEqual(self.post("release", booking.hold_token).status_code, 404)
+
+    def test_sweep_expires_only_lapsed_holds(self):
+        now = timezone.now()
+        lapsed = self.book(
+            time(9, 0), time(10, 0), hold_expires_at=now - timedelta(seconds=1)
+        )
+        live = self.book(
+            time(10, 0), time(11, 0), hold_expires_at=now + timedelta(minutes=5)
+        )
+        legacy = self.book(time(11, 0), time(12, 0))
+        generation = court_cache.current_generation()
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command("expire_holds", batch_size=1, stdout=StringIO())
+        statuses = dict(Booking.objects.values_list("pk", "status"))
+        self.assertEqual(
+            statuses,
+            {lapsed.pk: "expired", live.pk: "pending", legacy.pk: "pending"},
+        )
+        # the bulk update still invalidates listings
+        self.assertNotEqual(court_cache.current_generation(), generation)
+
+
+@skipUnless(connection.vendor == "postgresql", "partitioning needs PostgreSQL")
+class PartitionTests(BookingTestCase):
+    """The partition lifecycle, run for real (DDL rolls back with the test)."""
+
+    def setUp(self):
+        super().setUp()
+        self.today = timezone.localdate()
+        self.old = self.book(
+            time(9, 0),
+            time(10, 0),
+            day=add_months(self.today, -6),
+            status="confirmed",
+        )
+        self.soon = self.book(time(9, 0), time(10, 0), status="confirmed")
+        self.far = self.book(time(9, 0), time(10, 0), day=add_months(self.today, 30))
+
+    def partitions(self):
+        with connection.cursor() as cursor:
+            return set(partitions(cursor))
+
+    def rows_in(self, table):
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT id FROM {table}")
+            return {row[0] for row in cursor.fetchall()}
+
+    def test_plain_table_is_only_converted_on_request(self):
+        out = StringIO()
+        call_command("partition_bookings", stdout=out)
+        self.assertIn("run with --convert", out.getvalue())
+        self.assertEqual(self.partitions(), set())
+
+        call_command("partition_bookings", "--convert", "--keep-empty", stdout=out)
+        self.assertIn("Converted", out.getvalue())
+        # every month holding bookings, through the horizon
+        self.assertEqual(
+            self.partitions(),
+            {DEFAULT_PARTITION}
+            | {
+                partition_name(month)
+                for month in month_range(self.old.booking_date, self.far.booking_date)
+            },
+        )
+
+    def test_conversion_keeps_rows_ids_and_constraints(self):
+        ids = set(Booking.objects.values_list("pk", flat=True))
+        changes = maintain(ahead=2, convert_table=True)
+        self.assertTrue(changes["converted"])
+        self.assertEqual(set(Booking.objects.values_list("pk", flat=True)), ids)
+        for booking in (self.old, self.soon, self.far):
+            partition = partition_name(month_start(booking.booking_date))
+            self.assertEqual(self.rows_in(partition), {booking.pk})
+        self.assertEqual(self.rows_in(DEFAULT_PARTITION), set())
+        # the identity carries on, and overlaps are still refused
+        self.assertGreater(self.book(time(11, 0), time(12, 0)).pk, max(ids))
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            self.book(time(9, 30), time(10, 30), status="confirmed")
+        response = self.client.post(
+            reverse("booking-list"),
+            {
+                "court": self.court.pk,
+                "booking_date": self.day.isoformat(),
+                "start_time": "09:30",
+                "end_time": "10:30",
+            },
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_new_partitions_take_their_rows_from_the_default(self):
+        maintain(ahead=2, convert_table=True)
+        # beyond every partition
+        later = self.book(time(9, 0), time(10, 0), day=add_months(self.today, 40))
+        self.assertEqual(self.rows_in(DEFAULT_PARTITION), {later.pk})
+        changes = maintain(ahead=40)
+        self.assertFalse(changes["converted"])
+        partition = partition_name(month_start(later.booking_date))
+        self.assertIn(partition, changes["created"])
+        self.assertEqual(self.rows_in(DEFAULT_PARTITION), set())
+        self.assertEqual(self.rows_in(partition), {later.pk})
+
+    def test_archived_months_are_dropped(self):
+        maintain(ahead=2, convert_table=True)
+        old_partition = partition_name(month_start(self.old.booking_date))
+        cutoff = self.today - timedelta(days=1)
+        # the empty months since are dropped straight away
+        self.assertNotIn(old_partition, maintain(drop_before=cutoff)["dropped"])
+        self.assertIn(old_partition, self.partitions())
+
+        self.assertEqual(archive(before=cutoff), 1)
+        self.assertEqual(maintain(drop_before=cutoff)["dropped"], [old_partition])
+        self.assertTrue(ArchivedBooking.objects.filter(pk=self.old.pk).exists())
+        self.assertEqual(
+            set(Booking.objects.values_list("pk", flat=True)),
+            {self.soon.pk, self.far.pk},
+        )
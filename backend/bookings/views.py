@@ -1,20 +1,69 @@
-from rest_framework import viewsets, permissions
-from rest_framework.exceptions import PermissionDenied
-from .models import Booking
-from .serializers import BookingSerializer
-from users.permissions import IsPlayerRole, IsAdmin
+import uuid
+
+from rest_framework import viewsets, permissions, decorators, status
+from rest_framework.response import Response
+from rest_framework.exceptions import PermissionDenied, ValidationError
+from django.http import Http404, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from . import holds
+from .models import ArchivedBooking, Booking
+from .serializers import (
+    BookingRowSerializer,
+    BookingSerializer,
+    BulkBookingSerializer,
+)
+from .exports import CONTENT_TYPES, FORMATS, stream_export
+from users.authentication import db_user
+from users.permissions import IsPlayerRole, IsAdmin, IsOwnerRole
 from courts.models import Court
+from common.db_routers import ReplicaReadMixin
+from common.pagination import BookingKeysetPagination, SelectablePaginationMixin
+from common.rows import RowListMixin
+
+
+def parse_hold_token(data):
+    try:
+        return uuid.UUID(str(data.get("hold_token")))
+    except ValueError:
+        raise ValidationError({"hold_token": "Expected a hold token."})
 
 
-class BookingViewSet(viewsets.ModelViewSet):
+def filter_bookings(queryset, params):
+    """Apply the ``court``, ``status``, ``date_from`` and ``date_to`` params."""
+    if params.get("court"):
+        if not params["court"].isdigit():
+            raise ValidationError({"court": "Expected a court id."})
+        queryset = queryset.filter(court_id=params["court"])
+    if params.get("status"):
+        queryset = queryset.filter(status__in=params["status"].split(","))
+    for param, lookup in (("date_from", "gte"), ("date_to", "lte")):
+        if params.get(param):
+            value = parse_date(params[param])
+            if value is None:
+                raise ValidationError({param: "Expected YYYY-MM-DD."})
+            queryset = queryset.filter(**{f"booking_date__{lookup}": value})
+    return queryset
+
+
+class BookingViewSet(
+    ReplicaReadMixin, SelectablePaginationMixin, RowListMixin, viewsets.ModelViewSet
+):
     queryset = Booking.objects.select_related("court", "user")
+    serializer_class = BookingSerializer
+    # list pages are served from values() rows (common/rows.py)
+    row_serializer_class = BookingRowSerializer
+    ordering = ["-booking_date", "-start_time", "-id"]
+    keyset_pagination_class = BookingKeysetPagination
 
     def get_permissions(self):
         if self.action in ["list", "retrieve"]:
             return [permissions.IsAuthenticated()]
-        if self.action == "create":
+        if self.action in ["create", "bulk"]:
             # Only players can create bookings
             return [permissions.IsAuthenticated(), IsPlayerRole()]
+        if self.action in ["export", "archived"]:
+            return [permissions.IsAuthenticated(), (IsOwnerRole | IsAdmin)()]
         # updates/cancels: player can modify their own; owner/admin can manage
         return [permissions.IsAuthenticated()]
 
@@ -29,16 +78,89 @@ class BookingViewSet(viewsets.ModelViewSet):
 
         # Owners see bookings for their courts
         if getattr(user, "role", "") == "owner":
-            return Booking.objects.filter(court__owner=user).select_related(
+            return Booking.objects.filter(court__owner_id=user.pk).select_related(
                 "court", "user"
             )
 
         # Players see only their bookings
-        return Booking.objects.filter(user=user).select_related("court", "user")
+        return Booking.objects.filter(user_id=user.pk).select_related("court", "user")
 
     def perform_create(self, serializer):
         court: Court = serializer.validated_data["court"]
         # Optional: block owners from booking their own courts
         if getattr(self.request.user, "role", "") != "player":
             raise PermissionDenied("Only players can create bookings.")
-        serializer.save(user=self.request.user)
+        serializer.save(user=db_user(self.request.user))
+
+    @decorators.action(detail=False, methods=["post"], url_path="bulk")
+    def bulk(self, request):
+        """
+        Create a series of bookings in one all-or-nothing request, e.g.
+        {"court": 1, "start_time": "18:00", "end_time": "20:00",
+         "recurrence": {"start_date": "2025-09-02", "count": 12}}
+        """
+        serializer = BulkBookingSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        bookings = serializer.save(user=db_user(request.user))
+        return Response(
+            BookingSerializer(bookings, many=True).data,
+            status=status.HTTP_201_CREATED,
+        )
+
+    @decorators.action(detail=False, methods=["get"], url_path="export")
+    def export(self, request):
+        """
+        Stream bookings as CSV or NDJSON in constant memory.
+        Query params: output=csv|ndjson, court, status, date_from, date_to.
+        """
+        params = request.query_params
+        output = params.get("output", "csv")
+        if output not in FORMATS:
+            raise ValidationError({"output": "Must be one of: csv, ndjson."})
+
+        # role scoping only; the export reads plain values, not instances
+        queryset = filter_bookings(self.get_queryset().select_related(None), params)
+        queryset = queryset.order_by("booking_date", "start_time", "id")
+
+        resp = StreamingHttpResponse(
+            stream_export(request, queryset, output),
+            content_type=CONTENT_TYPES[output],
+        )
+        filename = f"bookings-{timezone.localdate():%Y%m%d}.{output}"
+        resp["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return resp
+
+    @decorators.action(detail=False, methods=["get"], url_path="archived")
+    def archived(self, request):
+        """
+        Bookings moved to the archive (bookings/archive.py): all of them for
+        admins, those of their courts for owners. Same filters as export,
+        paginated and ordered like the list.
+        """
+        user = request.user
+        queryset = ArchivedBooking.objects.all()
+        if not (user.is_staff or getattr(user, "role", "") == "admin"):
+            queryset = queryset.filter(court__owner_id=user.pk)
+        queryset = filter_bookings(queryset, request.query_params).order_by(
+            *self.ordering
+        )
+        page = self.paginate_queryset(BookingRowSerializer.project(queryset))
+        return self.get_paginated_response(BookingRowSerializer(page).data)
+
+    @decorators.action(detail=False, methods=["post"], url_path="confirm")
+    def confirm(self, request):
+        """
+        Confirm the pending booking(s) held under {"hold_token": "..."} before
+        the hold runs out (see bookings.holds).
+        """
+        bookings = holds.confirm(request.user, parse_hold_token(request.data))
+        if not bookings:
+            raise Http404("No active hold with this token.")
+        return Response(BookingSerializer(bookings, many=True).data)
+
+    @decorators.action(detail=False, methods=["post"], url_path="release")
+    def release(self, request):
+        """Give up a hold early, freeing its slots straight away."""
+        if not holds.release(request.user, parse_hold_token(request.data)):
+            raise Http404("No pending hold with this token.")
+        return Response(status=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,79 @@
+# common/benchmark.py
+"""
+Timing helpers shared by the benchmark and load-test commands: run a callable
+over a list of jobs with N concurrent threads and summarize throughput and
+latency percentiles.
+"""
+
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+def percentile(sorted_values, fraction):
+    index = min(int(len(sorted_values) * fraction), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+class RunResult:
+    def __init__(self, latencies, errors, elapsed):
+        self.latencies = sorted(latencies)
+        self.errors = errors
+        self.elapsed = elapsed
+
+    @property
+    def throughput(self):
+        return len(self.latencies) / self.elapsed if self.elapsed else 0.0
+
+    def row(self):
+        """``(req/s, p50, p95, p99 in ms, errors)``."""
+        if not self.latencies:
+            return (0.0, 0.0, 0.0, 0.0, self.errors)
+        ms = [seconds * 1000 for seconds in self.latencies]
+        return (
+            self.throughput,
+            statistics.median(ms),
+            percentile(ms, 0.95),
+            percentile(ms, 0.99),
+            self.errors,
+        )
+
+
+HEADER = (
+    f"{'scenario':<22} {'conc':>5} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} "
+    f"{'p99 ms':>8} {'errors':>7}"
+)
+
+
+def format_row(label, concurrency, result):
+    throughput, p50, p95, p99, errors = result.row()
+    return (
+        f"{label:<22} {concurrency:>5} {throughput:>9.1f} {p50:>8.1f} "
+        f"{p95:>8.1f} {p99:>8.1f} {errors:>7}"
+    )
+
+
+def run_concurrent(func, jobs, concurrency):
+    """
+    Call ``func(job)`` for every job on ``concurrency`` threads. ``func``
+    returns True on success; exceptions count as errors. Worker threads open
+    their own database connections, which are dropped with the threads.
+    """
+
+    def timed(job):
+        started = time.perf_counter()
+        try:
+            ok = func(job)
+        except Exception:
+            ok = False
+        return time.perf_counter() - started, ok
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(timed, jobs))
+        elapsed = time.perf_counter() - started
+    return RunResult(
+        [seconds for seconds, _ in results],
+        sum(1 for _, ok in results if not ok),
+        elapsed,
+    )
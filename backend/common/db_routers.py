@@ -0,0 +1,54 @@
+# common/db_routers.py
+"""
+Read-replica routing.
+
+Views opt in with ``ReplicaReadMixin``: while such a view handles a GET/HEAD/
+OPTIONS request, ORM reads go to the ``replica`` alias (when one is configured)
+and everything else — writes, unsafe methods, other views — stays on
+``default``. The flag lives in a ContextVar so it is per-request under both
+WSGI threads and ASGI tasks.
+"""
+
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+from rest_framework.permissions import SAFE_METHODS
+
+REPLICA_ALIAS = "replica"
+
+_read_from_replica = ContextVar("read_from_replica", default=False)
+
+
+def replica_configured():
+    return REPLICA_ALIAS in settings.DATABASES
+
+
+class ReadReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if _read_from_replica.get() and replica_configured():
+            # reads inside a write transaction must see that transaction
+            if not connections["default"].in_atomic_block:
+                return REPLICA_ALIAS
+        return "default"
+
+    def db_for_write(self, model, **hints):
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # both aliases hold the same data
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return None
+
+
+class ReplicaReadMixin:
+    """Send this view's safe-method ORM reads to the read replica."""
+
+    def dispatch(self, request, *args, **kwargs):
+        token = _read_from_replica.set(request.method in SAFE_METHODS)
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        finally:
+            _read_from_replica.reset(token)
@@ -0,0 +1,238 @@
+# common/middleware.py
+import logging
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_sequence, compress_string
+
+from .querystats import QueryBudgetExceeded, collect_queries
+
+try:
+    import brotli
+except ImportError:  # optional; responses fall back to gzip
+    brotli = None
+
+logger = logging.getLogger("querystats")
+
+# bodies shorter than this are not worth compressing
+MIN_COMPRESS_BYTES = 200
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/x-ndjson",
+    "text/csv",
+    "text/html",
+    "text/plain",
+)
+
+
+class QueryBudgetMiddleware:
+    """
+    Counts each request's queries, DB time and repeated statements (see
+    common/querystats.py) and logs them as structured fields.
+
+    Settings:
+    QUERY_BUDGETS         {endpoint: max queries}, where endpoint is a URL
+                          name for GET/HEAD requests ("court-list") or a
+                          method and URL name ("POST booking-list")
+    QUERY_BUDGET_STRICT   raise QueryBudgetExceeded instead of logging a
+                          warning when an endpoint goes over budget (CI)
+    QUERY_STATS_HEADERS   add X-DB-Queries / X-DB-Time-Ms / X-DB-Duplicates
+                          response headers (defaults to DEBUG)
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.budgets = getattr(settings, "QUERY_BUDGETS", {})
+        self.strict = getattr(settings, "QUERY_BUDGET_STRICT", False)
+        self.headers = getattr(settings, "QUERY_STATS_HEADERS", settings.DEBUG)
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        with collect_queries() as stats:
+            response = self.get_response(request)
+        return self.report(request, response, stats)
+
+    async def __acall__(self, request):
+        with collect_queries() as stats:
+            response = await self.get_response(request)
+        return self.report(request, response, stats)
+
+    def budget_for(self, method, endpoint):
+        """A plain URL name budgets reads only; writes need their own entry."""
+        budget = self.budgets.get(f"{method} {endpoint}")
+        if budget is None and method in ("GET", "HEAD"):
+            budget = self.budgets.get(endpoint)
+        return budget
+
+    def report(self, request, response, stats):
+        match = request.resolver_match
+        endpoint = match.view_name if match else None
+        budget = self.budget_for(request.method, endpoint)
+        over_budget = budget is not None and stats.count > budget
+
+        fields = {
+            "method": request.method,
+            "path": request.path,
+            "endpoint": endpoint,
+            "status": response.status_code,
+            "queries": stats.count,
+            "db_time_ms": round(stats.time_ms, 2),
+            "duplicates": stats.duplicates,
+            "budget": budget,
+        }
+        if over_budget:
+            message = f"{endpoint} over query budget ({budget}): {stats.summary()}"
+            if self.strict:
+                raise QueryBudgetExceeded(message)
+            logger.warning(message, extra={"query_stats": fields})
+        else:
+            logger.debug(
+                " ".join(f"{key}={value}" for key, value in fields.items()),
+                extra={"query_stats": fields},
+            )
+
+        if self.headers:
+            response["X-DB-Queries"] = str(stats.count)
+            response["X-DB-Time-Ms"] = f"{stats.time_ms:.1f}"
+            response["X-DB-Duplicates"] = str(stats.duplicates)
+        return response
+
+
+def accepted_encodings(header):
+    """``{coding: q}`` from an Accept-Encoding header."""
+    accepted = {}
+    for part in header.split(","):
+        coding, _, params = part.partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        params = params.replace(" ", "")
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[coding] = quality
+    return accepted
+
+
+def negotiate_encoding(header, supported):
+    """
+    The coding in ``supported`` (server preference order) the client weights
+    highest, or None for an uncompressed response.
+    """
+    accepted = accepted_encodings(header)
+    default = accepted.get("*", 0.0)
+    best, best_quality = None, 0.0
+    for coding in supported:
+        quality = accepted.get(coding, default)
+        if quality > best_quality:
+            best, best_quality = coding, quality
+    return best
+
+
+class CompressionMiddleware:
+    """
+    Compresses responses with the best coding the request's Accept-Encoding
+    allows: Brotli (when the ``brotli`` package is installed) for JSON
+    bodies, otherwise gzip. Streaming responses (exports) are gzipped as they
+    stream; Server-Sent Events, files and other binary content are left
+    alone.
+
+    HTML is only ever gzipped: Django's gzip pads each response with random
+    bytes against BREACH, and pages carrying CSRF tokens need that.
+    """
+
+    sync_capable = True
+    async_capable = True
+    # Django's GZipMiddleware default
+    max_random_bytes = 100
+    # fast enough for per-request compression of API payloads
+    brotli_quality = 5
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        return self.compress(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.compress(request, await self.get_response(request))
+
+    def encodings_for(self, response):
+        content_type = response.get("Content-Type", "").partition(";")[0].strip()
+        if content_type not in COMPRESSIBLE_TYPES:
+            return ()
+        if brotli is not None and content_type == "application/json":
+            if not response.streaming:
+                return ("br", "gzip")
+        return ("gzip",)
+
+    def compress(self, request, response):
+        if response.has_header("Content-Encoding"):
+            return response
+        if not response.streaming and len(response.content) < MIN_COMPRESS_BYTES:
+            return response
+        supported = self.encodings_for(response)
+        if not supported:
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        coding = negotiate_encoding(
+            request.META.get("HTTP_ACCEPT_ENCODING", ""), supported
+        )
+        if coding is None:
+            return response
+
+        if response.streaming:
+            self.gzip_stream(response)
+        else:
+            if coding == "br":
+                compressed = brotli.compress(
+                    response.content, quality=self.brotli_quality
+                )
+            else:
+                compressed = compress_string(
+                    response.content, max_random_bytes=self.max_random_bytes
+                )
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers["Content-Length"] = str(len(compressed))
+
+        # a compressed body no longer matches a strong validator
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
+        response.headers["Content-Encoding"] = coding
+        return response
+
+    def gzip_stream(self, response):
+        if response.is_async:
+            chunks = response.streaming_content
+
+            async def compressed():
+                async for chunk in chunks:
+                    yield compress_string(chunk, max_random_bytes=self.max_random_bytes)
+
+            response.streaming_content = compressed()
+        else:
+            response.streaming_content = compress_sequence(
+                response.streaming_content, max_random_bytes=self.max_random_bytes
+            )
+        # the compressed length is unknown until the stream ends
+        del response.headers["Content-Length"]
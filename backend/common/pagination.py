@@ -0,0 +1,187 @@
+# common/pagination.py
+"""
+Keyset (seek) pagination.
+
+Pages are addressed by an opaque cursor holding the sort key of the last (or
+first) row seen, so fetching page N is an indexed range scan instead of an
+``OFFSET``, and no ``COUNT(*)`` is issued. The ordering must end in a unique
+column (``id``) so every row has a distinct key.
+"""
+
+import base64
+import json
+from collections import OrderedDict
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    cursor_query_param = "cursor"
+    page_size = api_settings.PAGE_SIZE
+    # e.g. ("-created_at", "-id"); must end in a unique field
+    ordering = ("-id",)
+    invalid_cursor_message = "Invalid cursor."
+
+    def paginate_queryset(self, queryset, request, view=None):
+        page = self.page_queryset(queryset, request)
+        return self.finish_page(list(page))
+
+    async def apaginate_queryset(self, queryset, request):
+        """paginate_queryset() for async views."""
+        page = self.page_queryset(queryset, request)
+        return self.finish_page([row async for row in page])
+
+    def page_queryset(self, queryset, request):
+        """The unevaluated query for one page (plus one row to detect more)."""
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        fields = [
+            queryset.model._meta.get_field(name.lstrip("-")) for name in self.ordering
+        ]
+        self.fields = fields
+
+        values, reverse = self.decode_cursor(request)
+        self.values, self.reverse = values, reverse
+        ordering = (
+            [self.flip(name) for name in self.ordering]
+            if reverse
+            else list(self.ordering)
+        )
+        queryset = queryset.order_by(*ordering)
+        if values is not None:
+            queryset = queryset.filter(self.seek(ordering, values))
+        return queryset[: self.page_size + 1]
+
+    def finish_page(self, rows):
+        values, reverse = self.values, self.reverse
+        has_more = len(rows) > self.page_size
+        rows = rows[: self.page_size]
+        if reverse:
+            rows.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, values is not None
+
+        self.first_key = self.key_for(rows[0]) if rows else None
+        self.last_key = self.key_for(rows[-1]) if rows else None
+        return rows
+
+    def get_paginated_response(self, data):
+        return Response(self.get_paginated_data(data))
+
+    def get_paginated_data(self, data):
+        return OrderedDict(
+            [
+                ("next", self.get_next_link()),
+                ("previous", self.get_previous_link()),
+                ("results", data),
+            ]
+        )
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_next_link(self):
+        if not (self.has_next and self.last_key is not None):
+            return None
+        return self.link_for(self.last_key, reverse=False)
+
+    def get_previous_link(self):
+        if not (self.has_previous and self.first_key is not None):
+            return None
+        return self.link_for(self.first_key, reverse=True)
+
+    @staticmethod
+    def flip(name):
+        return name[1:] if name.startswith("-") else f"-{name}"
+
+    def key_for(self, obj):
+        # model instances, or values() rows (common/rows.py)
+        if isinstance(obj, dict):
+            return [obj[field.attname] for field in self.fields]
+        return [getattr(obj, field.attname) for field in self.fields]
+
+    def seek(self, ordering, values):
+        """
+        Rows strictly after ``values`` in ``ordering``:
+        (a > x) OR (a = x AND b > y) OR (a = x AND b = y AND c > z) ...
+        with > swapped for < on descending columns.
+        """
+        condition = Q()
+        equal = {}
+        for name, field, value in zip(ordering, self.fields, values):
+            lookup = "lt" if name.startswith("-") else "gt"
+            condition |= Q(**equal, **{f"{field.name}__{lookup}": value})
+            equal[field.name] = value
+        return condition
+
+    @staticmethod
+    def encode_value(value):
+        # full-precision isoformat; DjangoJSONEncoder truncates to milliseconds
+        if hasattr(value, "isoformat"):
+            return value.isoformat()
+        return str(value)
+
+    def link_for(self, key, reverse):
+        payload = json.dumps({"v": key, "r": int(reverse)}, default=self.encode_value)
+        cursor = base64.urlsafe_b64encode(payload.encode()).decode()
+        return replace_query_param(self.base_url, self.cursor_query_param, cursor)
+
+    def decode_cursor(self, request):
+        """``(key values, reverse)`` from the request, ``(None, False)`` if absent."""
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+            raw = payload["v"]
+            if len(raw) != len(self.fields):
+                raise ValueError
+            values = [field.to_python(value) for field, value in zip(self.fields, raw)]
+            return values, bool(payload.get("r"))
+        except (TypeError, ValueError, KeyError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+
+class CourtKeysetPagination(KeysetPagination):
+    ordering = ("-created_at", "-id")
+
+
+class BookingKeysetPagination(KeysetPagination):
+    ordering = ("-booking_date", "-start_time", "-id")
+
+
+class SelectablePaginationMixin:
+    """
+    Lets a view keep page-number pagination by default while clients opt in to
+    ``keyset_pagination_class`` with ``?pagination=cursor`` (follow-up links
+    carry ``cursor=``). Keyset pages use their own fixed ordering.
+    """
+
+    keyset_pagination_class = None
+
+    @property
+    def paginator(self):
+        if not hasattr(self, "_paginator"):
+            params = self.request.query_params
+            if self.keyset_pagination_class is not None and (
+                params.get("pagination") == "cursor" or "cursor" in params
+            ):
+                self._paginator = self.keyset_pagination_class()
+            else:
+                self._paginator = super().paginator
+        return self._paginator
@@ -0,0 +1,121 @@
+# common/querystats.py
+"""
+Per-request database query accounting.
+
+A single execute wrapper is attached to every database connection as it is
+opened (``connection_created``). While a ``QueryStats`` collector is active in
+the current context it records each query's SQL and duration; otherwise the
+wrapper is a pass-through. Collectors live in a ContextVar, so they follow
+a request across threads handed work by ``sync_to_async`` (async views) and
+never see queries from concurrent requests.
+
+``QueryBudgetMiddleware`` (common/middleware.py) reports the totals per
+request; ``assert_max_queries`` is the same check for tests.
+"""
+
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+# every active collector (they nest: a test helper around a request that the
+# middleware also measures)
+_collectors = ContextVar("query_stats", default=())
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class QueryStats:
+    def __init__(self):
+        self.queries = []  # (sql, seconds)
+
+    @property
+    def count(self):
+        return len(self.queries)
+
+    @property
+    def time_ms(self):
+        return sum(seconds for _, seconds in self.queries) * 1000
+
+    def repeated(self):
+        """``{sql: times}`` for statements run more than once (N+1 suspects)."""
+        counts = Counter(sql for sql, _ in self.queries)
+        return {sql: times for sql, times in counts.items() if times > 1}
+
+    @property
+    def duplicates(self):
+        """Queries beyond the first of each distinct statement."""
+        return self.count - len({sql for sql, _ in self.queries})
+
+    def summary(self, limit=5):
+        lines = [
+            f"{self.count} queries, {self.time_ms:.1f} ms, "
+            f"{self.duplicates} duplicates"
+        ]
+        repeated = sorted(self.repeated().items(), key=lambda item: -item[1])
+        for sql, times in repeated[:limit]:
+            lines.append(f"  {times}x {sql}")
+        return "\n".join(lines)
+
+
+def record_query(execute, sql, params, many, context):
+    collectors = _collectors.get()
+    if not collectors:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        # placeholders, not params: N+1 loops repeat the same statement
+        entry = (sql, time.perf_counter() - started)
+        for stats in collectors:
+            stats.queries.append(entry)
+
+
+def install_wrapper(sender, connection, **kwargs):
+    """connection_created handler: attach record_query once per connection."""
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+connection_created.connect(install_wrapper)
+
+
+@contextmanager
+def collect_queries():
+    """Collect the queries run inside the block into the yielded QueryStats."""
+    # connections opened before this module was imported missed the signal
+    for connection in connections.all(initialized_only=True):
+        install_wrapper(None, connection)
+    stats = QueryStats()
+    token = _collectors.set(_collectors.get() + (stats,))
+    try:
+        yield stats
+    finally:
+        _collectors.reset(token)
+
+
+@contextmanager
+def assert_max_queries(budget, max_duplicates=None):
+    """
+    Fail if the block runs more than ``budget`` queries (or, when given, more
+    than ``max_duplicates`` repeated statements)::
+
+        with assert_max_queries(3, max_duplicates=0):
+            client.get("/api/courts/courts/")
+    """
+    with collect_queries() as stats:
+        yield stats
+    if stats.count > budget:
+        raise QueryBudgetExceeded(
+            f"query budget of {budget} exceeded:\n{stats.summary()}"
+        )
+    if max_duplicates is not None and stats.duplicates > max_duplicates:
+        raise QueryBudgetExceeded(
+            f"more than {max_duplicates} duplicate queries:\n{stats.summary()}"
+        )
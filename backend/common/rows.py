@@ -0,0 +1,97 @@
+# common/rows.py
+"""
+Fast read path for list endpoints.
+
+A ModelSerializer builds a model instance per row and runs every field
+through DRF's field machinery, which dominates the CPU time of a list page.
+A ``RowSerializer`` reads ``queryset.values()`` dicts instead and formats
+them with plain functions into exactly what the matching ModelSerializer
+returns (same keys, same string formats), so responses and cached listings
+are interchangeable between the two. ``RowListMixin`` serves a viewset's
+``list`` action that way; everything else keeps the DRF serializers.
+"""
+
+from decimal import Decimal
+
+from django.utils import timezone
+from rest_framework.response import Response
+
+
+def quantum(model, name):
+    """``Decimal("0.01")``-style exponent for a DecimalField's places."""
+    return Decimal(1).scaleb(-model._meta.get_field(name).decimal_places)
+
+
+def format_decimal(value, exponent):
+    # DecimalField.to_representation with COERCE_DECIMAL_TO_STRING
+    return None if value is None else f"{value.quantize(exponent):f}"
+
+
+def format_iso(value):
+    # dates and times
+    return None if value is None else value.isoformat()
+
+
+def format_datetime(value):
+    # DateTimeField.to_representation: current timezone, "Z" for UTC
+    if value is None:
+        return None
+    value = timezone.localtime(value).isoformat()
+    if value.endswith("+00:00"):
+        value = value[:-6] + "Z"
+    return value
+
+
+def format_str(value):
+    # UUIDs
+    return None if value is None else str(value)
+
+
+class RowSerializer:
+    """
+    ``RowSerializer(rows, context=...).data`` stands in for
+    ``ModelSerializer(instances, many=True, context=...).data``.
+
+    Subclasses list the ``values()`` columns they read in ``columns`` (plus
+    ``annotations``, read when the queryset has them) and build one output
+    dict per row in ``to_representation``.
+    """
+
+    columns = ()
+    annotations = ()
+
+    def __init__(self, rows, context=None):
+        self.rows = rows
+        self.context = context or {}
+
+    @classmethod
+    def project(cls, queryset):
+        """``queryset`` as the ``values()`` rows this serializer reads."""
+        present = queryset.query.annotations
+        return queryset.values(
+            *cls.columns, *(name for name in cls.annotations if name in present)
+        )
+
+    def to_representation(self, row):
+        raise NotImplementedError
+
+    @property
+    def data(self):
+        to_representation = self.to_representation
+        return [to_representation(row) for row in self.rows]
+
+
+class RowListMixin:
+    """Serves ``list`` from ``values()`` rows via ``row_serializer_class``."""
+
+    row_serializer_class = None
+
+    def list(self, request, *args, **kwargs):
+        serializer_class = self.row_serializer_class
+        queryset = serializer_class.project(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(queryset)
+        rows = queryset if page is None else page
+        data = serializer_class(rows, context=self.get_serializer_context()).data
+        if page is not None:
+            return self.get_paginated_response(data)
+        return Response(data)
@@ -0,0 +1,268 @@
+# courts/async_views.py
+"""
+Async-native read path for court browsing (``/api/courts/browse/...``).
+
+Plain Django ``async def`` views, so under ASGI (``asgi:application`` on
+uvicorn workers, see gunicorn.conf.py) a request waiting on the database does
+not pin a worker thread. They serve the public view of the catalogue — active
+courts only, no authentication — with the same filters, ordering, pagination
+and JSON shapes as the ``CourtViewSet`` list/retrieve/available-slots
+actions; owner/admin views and all writes stay on the DRF viewsets.
+
+Filter and serializer code is shared with the sync views: building a
+queryset and serializing already-fetched rows never touch the database, and
+every query and cache call is awaited here (``acount``, ``aget``,
+``async for``, ``cache.aget``), so a slow cache server does not stall the
+event loop either.
+"""
+
+import json
+from datetime import datetime
+from functools import wraps
+from math import ceil
+
+from asgiref.sync import sync_to_async
+from django.core.paginator import InvalidPage
+from django.http import HttpResponse, StreamingHttpResponse
+from django.views.decorators.http import condition, require_safe
+from rest_framework import filters
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from bookings.holds import occupying
+from bookings.models import Booking
+from common.pagination import CourtKeysetPagination
+from common.renderers import dumps
+from . import cache as court_cache
+from .availability_index import aget_window
+from .filters import CourtFilter, CourtOrderingFilter
+from .models import Court, CourtAvailability
+from .pricing import aget_price_table
+from .realtime import get_broker, slot_channel, slot_state, streams_slot_events
+from .serializers import CourtListRowSerializer, CourtSerializer
+from .slots import (
+    build_day_mask,
+    parse_slot_minutes,
+    serialize_slots,
+    weekday_name,
+)
+from .views import CourtViewSet
+
+# SSE comment sent while idle so proxies keep the stream open
+SLOT_EVENTS_HEARTBEAT = 15
+
+
+def json_response(data, status=200):
+    """JsonResponse, encoded like the DRF views (common/renderers.py)."""
+    return HttpResponse(dumps(data), status=status, content_type="application/json")
+
+
+def error(detail, status=400):
+    if not isinstance(detail, (dict, list)):
+        detail = {"detail": detail}
+    return json_response(detail, status=status)
+
+
+def filter_courts(request, queryset, index_window):
+    """Apply CourtViewSet's filter backends (filterset, ?search=, ordering)."""
+    # the viewset only supplies search/ordering configuration here
+    view = CourtViewSet(request=request, action="list", format_kwarg=None)
+    filterset = CourtFilter(
+        request.query_params,
+        queryset=queryset,
+        request=request,
+        index_window=index_window,
+    )
+    if not filterset.is_valid():
+        raise ValidationError(filterset.errors)
+    queryset = filterset.qs
+    queryset = filters.SearchFilter().filter_queryset(request, queryset, view)
+    return CourtOrderingFilter().filter_queryset(request, queryset, view)
+
+
+async def paginate_by_number(request, queryset):
+    """PageNumberPagination's response, with the count and page awaited."""
+    page_size = api_settings.PAGE_SIZE
+    count = await queryset.acount()
+    num_pages = max(ceil(count / page_size), 1)
+    try:
+        number = int(request.query_params.get("page", 1))
+    except ValueError:
+        raise InvalidPage
+    if not 1 <= number <= num_pages:
+        raise InvalidPage
+
+    offset = (number - 1) * page_size
+    rows = [row async for row in queryset[offset : offset + page_size]]
+    url = request.build_absolute_uri()
+    previous = None
+    if number > 1:
+        previous = (
+            remove_query_param(url, "page")
+            if number == 2
+            else replace_query_param(url, "page", number - 1)
+        )
+    next_url = replace_query_param(url, "page", number + 1)
+    return rows, {
+        "count": count,
+        "next": next_url if number < num_pages else None,
+        "previous": previous,
+    }
+
+
+@require_safe
+async def court_list(request):
+    request = Request(request)
+    params = request.query_params
+    cache = court_cache.get_cache()
+    key = await court_cache.alisting_cache_key(request)
+    data = await cache.aget(key)
+    if data is not None:
+        return json_response(data)
+
+    queryset = Court.objects.filter(is_active=True)
+    try:
+        queryset = filter_courts(request, queryset, await aget_window() or ())
+    except ValidationError as exc:
+        return error(exc.detail)
+    queryset = CourtListRowSerializer.project(queryset)
+
+    if params.get("pagination") == "cursor" or "cursor" in params:
+        paginator = CourtKeysetPagination()
+        try:
+            rows = await paginator.apaginate_queryset(queryset, request)
+        except NotFound as exc:
+            return error(str(exc.detail), status=404)
+        results = CourtListRowSerializer(rows, context={"request": request}).data
+        data = paginator.get_paginated_data(results)
+    else:
+        try:
+            rows, links = await paginate_by_number(request, queryset)
+        except InvalidPage:
+            return error("Invalid page.", status=404)
+        results = CourtListRowSerializer(rows, context={"request": request}).data
+        data = {**links, "results": results}
+
+    await cache.aset(key, data, court_cache.get_timeout())
+    return json_response(data)
+
+
+def conditional_on_court(view):
+    """
+    ``condition()`` with the court's ETag/Last-Modified (courts/cache.py),
+    computed with awaited cache calls before the view runs.
+    """
+
+    @wraps(view)
+    async def inner(request, pk, *args, **kwargs):
+        etag, last_modified = await court_cache.acourt_validators(request, pk)
+        conditional = condition(
+            etag_func=lambda *args, **kwargs: etag,
+            last_modified_func=lambda *args, **kwargs: last_modified,
+        )
+        return await conditional(view)(request, pk, *args, **kwargs)
+
+    return inner
+
+
+@require_safe
+@conditional_on_court
+async def court_detail(request, pk):
+    request = Request(request)
+    try:
+        court = (
+            await Court.objects.filter(is_active=True)
+            .prefetch_related("images", "availabilities")
+            .aget(pk=pk)
+        )
+    except Court.DoesNotExist:
+        return error("No Court matches the given query.", status=404)
+    return json_response(CourtSerializer(court, context={"request": request}).data)
+
+
+@require_safe
+@conditional_on_court
+async def court_available_slots(request, pk):
+    date_str = request.GET.get("date")
+    if not date_str:
+        return error("date is required (YYYY-MM-DD).")
+    try:
+        booking_date = datetime.strptime(date_str, "%Y-%m-%d").date()
+        slot_minutes = parse_slot_minutes(request.GET.get("slot_size"))
+    except ValueError as exc:
+        return error(str(exc))
+
+    court = (
+        await Court.objects.filter(is_active=True, pk=pk)
+        .values_list("price_per_hour", "prices_changed_at")
+        .afirst()
+    )
+    if court is None:
+        return error("No Court matches the given query.", status=404)
+
+    windows = [
+        window
+        async for window in CourtAvailability.objects.filter(
+            court_id=pk, day_of_week=weekday_name(booking_date)
+        ).values_list("start_time", "end_time")
+    ]
+    if not windows:
+        return json_response({"date": date_str, "slots": []})
+
+    busy = [
+        booking
+        async for booking in Booking.objects.filter(
+            occupying(), court_id=pk, booking_date=booking_date
+        ).values_list("start_time", "end_time")
+    ]
+    mask = build_day_mask(windows, busy)
+    prices = await aget_price_table(pk, *court)
+    return json_response(
+        {
+            "date": date_str,
+            "slot_size_minutes": slot_minutes,
+            "slots": serialize_slots(mask, slot_minutes, prices.quote(booking_date)),
+        }
+    )
+
+
+@require_safe
+async def court_slot_events(request, pk):
+    """
+    Server-Sent Events stream of one court-day's free time (ASGI only):
+    the current state on connect, then a fresh snapshot after every booking
+    change (courts/realtime.py). Each ``slots`` event's data is
+    ``{"court", "date", "free": [["HH:MM", "HH:MM"], ...]}``.
+    """
+    if not streams_slot_events():
+        # a process-local broker would silently miss other workers' changes
+        return error(
+            "Live slot updates are not available; poll available-slots.",
+            status=503,
+        )
+    try:
+        day = datetime.strptime(request.GET.get("date", ""), "%Y-%m-%d").date()
+    except ValueError:
+        return error("date is required (YYYY-MM-DD).")
+    if not await Court.objects.filter(is_active=True, pk=pk).aexists():
+        return error("No Court matches the given query.", status=404)
+
+    async def stream():
+        async with get_broker().subscribe(slot_channel(pk, day)) as subscription:
+            # read the state only once subscribed, so no change falls between
+            state = await sync_to_async(slot_state)(pk, day)
+            yield f"event: slots\ndata: {json.dumps(state)}\n\n"
+            while True:
+                message = await subscription.get(timeout=SLOT_EVENTS_HEARTBEAT)
+                if message is None:
+                    yield ": keepalive\n\n"
+                else:
+                    yield f"event: slots\ndata: {message}\n\n"
+
+    response = StreamingHttpResponse(stream(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    # stop nginx from buffering the stream
+    response["X-Accel-Buffering"] = "no"
+    return response
@@ -0,0 +1,162 @@
+# courts/availability_index.py
+"""
+Precomputed free-time index behind ``CourtFilter.filter_available``.
+
+For every court and every date in a rolling window (today + N days) the free
+minutes — availability windows minus pending/confirmed bookings — are stored
+as ``CourtFreeInterval`` rows. "Which courts are free on D between A and B"
+then becomes one indexed range lookup instead of two correlated subqueries
+per court.
+
+The window is rolled forward by the ``build_availability_index`` command (run
+it daily). Between runs, booking and availability writes queue a job that
+refreshes just the affected court-days (see ``courts.signals`` and
+``courts.tasks``), so searches trail a write until a job worker has run it.
+Dates outside the window fall back to the live query.
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from bookings.holds import occupying
+from bookings.models import Booking
+from .models import AvailabilityIndexWindow, Court, CourtAvailability, CourtFreeInterval
+from .slots import build_day_masks, iter_free_runs, weekday_name
+
+WINDOW_CACHE_KEY = "courts:availability-index:window"
+WINDOW_CACHE_TIMEOUT = 60
+COURT_BATCH_SIZE = 200
+
+
+def horizon_days():
+    return getattr(settings, "AVAILABILITY_INDEX_DAYS", 60)
+
+
+def get_window():
+    """``(start_date, end_date)`` the index covers, or None if never built."""
+    window = cache.get(WINDOW_CACHE_KEY)
+    if window is None:
+        row = AvailabilityIndexWindow.objects.values_list(
+            "start_date", "end_date"
+        ).first()
+        window = row or ()
+        cache.set(WINDOW_CACHE_KEY, window, WINDOW_CACHE_TIMEOUT)
+    return window or None
+
+
+async def aget_window():
+    """get_window() for async views."""
+    window = await cache.aget(WINDOW_CACHE_KEY)
+    if window is None:
+        row = await AvailabilityIndexWindow.objects.values_list(
+            "start_date", "end_date"
+        ).afirst()
+        window = row or ()
+        await cache.aset(WINDOW_CACHE_KEY, window, WINDOW_CACHE_TIMEOUT)
+    return window or None
+
+
+def covers(day, window=None):
+    """Whether ``day`` is indexed; pass ``window`` to skip the lookup."""
+    if window is None:
+        window = get_window()
+    return bool(window) and window[0] <= day <= window[1]
+
+
+def compute_intervals(court_ids, dates):
+    """Unsaved CourtFreeInterval rows for every court-day (three queries)."""
+    windows = CourtAvailability.objects.filter(
+        court_id__in=court_ids,
+        day_of_week__in={weekday_name(day) for day in dates},
+    ).values_list("court_id", "day_of_week", "start_time", "end_time")
+    busy = Booking.objects.filter(
+        occupying(),
+        court_id__in=court_ids,
+        booking_date__in=dates,
+    ).values_list("court_id", "booking_date", "start_time", "end_time")
+
+    return [
+        CourtFreeInterval(
+            court_id=court_id, date=day, start_minute=start, end_minute=end
+        )
+        for court_id, days in build_day_masks(court_ids, dates, windows, busy).items()
+        for day, mask in days.items()
+        for start, end in iter_free_runs(mask)
+    ]
+
+
+def refresh_court_days(court_id, dates):
+    """Recompute the index for one court on ``dates`` (those inside the window)."""
+    dates = sorted({day for day in dates if covers(day)})
+    if not dates:
+        return
+    with transaction.atomic():
+        # serialize refreshes per court so the last writer sees every commit
+        locked = list(
+            Court.objects.select_for_update()
+            .filter(pk=court_id)
+            .values_list("pk", flat=True)
+        )
+        CourtFreeInterval.objects.filter(court_id=court_id, date__in=dates).delete()
+        if locked:
+            CourtFreeInterval.objects.bulk_create(compute_intervals([court_id], dates))
+
+
+def refresh_court_weekdays(court_id, weekdays):
+    """Recompute every indexed date of ``court_id`` falling on ``weekdays``."""
+    window = get_window()
+    if not window:
+        return
+    start, end = window
+    dates = [
+        start + timedelta(days=offset)
+        for offset in range((end - start).days + 1)
+        if weekday_name(start + timedelta(days=offset)) in weekdays
+    ]
+    refresh_court_days(court_id, dates)
+
+
+def build_dates(dates):
+    """Index ``dates`` for every court, COURT_BATCH_SIZE courts at a time."""
+    court_ids = list(Court.objects.order_by("pk").values_list("pk", flat=True))
+    for offset in range(0, len(court_ids), COURT_BATCH_SIZE):
+        batch = court_ids[offset : offset + COURT_BATCH_SIZE]
+        CourtFreeInterval.objects.bulk_create(
+            compute_intervals(batch, dates), batch_size=1000
+        )
+
+
+def roll_forward(today=None, rebuild=False):
+    """
+    Move the window to ``[today, today + horizon)``: drop past dates and index
+    only the newly uncovered ones (or everything with ``rebuild``).
+    Returns the number of dates indexed.
+    """
+    today = today or timezone.localdate()
+    end = today + timedelta(days=horizon_days() - 1)
+    with transaction.atomic():
+        state = AvailabilityIndexWindow.objects.select_for_update().first()
+        if rebuild or state is None or not state.start_date <= today <= state.end_date:
+            CourtFreeInterval.objects.all().delete()
+            first_new = today
+        else:
+            CourtFreeInterval.objects.filter(date__lt=today).delete()
+            first_new = state.end_date + timedelta(days=1)
+
+        dates = [
+            first_new + timedelta(days=offset)
+            for offset in range((end - first_new).days + 1)
+        ]
+        if dates:
+            build_dates(dates)
+
+        if state is None:
+            state = AvailabilityIndexWindow()
+        state.start_date, state.end_date = today, end
+        state.save()
+    cache.delete(WINDOW_CACHE_KEY)
+    return len(dates)
@@ -0,0 +1,185 @@
+# courts/cache.py
+"""
+Read-through cache for anonymous court listings.
+
+Entries live in a Django cache alias (``COURT_LIST_CACHE_ALIAS``), so the
+backend is whatever ``CACHES`` configures: local-memory LRU by default, Redis
+when ``REDIS_URL`` is set, or any in-process stand-in in tests.
+
+Keys embed a generation number. Writes to courts, images, availability or
+bookings bump the generation (see ``courts.signals``), which orphans every
+cached listing at once without scanning keys; orphans age out via TTL/LRU.
+
+The same writes (plus price rule writes) also move ``Court.changed_at``
+after commit. It backs the ETag/Last-Modified validators of court detail and
+slot responses (``court_etag`` / ``court_last_modified``). It is a database
+column rather than a cache entry so that every worker sees it, whichever
+cache backend is configured. A pending booking's hold can lapse without any
+write (reads treat it as free straight away, see bookings.holds), so the
+validators also include the court's next hold deadline: once it passes, the
+ETag changes and Last-Modified moves to that deadline. Computing them costs
+one query.
+"""
+
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import OuterRef, Subquery
+from django.utils import timezone
+
+from bookings.models import Booking
+from .models import Court
+
+GENERATION_KEY = "courts:list:gen"
+
+
+def get_cache():
+    return caches[getattr(settings, "COURT_LIST_CACHE_ALIAS", "default")]
+
+
+def get_timeout():
+    return getattr(settings, "COURT_LIST_CACHE_TIMEOUT", 60)
+
+
+def current_generation():
+    # seeded from the clock so a lost/evicted counter never reuses old keys
+    return get_cache().get_or_set(GENERATION_KEY, time.time_ns, timeout=None)
+
+
+async def acurrent_generation():
+    """current_generation() for async views."""
+    return await get_cache().aget_or_set(GENERATION_KEY, time.time_ns, timeout=None)
+
+
+def bump_generation():
+    """Invalidate every cached listing."""
+    cache = get_cache()
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        # key missing or evicted: a fresh clock-seeded value is already new
+        cache.add(GENERATION_KEY, time.time_ns(), timeout=None)
+
+
+def listing_digest(request):
+    """
+    Digest of a listing request: host + path + query params with empty values
+    dropped and keys/values sorted, so equivalent URLs share an entry.
+    """
+    params = sorted(
+        (key, value)
+        for key, values in request.query_params.lists()
+        for value in values
+        if value != ""
+    )
+    raw = "|".join(
+        [request.get_host(), request.path] + [f"{key}={value}" for key, value in params]
+    )
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+def listing_cache_key(request):
+    """Cache key for a listing request in the current generation."""
+    return f"courts:list:{current_generation()}:{listing_digest(request)}"
+
+
+async def alisting_cache_key(request):
+    """listing_cache_key() for async views."""
+    return f"courts:list:{await acurrent_generation()}:{listing_digest(request)}"
+
+
+def bump_court_version(court_id):
+    """Invalidate validators of ``court_id``'s detail and slot responses."""
+    Court.objects.filter(pk=court_id).update(changed_at=timezone.now())
+
+
+def parse_court_id(pk):
+    try:
+        return int(pk)
+    except (TypeError, ValueError):
+        return None
+
+
+def court_state(court_id, now):
+    """
+    Query for the court's ``(changed_at, next_deadline, last_deadline)``:
+    the earliest hold deadline still ahead and the latest one already passed
+    among its pending bookings (both read from booking_pending_hold_idx).
+    """
+    holds = Booking.objects.filter(court_id=OuterRef("pk"), status="pending")
+    return (
+        Court.objects.filter(pk=court_id)
+        .annotate(
+            next_deadline=Subquery(
+                holds.filter(hold_expires_at__gt=now)
+                .order_by("hold_expires_at")
+                .values("hold_expires_at")[:1]
+            ),
+            last_deadline=Subquery(
+                holds.filter(hold_expires_at__lte=now)
+                .order_by("-hold_expires_at")
+                .values("hold_expires_at")[:1]
+            ),
+        )
+        .values_list("changed_at", "next_deadline", "last_deadline")
+    )
+
+
+def microseconds(value):
+    return 0 if value is None else int(value.timestamp() * 1_000_000)
+
+
+def validators(request, court_id, state):
+    """
+    ``(etag, last_modified)`` from a ``court_state`` row. The ETag adds a
+    digest of the query string and response format, so each variant (date,
+    slot size, JSON vs browsable API) validates separately.
+    """
+    if state is None:
+        return None, None
+    changed_at, next_deadline, last_deadline = state
+    renderer = getattr(request, "accepted_renderer", None)
+    variant = "|".join(
+        [getattr(renderer, "format", "json")]
+        + [f"{key}={value}" for key, value in sorted(request.GET.items())]
+    )
+    digest = hashlib.sha1(variant.encode()).hexdigest()[:12]
+    etag = (
+        f'"{court_id}-{microseconds(changed_at)}-'
+        f'{microseconds(next_deadline)}-{digest}"'
+    )
+    return etag, max(changed_at, last_deadline or changed_at)
+
+
+def court_validators(request, pk):
+    """``(etag, last_modified)``, looked up once per request."""
+    cached = getattr(request, "_court_validators", None)
+    if cached is not None:
+        return cached
+    court_id = parse_court_id(pk)
+    state = None
+    if court_id is not None:
+        state = court_state(court_id, timezone.now()).first()
+    request._court_validators = validators(request, court_id, state)
+    return request._court_validators
+
+
+def court_etag(request, pk, *args, **kwargs):
+    """``condition()`` etag_func (see ``validators``)."""
+    return court_validators(request, pk)[0]
+
+
+def court_last_modified(request, pk, *args, **kwargs):
+    """``condition()`` last_modified_func (see ``validators``)."""
+    return court_validators(request, pk)[1]
+
+
+async def acourt_validators(request, pk):
+    """court_validators() for async views, with the query awaited."""
+    court_id = parse_court_id(pk)
+    if court_id is None:
+        return None, None
+    state = await court_state(court_id, timezone.now()).afirst()
+    return validators(request, court_id, state)
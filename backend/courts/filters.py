@@ -2,7 +2,14 @@
 import django_filters as df
 from django.db.models import Exists, OuterRef, Q
 from datetime import datetime
-from .models import Court, CourtAvailability
+from rest_framework import filters
+from rest_framework.exceptions import ValidationError
+from .models import Court, CourtAvailability, CourtFreeInterval
+from .availability_index import covers
+from .slots import to_minute
+from .search import search_courts
+from .geo import DEFAULT_RADIUS_KM, MAX_RADIUS_KM, within_radius
+from bookings.holds import occupying
 from bookings.models import Booking
 
 
@@ -13,6 +20,13 @@ class CourtFilter(df.FilterSet):
     price_min = df.NumberFilter(field_name="price_per_hour", lookup_expr="gte")
     price_max = df.NumberFilter(field_name="price_per_hour", lookup_expr="lte")
 
+    # ranked full-text search (see courts/search.py)
+    q = df.CharFilter(method="filter_search")
+
+    # proximity (expect query params: near=LAT,LNG[&radius_km=10])
+    near = df.CharFilter(method="filter_near")
+    radius_km = df.NumberFilter(method="filter_radius")
+
     # availability params (expect query params: date=YYYY-MM-DD&start=HH:MM&end=HH:MM)
     date = df.DateFilter(method="filter_available")
     start = df.TimeFilter(method="filter_available")
@@ -22,12 +36,48 @@ class CourtFilter(df.FilterSet):
         model = Court
         fields = ["sport_type", "city", "price_min", "price_max"]
 
+    def __init__(self, *args, index_window=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        # async views look the index window up themselves (a filter method
+        # cannot await); an empty tuple means "no index"
+        self.index_window = index_window
+
+    def filter_search(self, queryset, name, value):
+        value = value.strip()
+        if not value:
+            return queryset
+        return search_courts(queryset, value)
+
+    def filter_near(self, queryset, name, value):
+        try:
+            lat, lng = (float(part) for part in value.split(","))
+        except ValueError:
+            raise ValidationError({"near": "Expected near=LAT,LNG."})
+        if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+            raise ValidationError({"near": "Coordinates out of range."})
+
+        radius = self.form.cleaned_data.get("radius_km")
+        radius = float(radius) if radius is not None else DEFAULT_RADIUS_KM
+        if not 0 < radius <= MAX_RADIUS_KM:
+            raise ValidationError(
+                {"radius_km": f"Must be between 0 and {MAX_RADIUS_KM}."}
+            )
+        return within_radius(queryset, lat, lng, radius)
+
+    def filter_radius(self, queryset, name, value):
+        # consumed by filter_near
+        return queryset
+
     def filter_available(self, queryset, name, value):
         """
-        When any of date/start/end are present, enforce:
+        When all of date/start/end are present, enforce (via the availability
+        index when it covers the date, else with live subqueries):
         1) Court has an availability window that fully covers [start, end] on that weekday.
         2) There is NO booking that overlaps [start, end] for that court on that date (pending/confirmed).
         """
+        # date/start/end all route here; apply the filter once
+        if name != "date":
+            return queryset
         request = self.request
         date_str = request.query_params.get("date")
         start_str = request.query_params.get("start")
@@ -45,6 +95,18 @@ class CourtFilter(df.FilterSet):
             # invalid window -> return empty
             return queryset.none()
 
+        if covers(booking_date, self.index_window):
+            # one indexed lookup on the precomputed free intervals
+            free = CourtFreeInterval.objects.filter(
+                date=booking_date,
+                start_minute__lte=to_minute(start_time),
+                end_minute__gte=to_minute(end_time, ceil=True),
+            )
+            return queryset.filter(
+                pk__in=free.values("court_id"),
+                is_active=True,
+            )
+
         weekday_name = booking_date.strftime("%A").lower()  # e.g., 'monday'
 
         # 1) availability window covers the requested range
@@ -57,9 +119,9 @@ class CourtFilter(df.FilterSet):
 
         # 2) no overlapping bookings on that date
         overlap = Booking.objects.filter(
+            occupying(),
             court=OuterRef("pk"),
             booking_date=booking_date,
-            status__in=["pending", "confirmed"],
         ).filter(~(Q(end_time__lte=start_time) | Q(start_time__gte=end_time)))
 
         return queryset.annotate(
@@ -70,3 +132,24 @@ class CourtFilter(df.FilterSet):
             has_overlap=False,
             is_active=True,
         )
+
+
+def default_ordering(params):
+    """Relevance for ?q= searches, distance for ?near= lookups, else None."""
+    if params.get("q", "").strip():
+        return ["-search_rank", "-created_at"]
+    if params.get("near"):
+        return ["distance_km", "-created_at"]
+    return None
+
+
+class CourtOrderingFilter(filters.OrderingFilter):
+    """
+    Without an explicit ?ordering=, order by relevance for ?q= searches and by
+    distance for ?near= lookups.
+    """
+
+    def get_default_ordering(self, view):
+        return default_ordering(view.request.query_params) or (
+            super().get_default_ordering(view)
+        )
@@ -0,0 +1,88 @@
+# courts/geo.py
+"""
+Nearest-court lookups without PostGIS.
+
+Every court with coordinates is assigned a grid cell (``Court.geo_cell``) on a
+fixed CELL_DEGREES lat/lng grid. A radius query enumerates the cells covering
+the search circle's bounding box (an indexed ``IN`` lookup), trims with the box
+itself, then computes the exact haversine distance in SQL for the survivors.
+"""
+
+import math
+
+from django.db.models import F, FloatField
+from django.db.models.functions import ASin, Cast, Cos, Power, Radians, Sin, Sqrt
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE_LAT = 111.32
+CELL_DEGREES = 0.25
+CELL_COLUMNS = int(360 / CELL_DEGREES)
+CELL_ROWS = int(180 / CELL_DEGREES)
+# beyond this many cells the IN list costs more than it saves
+MAX_CELLS = 400
+
+DEFAULT_RADIUS_KM = 10
+MAX_RADIUS_KM = 200
+
+
+def cell_for(lat, lng):
+    """Grid cell id for a coordinate, or None when either part is missing."""
+    if lat is None or lng is None:
+        return None
+    row = min(int((float(lat) + 90) // CELL_DEGREES), CELL_ROWS - 1)
+    col = int((float(lng) + 180) // CELL_DEGREES) % CELL_COLUMNS
+    return row * CELL_COLUMNS + col
+
+
+def bounding_box(lat, lng, radius_km):
+    """``(min_lat, max_lat, min_lng, max_lng)`` enclosing the search circle."""
+    dlat = radius_km / KM_PER_DEGREE_LAT
+    cos_lat = max(math.cos(math.radians(lat)), 1e-6)
+    dlng = min(radius_km / (KM_PER_DEGREE_LAT * cos_lat), 180)
+    return (
+        max(lat - dlat, -90),
+        min(lat + dlat, 90),
+        lng - dlng,
+        lng + dlng,
+    )
+
+
+def cells_for_box(min_lat, max_lat, min_lng, max_lng):
+    """Cell ids covering the box (wrapping the antimeridian), or None if too many."""
+    first_row = cell_for(min_lat, 0) // CELL_COLUMNS
+    last_row = cell_for(max_lat, 0) // CELL_COLUMNS
+    first_col = math.floor((min_lng + 180) / CELL_DEGREES)
+    last_col = math.floor((max_lng + 180) / CELL_DEGREES)
+    cols = {col % CELL_COLUMNS for col in range(first_col, last_col + 1)}
+    if (last_row - first_row + 1) * len(cols) > MAX_CELLS:
+        return None
+    return [
+        row * CELL_COLUMNS + col
+        for row in range(first_row, last_row + 1)
+        for col in sorted(cols)
+    ]
+
+
+def haversine_km(lat, lng):
+    """SQL expression for the great-circle distance from ``(lat, lng)`` in km."""
+    lat_r = math.radians(lat)
+    row_lat = Radians(Cast(F("lat"), FloatField()))
+    row_lng = Radians(Cast(F("lng"), FloatField()))
+    half_dlat = Sin((row_lat - lat_r) / 2)
+    half_dlng = Sin((row_lng - math.radians(lng)) / 2)
+    a = Power(half_dlat, 2) + math.cos(lat_r) * Cos(row_lat) * Power(half_dlng, 2)
+    return 2 * EARTH_RADIUS_KM * ASin(Sqrt(a), output_field=FloatField())
+
+
+def within_radius(queryset, lat, lng, radius_km):
+    """Courts within ``radius_km`` of ``(lat, lng)``, annotated with ``distance_km``."""
+    min_lat, max_lat, min_lng, max_lng = bounding_box(lat, lng, radius_km)
+    cells = cells_for_box(min_lat, max_lat, min_lng, max_lng)
+    if cells is not None:
+        queryset = queryset.filter(geo_cell__in=cells)
+    queryset = queryset.filter(lat__gte=min_lat, lat__lte=max_lat)
+    if -180 <= min_lng and max_lng <= 180:
+        queryset = queryset.filter(lng__gte=min_lng, lng__lte=max_lng)
+    return queryset.annotate(distance_km=haversine_km(lat, lng)).filter(
+        distance_km__lte=radius_km
+    )
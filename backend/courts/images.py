@@ -0,0 +1,173 @@
+# courts/images.py
+"""
+Upload pipeline for CourtImage and the denormalized court cover.
+
+Uploads are checked in the request (``validate_upload``: size, format, pixel
+count) and stored as sent. A background job (courts.tasks) then, off the
+request path:
+
+* renders WebP renditions at each THUMBNAIL_WIDTHS width the photo reaches
+  (stored under ``court_images/thumbs/``, paths kept in
+  ``CourtImage.thumbnails``), exposed to clients as a ``srcset``;
+* replaces the original with an upright WebP re-encode, capped at
+  ORIGINAL_MAX_DIMENSION, without EXIF (camera, GPS) — only the colour
+  profile is kept.
+
+Until the job has run, clients get the raw upload and no renditions. The
+court's first image (lowest pk, matching the old ``images.first()``) is
+copied onto ``Court.cover_image``/``cover_thumbnails`` so listings never have
+to touch the images table.
+"""
+
+import logging
+from io import BytesIO
+from pathlib import PurePosixPath
+
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps, UnidentifiedImageError
+from rest_framework import serializers
+
+from .models import Court, CourtImage
+
+logger = logging.getLogger(__name__)
+
+# label -> max width in px
+THUMBNAIL_WIDTHS = {"small": 320, "medium": 640, "large": 1280, "xlarge": 1920}
+THUMBNAIL_QUALITY = 80
+ORIGINAL_MAX_DIMENSION = 2560
+ORIGINAL_QUALITY = 85
+
+MAX_UPLOAD_BYTES = 15 * 1024 * 1024
+# well below Pillow's decompression-bomb limit; ~a 48 MP phone sensor
+MAX_UPLOAD_PIXELS = 50_000_000
+# MPO: multi-picture JPEG written by many phone cameras
+UPLOAD_FORMATS = {"JPEG", "MPO", "PNG", "WEBP", "AVIF"}
+
+
+def validate_upload(upload):
+    """
+    Reject uploads the pipeline should not take on. Runs after DRF's
+    ImageField, which has already opened the file with Pillow (headers only).
+    """
+    if upload.size > MAX_UPLOAD_BYTES:
+        raise serializers.ValidationError(
+            f"Images must be at most {MAX_UPLOAD_BYTES // (1024 * 1024)} MB."
+        )
+    image = getattr(upload, "image", None)
+    if image is None:
+        return upload
+    if image.format not in UPLOAD_FORMATS:
+        raise serializers.ValidationError("Upload a JPEG, PNG, WebP or AVIF image.")
+    width, height = image.size
+    if width * height > MAX_UPLOAD_PIXELS:
+        raise serializers.ValidationError("Image dimensions are too large.")
+    return upload
+
+
+def thumbnail_path(name, label):
+    return f"court_images/thumbs/{PurePosixPath(name).stem}_{label}.webp"
+
+
+def open_source(image_field):
+    """The stored image decoded and turned upright, or None if unreadable."""
+    try:
+        with image_field.open("rb") as fh:
+            source = Image.open(fh)
+            source.load()
+    except (OSError, UnidentifiedImageError, Image.DecompressionBombError):
+        logger.warning("Cannot read %s", image_field.name)
+        return None
+
+    icc_profile = source.info.get("icc_profile")
+    source = ImageOps.exif_transpose(source)
+    if source.mode not in ("RGB", "RGBA"):
+        source = source.convert(
+            "RGBA" if "transparency" in source.info or "A" in source.mode else "RGB"
+        )
+    # the only metadata carried into re-encodes
+    source.info = {"icc_profile": icc_profile} if icc_profile else {}
+    return source
+
+
+def encode_webp(image, quality):
+    buf = BytesIO()
+    image.save(buf, "WEBP", quality=quality, icc_profile=image.info.get("icc_profile"))
+    return ContentFile(buf.getvalue())
+
+
+def generate_thumbnails(image_field, source=None):
+    """
+    Render the THUMBNAIL_WIDTHS sizes for ``image_field`` and save them to its
+    storage: every width the image reaches, and at least the smallest (never
+    upscaled). Returns ``{label: storage_path}``; ``{}`` if the file is
+    unreadable. ``source`` is the already decoded image, if at hand.
+    """
+    source = source or open_source(image_field)
+    if source is None:
+        return {}
+
+    storage = image_field.storage
+    thumbs = {}
+    for label, width in sorted(THUMBNAIL_WIDTHS.items(), key=lambda item: item[1]):
+        if thumbs and width > source.width:
+            break
+        rendition = source.copy()
+        # bound only the width
+        rendition.thumbnail((width, rendition.height))
+        rendition.info = source.info
+        thumbs[label] = storage.save(
+            thumbnail_path(image_field.name, label),
+            encode_webp(rendition, THUMBNAIL_QUALITY),
+        )
+    return thumbs
+
+
+def sanitize_original(image_field, source):
+    """
+    Save ``source`` as the new original: WebP, longest side capped at
+    ORIGINAL_MAX_DIMENSION, no EXIF. Returns the new storage path; the old
+    file is left for the caller to delete once the row points elsewhere.
+    """
+    original = source.copy()
+    original.thumbnail((ORIGINAL_MAX_DIMENSION, ORIGINAL_MAX_DIMENSION))
+    original.info = source.info
+    stem = PurePosixPath(image_field.name).stem
+    return image_field.storage.save(
+        f"court_images/{stem}.webp", encode_webp(original, ORIGINAL_QUALITY)
+    )
+
+
+def delete_thumbnails(image_field, thumbs):
+    for path in thumbs.values():
+        image_field.storage.delete(path)
+
+
+def thumbnail_urls(image_field, thumbs):
+    """``{label: url}`` for stored thumbnail paths."""
+    storage = image_field.storage
+    return {label: storage.url(path) for label, path in thumbs.items()}
+
+
+def thumbnail_srcset(image_field, thumbs):
+    """``"<url> 320w, <url> 640w, ..."`` for an ``<img srcset>``; None if empty."""
+    storage = image_field.storage
+    candidates = sorted(
+        (THUMBNAIL_WIDTHS[label], storage.url(path))
+        for label, path in thumbs.items()
+        if label in THUMBNAIL_WIDTHS
+    )
+    return ", ".join(f"{url} {width}w" for width, url in candidates) or None
+
+
+def refresh_cover(court_id):
+    """Copy the court's first image and its thumbnails onto the Court row."""
+    first = (
+        CourtImage.objects.filter(court_id=court_id)
+        .order_by("pk")
+        .values("image", "thumbnails")
+        .first()
+    )
+    Court.objects.filter(pk=court_id).update(
+        cover_image=first["image"] if first else "",
+        cover_thumbnails=first["thumbnails"] if first else {},
+    )
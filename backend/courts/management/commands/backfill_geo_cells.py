@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from courts.geo import cell_for
+from courts.models import Court
+
+
+class Command(BaseCommand):
+    help = "Recompute Court.geo_cell from lat/lng for every court."
+
+    def handle(self, *args, **opts):
+        updated = 0
+        rows = Court.objects.values_list("pk", "lat", "lng", "geo_cell")
+        for pk, lat, lng, current in rows.iterator(chunk_size=1000):
+            cell = cell_for(lat, lng)
+            if cell != current:
+                Court.objects.filter(pk=pk).update(geo_cell=cell)
+                updated += 1
+        self.stdout.write(self.style.SUCCESS(f"Updated {updated} courts."))
@@ -0,0 +1,126 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.text import compress_string
+from rest_framework.renderers import JSONRenderer
+
+from bookings.models import Booking
+from bookings.serializers import BookingRowSerializer, BookingSerializer
+from common.benchmark import percentile
+from common.middleware import CompressionMiddleware, brotli
+from common.renderers import ORJSONRenderer
+from courts.models import Court
+from courts.serializers import CourtListRowSerializer, CourtListSerializer
+
+TARGETS = ["court-list", "booking-list"]
+
+
+def timed(func, repeat):
+    """``(result of the last call, sorted per-call milliseconds)``."""
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        times.append((time.perf_counter() - started) * 1000)
+    return result, sorted(times)
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares the list endpoints' DRF serializers and stock JSON renderer "
+        "with the values()-row serializers and orjson renderer (common/rows.py, "
+        "common/renderers.py) on the configured database, and reports the "
+        "payload size under gzip and Brotli. Run seed_benchmark first for "
+        "representative data. Each path's output is checked to be identical."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--targets",
+            default=",".join(TARGETS),
+            help=f"Subset of {','.join(TARGETS)}.",
+        )
+        parser.add_argument(
+            "--rows", type=int, default=100, help="Rows per simulated page."
+        )
+        parser.add_argument(
+            "--repeat", type=int, default=50, help="Timed runs per path."
+        )
+
+    def handle(self, *args, **opts):
+        targets = [name for name in opts["targets"].split(",") if name]
+        unknown = set(targets) - set(TARGETS)
+        if unknown:
+            raise CommandError(f"Unknown targets: {', '.join(sorted(unknown))}")
+
+        self.stdout.write(
+            f"{'target':<14} {'path':<5} {'rows':>5} {'fetch+ser p50':>14} "
+            f"{'p95':>8} {'render p50':>11} {'bytes':>8}"
+        )
+        for name in targets:
+            queryset, serializer, row_serializer = self.target(name)
+            rows = opts["rows"]
+            drf = self.run(
+                name,
+                "drf",
+                lambda: serializer(list(queryset[:rows]), many=True).data,
+                JSONRenderer(),
+                opts["repeat"],
+            )
+            fast = self.run(
+                name,
+                "fast",
+                lambda: row_serializer(
+                    list(row_serializer.project(queryset)[:rows])
+                ).data,
+                ORJSONRenderer(),
+                opts["repeat"],
+            )
+            if drf != fast:
+                raise CommandError(f"{name}: the two paths render differently.")
+            self.report_compression(name, fast, opts["repeat"])
+
+    def target(self, name):
+        if name == "court-list":
+            queryset = Court.objects.filter(is_active=True).order_by(
+                "-created_at", "-id"
+            )
+            return queryset, CourtListSerializer, CourtListRowSerializer
+        queryset = Booking.objects.select_related("court", "user").order_by(
+            "-booking_date", "-start_time", "-id"
+        )
+        return queryset, BookingSerializer, BookingRowSerializer
+
+    def run(self, name, path, serialize, renderer, repeat):
+        data, serialize_ms = timed(serialize, repeat)
+        body, render_ms = timed(lambda: renderer.render(data), repeat)
+        self.stdout.write(
+            f"{name:<14} {path:<5} {len(data):>5} "
+            f"{statistics.median(serialize_ms):>14.2f} "
+            f"{percentile(serialize_ms, 0.95):>8.2f} "
+            f"{statistics.median(render_ms):>11.2f} {len(body):>8}"
+        )
+        return body
+
+    def report_compression(self, name, body, repeat):
+        middleware = CompressionMiddleware
+        codecs = [
+            (
+                "gzip",
+                lambda: compress_string(
+                    body, max_random_bytes=middleware.max_random_bytes
+                ),
+            )
+        ]
+        if brotli is not None:
+            codecs.append(
+                ("br", lambda: brotli.compress(body, quality=middleware.brotli_quality))
+            )
+        for coding, compress in codecs:
+            compressed, ms = timed(compress, repeat)
+            self.stdout.write(
+                f"  {name} {coding}: {len(compressed)} bytes "
+                f"({len(compressed) / max(len(body), 1):.0%}), "
+                f"{statistics.median(ms):.2f} ms"
+            )
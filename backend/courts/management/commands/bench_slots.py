@@ -0,0 +1,103 @@
+import random
+import timeit
+from datetime import date, datetime, time, timedelta
+
+from django.core.management.base import BaseCommand
+
+from courts.slots import build_day_mask, serialize_slots
+
+
+def legacy_slots(booking_date, windows, bookings, slot_minutes):
+    """The pre-bitmap available_slots algorithm, kept here as a baseline."""
+
+    def to_dt(t):
+        return datetime.combine(booking_date, t)
+
+    increments = timedelta(minutes=slot_minutes)
+    free_slots = []
+    for av_start, av_end in windows:
+        window_start = to_dt(av_start)
+        window_end = to_dt(av_end)
+        busy = []
+        for b_start, b_end in bookings:
+            b_start, b_end = to_dt(b_start), to_dt(b_end)
+            if b_end <= window_start or b_start >= window_end:
+                continue
+            busy.append((max(window_start, b_start), min(window_end, b_end)))
+        busy.sort()
+        merged = []
+        for s, e in busy:
+            if not merged or s > merged[-1][1]:
+                merged.append((s, e))
+            else:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], e))
+        cursor = window_start
+        for s, e in merged:
+            if cursor < s:
+                free_slots.append((cursor, s))
+            cursor = max(cursor, e)
+        if cursor < window_end:
+            free_slots.append((cursor, window_end))
+
+    discrete = []
+    for s, e in free_slots:
+        cur = s
+        while cur + increments <= e:
+            discrete.append(
+                {
+                    "start": cur.strftime("%H:%M"),
+                    "end": (cur + increments).strftime("%H:%M"),
+                }
+            )
+            cur += increments
+    return discrete
+
+
+def synthetic_day(windows, bookings, seed):
+    """Random non-overlapping availability windows and bookings (15-min grid)."""
+    rng = random.Random(seed)
+    quarters = sorted(rng.sample(range(1, 96), windows * 2))
+    avails = [
+        (time(s // 4, s % 4 * 15), time(e // 4, e % 4 * 15))
+        for s, e in zip(quarters[::2], quarters[1::2])
+    ]
+    busy = []
+    for _ in range(bookings):
+        start = rng.randrange(0, 92)
+        end = start + rng.randint(2, 4)
+        busy.append((time(start // 4, start % 4 * 15), time(end // 4, end % 4 * 15)))
+    return avails, busy
+
+
+class Command(BaseCommand):
+    help = "Micro-benchmark the bitmap slot engine against the legacy algorithm."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--windows", type=int, default=4)
+        parser.add_argument("--bookings", type=int, default=40)
+        parser.add_argument("--slot-size", type=int, default=30)
+        parser.add_argument("--number", type=int, default=2000)
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args, **opts):
+        avails, busy = synthetic_day(opts["windows"], opts["bookings"], opts["seed"])
+        slot = opts["slot_size"]
+        number = opts["number"]
+        day = date.today()
+
+        def run_legacy():
+            return legacy_slots(day, avails, busy, slot)
+
+        def run_bitmap():
+            return serialize_slots(build_day_mask(avails, busy), slot)
+
+        legacy = timeit.timeit(run_legacy, number=number) / number
+        bitmap = timeit.timeit(run_bitmap, number=number) / number
+
+        self.stdout.write(
+            f"{opts['windows']} windows, {opts['bookings']} bookings, "
+            f"{len(run_bitmap())} slots of {slot} min"
+        )
+        self.stdout.write(f"legacy: {legacy * 1e6:9.1f} us/call")
+        self.stdout.write(f"bitmap: {bitmap * 1e6:9.1f} us/call")
+        self.stdout.write(self.style.SUCCESS(f"speedup: {legacy / bitmap:.1f}x"))
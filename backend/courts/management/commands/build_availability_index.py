@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from courts.availability_index import horizon_days, roll_forward
+
+
+class Command(BaseCommand):
+    help = (
+        "Roll the court free-time index forward to today + "
+        "AVAILABILITY_INDEX_DAYS. Run daily."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rebuild",
+            action="store_true",
+            help="Recompute every indexed date instead of only new ones.",
+        )
+
+    def handle(self, *args, **opts):
+        indexed = roll_forward(rebuild=opts["rebuild"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Indexed {indexed} new dates ({horizon_days()}-day window)."
+            )
+        )
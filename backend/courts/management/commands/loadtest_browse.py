@@ -0,0 +1,79 @@
+import urllib.error
+import urllib.request
+
+from django.core.management.base import BaseCommand, CommandError
+
+from common.benchmark import HEADER, format_row, run_concurrent
+
+# (label, sync viewset path, async browse path); {court}, {date}, {n} filled in
+ENDPOINTS = [
+    (
+        "list",
+        "/api/courts/courts/?nocache={n}",
+        "/api/courts/browse/?nocache={n}",
+    ),
+    ("detail", "/api/courts/courts/{court}/", "/api/courts/browse/{court}/"),
+    (
+        "slots",
+        "/api/courts/courts/{court}/available-slots/?date={date}",
+        "/api/courts/browse/{court}/available-slots/?date={date}",
+    ),
+]
+
+
+def fetch(url):
+    try:
+        with urllib.request.urlopen(url, timeout=30) as resp:
+            resp.read()
+            return resp.status == 200
+    except (urllib.error.URLError, OSError):
+        return False
+
+
+class Command(BaseCommand):
+    help = (
+        "Load-test a running server: the sync court viewset vs the async "
+        "browse path, at several concurrency levels. Start the server first, "
+        "e.g. gunicorn -c gunicorn.conf.py with GUNICORN_APP=asgi:application."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+        parser.add_argument("--court", type=int, required=True)
+        parser.add_argument("--date", required=True, help="YYYY-MM-DD")
+        parser.add_argument(
+            "--concurrency",
+            default="1,10,50",
+            help="Comma-separated client counts (default 1,10,50).",
+        )
+        parser.add_argument(
+            "--requests", type=int, default=500, help="Requests per run."
+        )
+        parser.add_argument(
+            "--endpoints",
+            default=",".join(label for label, _, _ in ENDPOINTS),
+            help="Subset of list,detail,slots.",
+        )
+
+    def handle(self, *args, **opts):
+        try:
+            levels = [int(n) for n in opts["concurrency"].split(",") if n]
+        except ValueError:
+            raise CommandError("--concurrency must be comma-separated integers.")
+        wanted = set(opts["endpoints"].split(","))
+        base = opts["base_url"].rstrip("/")
+
+        self.stdout.write(HEADER)
+        for label, sync_path, async_path in ENDPOINTS:
+            if label not in wanted:
+                continue
+            for kind, path in (("sync", sync_path), ("async", async_path)):
+                for level in levels:
+                    # a distinct query string per request keeps the listing
+                    # cache out of the measurement
+                    urls = [
+                        base + path.format(court=opts["court"], date=opts["date"], n=n)
+                        for n in range(opts["requests"])
+                    ]
+                    result = run_concurrent(fetch, urls, level)
+                    self.stdout.write(format_row(f"{label} ({kind})", level, result))
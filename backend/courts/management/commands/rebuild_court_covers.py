@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+
+from courts.images import delete_thumbnails, generate_thumbnails, refresh_cover
+from courts.models import Court, CourtImage
+from courts.tasks import build_court_image_thumbnails
+
+
+class Command(BaseCommand):
+    help = "Generate missing CourtImage thumbnails and refresh every court cover."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Regenerate thumbnails even for images that already have them.",
+        )
+
+    def handle(self, *args, **opts):
+        images = CourtImage.objects.exclude(image="").order_by("pk")
+        if not opts["force"]:
+            images = images.filter(thumbnails={})
+        generated = 0
+        for image in images.iterator(chunk_size=200):
+            if not image.thumbnails:
+                # never processed: run the whole upload pipeline here
+                build_court_image_thumbnails(image_id=image.pk)
+            else:
+                delete_thumbnails(image.image, image.thumbnails)
+                thumbs = generate_thumbnails(image.image)
+                CourtImage.objects.filter(pk=image.pk).update(thumbnails=thumbs)
+            generated += 1
+
+        courts = 0
+        for court_id in Court.objects.values_list("pk", flat=True).iterator():
+            refresh_cover(court_id)
+            courts += 1
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Generated thumbnails for {generated} images; "
+                f"refreshed {courts} court covers."
+            )
+        )
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+
+from courts.search import rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = "Recompute full-text search data for every court."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **opts):
+        rebuild_search_index(using=opts["database"])
+        self.stdout.write(self.style.SUCCESS("Search index rebuilt."))
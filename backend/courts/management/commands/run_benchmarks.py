@@ -0,0 +1,160 @@
+import random
+from datetime import time, timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.utils import timezone
+from rest_framework import serializers
+
+from bookings.conflicts import create_booking
+from bookings.models import Booking
+from common.benchmark import HEADER, format_row, run_concurrent
+from courts.management.commands.seed_benchmark import NAME_WORDS, USERNAME_PREFIX
+from courts.models import Court
+
+SCENARIOS = ["court-list", "court-search", "availability-search", "slots", "book"]
+
+
+class Command(BaseCommand):
+    help = (
+        "Timed scenarios against the data from seed_benchmark, run in-process "
+        "on the configured database (SQLite locally, or Postgres via the "
+        "POSTGRES_* settings, e.g. `docker compose run --rm backend python "
+        "manage.py run_benchmarks`). Reports throughput and p50/p95/p99 per "
+        "scenario and concurrency level. Read scenarios add a unique query "
+        "param per request so the listing cache is bypassed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--scenarios",
+            default=",".join(SCENARIOS),
+            help=f"Subset of {','.join(SCENARIOS)}.",
+        )
+        parser.add_argument(
+            "--concurrency",
+            default="1,8",
+            help="Comma-separated thread counts (default 1,8).",
+        )
+        parser.add_argument(
+            "--requests", type=int, default=200, help="Requests per run."
+        )
+        parser.add_argument(
+            "--hot-courts",
+            type=int,
+            default=5,
+            help="Courts the booking scenario competes for.",
+        )
+        parser.add_argument("--seed", type=int, default=7)
+
+    def handle(self, *args, **opts):
+        scenarios = [name for name in opts["scenarios"].split(",") if name]
+        unknown = set(scenarios) - set(SCENARIOS)
+        if unknown:
+            raise CommandError(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+        try:
+            levels = [int(n) for n in opts["concurrency"].split(",") if n]
+        except ValueError:
+            raise CommandError("--concurrency must be comma-separated integers.")
+
+        self.court_ids = list(
+            Court.objects.filter(
+                owner__username__startswith=USERNAME_PREFIX, is_active=True
+            )
+            .order_by("pk")
+            .values_list("pk", flat=True)
+        )
+        if not self.court_ids:
+            raise CommandError("No benchmark data; run seed_benchmark first.")
+        self.player_ids = list(
+            get_user_model()
+            .objects.filter(username__startswith=f"{USERNAME_PREFIX}player_")
+            .values_list("pk", flat=True)
+        )
+        self.host = next(
+            (host for host in settings.ALLOWED_HOSTS if host and "*" not in host),
+            "localhost",
+        )
+        if settings.DEBUG:
+            self.stdout.write(
+                self.style.WARNING(
+                    "DEBUG is on: query logging inflates timings; "
+                    "set DJANGO_DEBUG=False for representative numbers."
+                )
+            )
+
+        rng = random.Random(opts["seed"])
+        today = timezone.localdate()
+        self.stdout.write(HEADER)
+        for name in scenarios:
+            for level in levels:
+                jobs = [
+                    self.make_job(name, rng, today, n) for n in range(opts["requests"])
+                ]
+                if name == "book":
+                    result = self.run_bookings(jobs, level, opts["hot_courts"])
+                else:
+                    result = run_concurrent(self.get, jobs, level)
+                self.stdout.write(format_row(name, level, result))
+
+    def make_job(self, name, rng, today, n):
+        day = today + timedelta(days=rng.randrange(7))
+        hour = rng.randrange(7, 22)
+        if name == "court-list":
+            return f"/api/courts/courts/?page={rng.randint(1, 3)}&nonce={n}"
+        if name == "court-search":
+            return f"/api/courts/courts/?q={rng.choice(NAME_WORDS)}&nonce={n}"
+        if name == "availability-search":
+            return (
+                f"/api/courts/courts/?date={day}&start={hour:02d}:00"
+                f"&end={hour + 1:02d}:00&nonce={n}"
+            )
+        if name == "slots":
+            court = rng.choice(self.court_ids)
+            return f"/api/courts/courts/{court}/available-slots/?date={day}"
+        # book: (hot court index, date, hour, player)
+        return (rng.random(), day, hour, rng.choice(self.player_ids))
+
+    def get(self, path):
+        response = Client(HTTP_HOST=self.host).get(path)
+        # an out-of-range page is still a served request
+        return response.status_code in (200, 404)
+
+    def run_bookings(self, jobs, level, hot_courts):
+        """
+        Concurrent create_booking() calls against a few hot courts, so
+        writers contend for the same court-days. Overlap rejections are
+        expected outcomes; rows created here are removed afterwards. On
+        SQLite, concurrent writers fail with "database is locked" (counted
+        as errors) unless the database uses "transaction_mode": "IMMEDIATE".
+        """
+        courts = list(Court.objects.filter(pk__in=self.court_ids[:hot_courts]))
+        created, conflicts = [], []
+
+        def book(job):
+            pick, day, hour, player_id = job
+            court = courts[int(pick * len(courts))]
+            try:
+                booking = create_booking(
+                    user_id=player_id,
+                    court=court,
+                    booking_date=day,
+                    start_time=time(hour),
+                    end_time=time(hour + 1),
+                    total_price=court.price_per_hour,
+                )
+            except serializers.ValidationError:
+                conflicts.append(job)
+                return True
+            created.append(booking.pk)
+            return True
+
+        result = run_concurrent(book, jobs, level)
+        self.stdout.write(
+            f"  book: {len(created)} created, {len(conflicts)} conflicts, "
+            f"{result.errors} errors"
+        )
+        Booking.objects.filter(pk__in=created).delete()
+        return result
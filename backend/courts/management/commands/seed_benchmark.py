@@ -0,0 +1,187 @@
+import random
+import time as timer
+from datetime import time, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from analytics.rollups import backfill
+from bookings.models import Booking
+from courts import cache as court_cache
+from courts.availability_index import get_window, roll_forward
+from courts.geo import cell_for
+from courts.models import Court, CourtAvailability
+from courts.search import rebuild_search_index
+from courts.slots import WEEKDAY_NAMES
+
+USERNAME_PREFIX = "bench_"
+
+CITIES = {
+    "Lahore": (31.5204, 74.3587),
+    "Karachi": (24.8607, 67.0011),
+    "Islamabad": (33.6844, 73.0479),
+    "Faisalabad": (31.4504, 73.1350),
+    "Multan": (30.1575, 71.5249),
+}
+SPORTS = ["paddle", "badminton", "table_tennis", "indoor_cricket", "basketball"]
+NAME_WORDS = ["Royal", "Central", "Elite", "Green", "City", "Prime", "Sunset", "Arena"]
+# (start hour, end hour, chance the court opens this window on a given weekday)
+WINDOWS = [(7, 12, 0.7), (16, 23, 0.9)]
+STATUSES = ["confirmed"] * 6 + ["pending"] * 2 + ["cancelled", "completed"]
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed deterministic benchmark data: owners, players, courts with weekly "
+        "availability, and hour-long bookings over the next --days days. "
+        "Everything hangs off users named bench_*, so --clear removes only "
+        "benchmark data."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--owners", type=int, default=20)
+        parser.add_argument("--courts-per-owner", type=int, default=5)
+        parser.add_argument("--players", type=int, default=200)
+        parser.add_argument("--days", type=int, default=14)
+        parser.add_argument(
+            "--bookings-per-day",
+            type=int,
+            default=4,
+            help="Bookings per court per day (capped by its open hours).",
+        )
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument(
+            "--clear", action="store_true", help="Delete benchmark data first."
+        )
+
+    def handle(self, *args, **opts):
+        User = get_user_model()
+        started = timer.perf_counter()
+        existing = User.objects.filter(username__startswith=USERNAME_PREFIX)
+        if opts["clear"]:
+            deleted, _ = existing.delete()
+            self.stdout.write(f"Deleted {deleted} rows of benchmark data.")
+        elif existing.exists():
+            raise CommandError("Benchmark data already exists; pass --clear.")
+
+        rng = random.Random(opts["seed"])
+        with transaction.atomic():
+            owners = self.create_users(User, "owner", opts["owners"])
+            players = self.create_users(User, "player", opts["players"])
+            courts = self.create_courts(rng, owners, opts["courts_per_owner"])
+            hours = self.create_availability(rng, courts)
+            bookings = self.create_bookings(
+                rng, courts, players, hours, opts["days"], opts["bookings_per_day"]
+            )
+
+        # bulk_create skips the signals that keep derived data current
+        rebuild_search_index()
+        if get_window():
+            roll_forward(rebuild=True)
+        today = timezone.localdate()
+        backfill(
+            today,
+            today + timedelta(days=opts["days"] - 1),
+            [court.pk for court in courts],
+        )
+        court_cache.bump_generation()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Seeded {len(owners)} owners, {len(players)} players, "
+                f"{len(courts)} courts, {bookings} bookings in "
+                f"{timer.perf_counter() - started:.1f}s."
+            )
+        )
+
+    def create_users(self, User, role, count):
+        has_role = any(field.name == "role" for field in User._meta.fields)
+        users = []
+        for n in range(count):
+            username = f"{USERNAME_PREFIX}{role}_{n}"
+            user = User(username=username, email=f"{username}@example.com")
+            user.set_unusable_password()
+            if has_role:
+                user.role = role
+            users.append(user)
+        User.objects.bulk_create(users, batch_size=1000)
+        return list(
+            User.objects.filter(
+                username__startswith=f"{USERNAME_PREFIX}{role}_"
+            ).order_by("pk")
+        )
+
+    def create_courts(self, rng, owners, per_owner):
+        courts = []
+        for owner in owners:
+            for n in range(per_owner):
+                city = rng.choice(list(CITIES))
+                center_lat, center_lng = CITIES[city]
+                lat = Decimal(f"{center_lat + rng.uniform(-0.2, 0.2):.6f}")
+                lng = Decimal(f"{center_lng + rng.uniform(-0.2, 0.2):.6f}")
+                sport = rng.choice(SPORTS)
+                label = sport.replace("_", " ").title()
+                courts.append(
+                    Court(
+                        owner=owner,
+                        name=f"{rng.choice(NAME_WORDS)} {label} Club {n + 1}",
+                        sport_type=sport,
+                        description=f"{label} court in {city}.",
+                        location=f"Block {rng.randint(1, 30)}, {city}",
+                        city=city,
+                        lat=lat,
+                        lng=lng,
+                        geo_cell=cell_for(lat, lng),
+                        price_per_hour=Decimal(rng.randrange(500, 5000, 100)),
+                    )
+                )
+        Court.objects.bulk_create(courts, batch_size=1000)
+        owner_ids = [owner.pk for owner in owners]
+        return list(Court.objects.filter(owner_id__in=owner_ids).order_by("pk"))
+
+    def create_availability(self, rng, courts):
+        """Returns ``{court_id: {weekday: [open hours]}}`` for booking generation."""
+        rows, hours = [], {}
+        for court in courts:
+            hours[court.pk] = {}
+            for day in WEEKDAY_NAMES:
+                open_hours = []
+                for start, end, chance in WINDOWS:
+                    if rng.random() < chance:
+                        rows.append(
+                            CourtAvailability(
+                                court=court,
+                                day_of_week=day,
+                                start_time=time(start),
+                                end_time=time(end),
+                            )
+                        )
+                        open_hours.extend(range(start, end))
+                hours[court.pk][day] = open_hours
+        CourtAvailability.objects.bulk_create(rows, batch_size=2000)
+        return hours
+
+    def create_bookings(self, rng, courts, players, hours, days, per_day):
+        today = timezone.localdate()
+        rows = []
+        for court in courts:
+            for offset in range(days):
+                day = today + timedelta(days=offset)
+                open_hours = hours[court.pk][WEEKDAY_NAMES[day.weekday()]]
+                for hour in rng.sample(open_hours, min(per_day, len(open_hours))):
+                    rows.append(
+                        Booking(
+                            user=rng.choice(players),
+                            court=court,
+                            booking_date=day,
+                            start_time=time(hour),
+                            end_time=time(hour + 1),
+                            status=rng.choice(STATUSES),
+                            total_price=court.price_per_hour,
+                        )
+                    )
+        Booking.objects.bulk_create(rows, batch_size=2000)
+        return len(rows)
@@ -1,9 +1,22 @@
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
+from django.contrib.postgres.search import SearchVectorField
 from common.models import BaseModel  # Assuming BaseModel is defined in common.models
+from .geo import cell_for
 
 User = settings.AUTH_USER_MODEL
 
+DAY_OF_WEEK_CHOICES = [
+    ("monday", "Monday"),
+    ("tuesday", "Tuesday"),
+    ("wednesday", "Wednesday"),
+    ("thursday", "Thursday"),
+    ("friday", "Friday"),
+    ("saturday", "Saturday"),
+    ("sunday", "Sunday"),
+]
+
 
 class Court(BaseModel):
     owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name="courts")
@@ -28,14 +41,39 @@ class Court(BaseModel):
     city = models.CharField(max_length=80, blank=True, default="")
     lat = models.DecimalField(max_digits=9, decimal_places=6, null=True, blank=True)
     lng = models.DecimalField(max_digits=9, decimal_places=6, null=True, blank=True)
+    # spatial grid cell derived from lat/lng on save (see courts/geo.py)
+    geo_cell = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    # denormalized from the first CourtImage (see courts/images.py)
+    cover_image = models.ImageField(
+        upload_to="court_images/", blank=True, default="", editable=False
+    )
+    cover_thumbnails = models.JSONField(default=dict, blank=True, editable=False)
+    # maintained by a database trigger on PostgreSQL (see courts/search.py)
+    search_vector = SearchVectorField(null=True, editable=False)
+    # last write to the court or anything its detail and slot responses show;
+    # backs their ETag/Last-Modified validators (see courts/cache.py)
+    changed_at = models.DateTimeField(default=timezone.now, editable=False)
+    # last write to the court's price rules; versions its compiled price
+    # table (see courts/pricing.py)
+    prices_changed_at = models.DateTimeField(default=timezone.now, editable=False)
 
     class Meta:
         indexes = [
             models.Index(fields=["sport_type"]),
             models.Index(fields=["city"]),
             models.Index(fields=["price_per_hour"]),
+            models.Index(fields=["geo_cell"]),
+            # keyset pagination order (common/pagination.py)
+            models.Index(fields=["created_at", "id"]),
         ]
 
+    def save(self, *args, **kwargs):
+        self.geo_cell = cell_for(self.lat, self.lng)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and {"lat", "lng"} & set(update_fields):
+            kwargs["update_fields"] = {*update_fields, "geo_cell"}
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return f"{self.name} - {self.sport_type}"
 
@@ -43,6 +81,8 @@ class Court(BaseModel):
 class CourtImage(BaseModel):
     court = models.ForeignKey(Court, related_name="images", on_delete=models.CASCADE)
     image = models.ImageField(upload_to="court_images/")
+    # {label: storage path} of generated renditions
+    thumbnails = models.JSONField(default=dict, blank=True, editable=False)
 
     def __str__(self):
         return f"Image for {self.court.name}"
@@ -52,20 +92,73 @@ class CourtAvailability(BaseModel):
     court = models.ForeignKey(
         Court, related_name="availabilities", on_delete=models.CASCADE
     )
+    day_of_week = models.CharField(max_length=10, choices=DAY_OF_WEEK_CHOICES)
+    start_time = models.TimeField()
+    end_time = models.TimeField()
+
+    def __str__(self):
+        return f"{self.court.name} - {self.day_of_week} ({self.start_time}-{self.end_time})"
+
+
+class CourtPriceRule(BaseModel):
+    """
+    Hourly rate for a time range, overriding ``Court.price_per_hour``: on
+    every day (no ``day_of_week``/``date``), on one weekday, or on one date.
+    More specific rules win, and among equals the newest (see
+    courts/pricing.py).
+    """
+
+    court = models.ForeignKey(
+        Court, related_name="price_rules", on_delete=models.CASCADE
+    )
+    label = models.CharField(max_length=50, blank=True, default="")
     day_of_week = models.CharField(
         max_length=10,
-        choices=[
-            ("monday", "Monday"),
-            ("tuesday", "Tuesday"),
-            ("wednesday", "Wednesday"),
-            ("thursday", "Thursday"),
-            ("friday", "Friday"),
-            ("saturday", "Saturday"),
-            ("sunday", "Sunday"),
-        ],
+        blank=True,
+        default="",
+        choices=DAY_OF_WEEK_CHOICES,
     )
+    date = models.DateField(null=True, blank=True)
     start_time = models.TimeField()
     end_time = models.TimeField()
+    price_per_hour = models.DecimalField(max_digits=8, decimal_places=2)
 
     def __str__(self):
-        return f"{self.court.name} - {self.day_of_week} ({self.start_time}-{self.end_time})"
+        applies = self.date or self.day_of_week or "every day"
+        return (
+            f"{self.court_id} {applies} ({self.start_time}-{self.end_time}): "
+            f"{self.price_per_hour}"
+        )
+
+
+class CourtFreeInterval(models.Model):
+    """
+    Materialized free time for one court-day: one row per run of free minutes.
+    Maintained by courts/availability_index.py; never edited directly.
+    """
+
+    court = models.ForeignKey(
+        Court, related_name="free_intervals", on_delete=models.CASCADE
+    )
+    date = models.DateField()
+    start_minute = models.PositiveSmallIntegerField()
+    end_minute = models.PositiveSmallIntegerField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["date", "start_minute", "end_minute"]),
+            models.Index(fields=["court", "date"]),
+        ]
+
+    def __str__(self):
+        return f"{self.court_id} {self.date} [{self.start_minute}, {self.end_minute})"
+
+
+class AvailabilityIndexWindow(models.Model):
+    """Single row recording which dates CourtFreeInterval currently covers."""
+
+    start_date = models.DateField()
+    end_date = models.DateField()
+
+    def __str__(self):
+        return f"{self.start_date} - {self.end_date}"
@@ -0,0 +1,184 @@
+# courts/pricing.py
+"""
+Time-of-day pricing.
+
+A court's price is its ``price_per_hour`` overridden by ``CourtPriceRule``
+rows: every-day rules (peak/off-peak), weekday rules (weekends) and
+date-specific rules (holidays), applied in that order so the more specific
+rule wins; among rules of one kind the newest wins.
+
+Rules are compiled into a ``PriceTable``: for each weekday (and each date
+with its own rules) the running total of the hourly rate, in cents, minute
+by minute. The price of any range is then one subtraction,
+``(total[end] - total[start]) / 60`` cents, in exact integer arithmetic,
+rounded half-up to the cent once per quote. A slot grid costs one lookup per
+slot, whatever the number of rules.
+
+Compiled tables live in the court listing cache, keyed by the court's base
+price and ``Court.prices_changed_at``, which rule writes move after commit
+(see ``courts.signals``). The version is read with the court row the caller
+loads anyway, so it costs no query, and being a database column every
+worker sees a change at once, even when the cache is per process.
+"""
+
+from array import array
+from decimal import Decimal
+from itertools import accumulate
+
+from django.utils import timezone
+
+from .cache import get_cache, microseconds
+from .models import Court, CourtPriceRule
+from .slots import MINUTES_PER_DAY, WEEKDAY_NAMES, to_minute
+
+PRICE_TABLE_KEY = "courts:prices:{}:{}:{}"
+# court columns get_price_tables() takes, in order
+PRICE_FIELDS = ("pk", "price_per_hour", "prices_changed_at")
+PRICE_TABLE_TIMEOUT = 24 * 3600
+
+
+def to_cents(amount):
+    return int(Decimal(amount).scaleb(2).to_integral_value())
+
+
+def running_totals(rates):
+    """``totals[m]``: sum of the per-minute hourly rates before minute ``m``."""
+    return array("q", accumulate(rates, initial=0))
+
+
+def apply_rules(rates, rules):
+    rates = list(rates)
+    for start, end, cents in rules:
+        rates[start:end] = [cents] * (end - start)
+    return rates
+
+
+class PriceTable:
+    def __init__(self, weekly, dated):
+        # weekly: 7 running-total arrays (Monday first); dated: {date: array}
+        self.weekly = weekly
+        self.dated = dated
+
+    @classmethod
+    def compile(cls, price_per_hour, rules):
+        """
+        ``rules`` are ``(day_of_week, date, start_time, end_time, price)``
+        rows in creation order.
+        """
+        every_day, weekdays, dates = [], {}, {}
+        for day_of_week, date, start, end, price in rules:
+            rule = (to_minute(start), to_minute(end, ceil=True), to_cents(price))
+            if date is not None:
+                dates.setdefault(date, []).append(rule)
+            elif day_of_week:
+                weekdays.setdefault(day_of_week, []).append(rule)
+            else:
+                every_day.append(rule)
+
+        base = apply_rules([to_cents(price_per_hour)] * MINUTES_PER_DAY, every_day)
+        weekly_rates = [
+            apply_rules(base, weekdays.get(day, ())) for day in WEEKDAY_NAMES
+        ]
+        return cls(
+            weekly=[running_totals(rates) for rates in weekly_rates],
+            dated={
+                date: running_totals(apply_rules(weekly_rates[date.weekday()], rules))
+                for date, rules in dates.items()
+            },
+        )
+
+    def totals(self, day):
+        return self.dated.get(day) or self.weekly[day.weekday()]
+
+    def quote(self, day):
+        """
+        ``quote(start_minute, end_minute) -> Decimal`` for ``day``; bind it
+        once and call it per slot.
+        """
+        totals = self.totals(day)
+
+        def price(start, end):
+            # cents, rounded half-up; integer math keeps it exact
+            cents = (totals[end] - totals[start] + 30) // 60
+            return Decimal(cents).scaleb(-2)
+
+        return price
+
+    def price(self, day, start_time, end_time):
+        """Price of booking ``start_time``-``end_time`` on ``day``."""
+        return self.quote(day)(to_minute(start_time), to_minute(end_time, ceil=True))
+
+
+def price_table_key(court_id, price_per_hour, prices_changed_at):
+    return PRICE_TABLE_KEY.format(
+        court_id, to_cents(price_per_hour), microseconds(prices_changed_at)
+    )
+
+
+def bump_price_version(court_id):
+    """Invalidate ``court_id``'s compiled price table."""
+    Court.objects.filter(pk=court_id).update(prices_changed_at=timezone.now())
+
+
+def rules_query(court_ids):
+    return (
+        CourtPriceRule.objects.filter(court_id__in=court_ids)
+        .order_by("pk")
+        .values_list(
+            "court_id",
+            "day_of_week",
+            "date",
+            "start_time",
+            "end_time",
+            "price_per_hour",
+        )
+    )
+
+
+def compile_tables(base_prices, rows):
+    rules = {court_id: [] for court_id in base_prices}
+    for court_id, *rule in rows:
+        rules[court_id].append(rule)
+    return {
+        court_id: PriceTable.compile(base_prices[court_id], rules[court_id])
+        for court_id in base_prices
+    }
+
+
+def get_price_tables(courts):
+    """
+    ``{court_id: PriceTable}`` for ``PRICE_FIELDS`` rows of courts: cached
+    tables, plus one query compiling every missing one.
+    """
+    cache = get_cache()
+    keys = {row[0]: price_table_key(*row) for row in courts}
+    cached = cache.get_many(list(keys.values()))
+    tables = {court_id: cached[key] for court_id, key in keys.items() if key in cached}
+    missing = {
+        court_id: price for court_id, price, _ in courts if court_id not in tables
+    }
+    if missing:
+        compiled = compile_tables(missing, rules_query(list(missing)))
+        cache.set_many(
+            {keys[court_id]: table for court_id, table in compiled.items()},
+            PRICE_TABLE_TIMEOUT,
+        )
+        tables.update(compiled)
+    return tables
+
+
+def get_price_table(court):
+    row = (court.pk, court.price_per_hour, court.prices_changed_at)
+    return get_price_tables([row])[court.pk]
+
+
+async def aget_price_table(court_id, price_per_hour, prices_changed_at):
+    """get_price_table() for async views."""
+    cache = get_cache()
+    key = price_table_key(court_id, price_per_hour, prices_changed_at)
+    table = await cache.aget(key)
+    if table is None:
+        rows = [row async for row in rules_query([court_id])]
+        table = compile_tables({court_id: price_per_hour}, rows)[court_id]
+        await cache.aset(key, table, PRICE_TABLE_TIMEOUT)
+    return table
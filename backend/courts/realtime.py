@@ -0,0 +1,217 @@
+# courts/realtime.py
+"""
+Push updates for court-day slot grids.
+
+When a booking is created, cancelled, deleted or changes status, the free
+time of its court-day is recomputed once (after commit) and published on the
+channel ``slots:<court>:<date>``. The ``slot-events`` SSE view
+(courts/async_views.py) relays that channel to subscribed browsers, so the
+booking page no longer has to poll ``available-slots``.
+
+The broker is pluggable (``SLOT_EVENTS_BROKER``, a dotted path):
+
+* ``InMemoryBroker`` — per-process asyncio queues. Only reaches subscribers
+  connected to the worker that handled the write, so it suits a single
+  process (dev). Changes made elsewhere (other web workers, ``run_jobs``,
+  ``expire_holds``) never reach its subscribers, so the ``slot-events``
+  view refuses to stream on it unless ``SLOT_EVENTS_ALLOW_LOCAL_BROKER`` is
+  set (it defaults to ``DEBUG``); clients then poll ``available-slots``.
+* ``RedisBroker`` — Redis pub/sub on ``REDIS_URL``; works across workers.
+
+Every message carries the court-day's complete free intervals (slot-size
+independent), so a subscriber that misses or drops a message is fully caught
+up by the next one.
+"""
+
+import asyncio
+import json
+import logging
+import threading
+from collections import defaultdict
+from contextlib import asynccontextmanager
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+from bookings.holds import occupying
+from bookings.models import Booking
+from .models import CourtAvailability
+from .slots import MINUTE_LABELS, build_day_mask, iter_free_runs, weekday_name
+
+logger = logging.getLogger(__name__)
+
+# per-subscriber backlog; older messages are dropped first (each is a snapshot)
+SUBSCRIBER_QUEUE_SIZE = 16
+
+
+def slot_channel(court_id, day):
+    return f"slots:{court_id}:{day.isoformat()}"
+
+
+def slot_state(court_id, day):
+    """``{"court", "date", "free": [[start, end], ...]}`` for one court-day."""
+    windows = CourtAvailability.objects.filter(
+        court_id=court_id, day_of_week=weekday_name(day)
+    ).values_list("start_time", "end_time")
+    busy = Booking.objects.filter(
+        occupying(), court_id=court_id, booking_date=day
+    ).values_list("start_time", "end_time")
+    mask = build_day_mask(windows, busy)
+    return {
+        "court": court_id,
+        "date": day.isoformat(),
+        "free": [
+            [MINUTE_LABELS[start], MINUTE_LABELS[end]]
+            for start, end in iter_free_runs(mask)
+        ],
+    }
+
+
+def publish_slot_change(court_id, day):
+    """Recompute and publish ``court_id``'s free time on ``day``."""
+    broker = get_broker()
+    channel = slot_channel(court_id, day)
+    try:
+        if broker.has_subscribers(channel):
+            broker.publish(channel, json.dumps(slot_state(court_id, day)))
+    except Exception:
+        # runs after commit: a broker outage must not fail the write
+        logger.exception("could not publish %s", channel)
+
+
+class Broker:
+    """
+    ``publish`` is called from sync code (signal handlers, any thread);
+    ``subscribe`` is an async context manager yielding a Subscription.
+    """
+
+    # whether publishes from every process reach every subscriber
+    shared = False
+
+    def has_subscribers(self, channel):
+        return True
+
+    def publish(self, channel, message):
+        raise NotImplementedError
+
+    def subscribe(self, channel):
+        raise NotImplementedError
+
+
+class Subscription:
+    async def get(self, timeout):
+        """Next message, or None if ``timeout`` seconds pass without one."""
+        raise NotImplementedError
+
+
+class QueueSubscription(Subscription):
+    def __init__(self):
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+
+    def offer(self, message):
+        # runs on the subscriber's loop
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(message)
+
+    async def get(self, timeout):
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class InMemoryBroker(Broker):
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.subscriptions = defaultdict(set)
+
+    def has_subscribers(self, channel):
+        return bool(self.subscriptions.get(channel))
+
+    def publish(self, channel, message):
+        with self.lock:
+            targets = list(self.subscriptions.get(channel, ()))
+        for subscription in targets:
+            subscription.loop.call_soon_threadsafe(subscription.offer, message)
+
+    @asynccontextmanager
+    async def subscribe(self, channel):
+        subscription = QueueSubscription()
+        with self.lock:
+            self.subscriptions[channel].add(subscription)
+        try:
+            yield subscription
+        finally:
+            with self.lock:
+                self.subscriptions[channel].discard(subscription)
+                if not self.subscriptions[channel]:
+                    del self.subscriptions[channel]
+
+
+class RedisSubscription(Subscription):
+    def __init__(self, pubsub):
+        self.pubsub = pubsub
+
+    async def get(self, timeout):
+        message = await self.pubsub.get_message(
+            ignore_subscribe_messages=True, timeout=timeout
+        )
+        if message is None:
+            return None
+        data = message["data"]
+        return data.decode() if isinstance(data, bytes) else data
+
+
+class RedisBroker(Broker):
+    shared = True
+
+    def __init__(self, url=None):
+        import redis
+
+        self.url = url or settings.REDIS_URL
+        self.client = redis.Redis.from_url(self.url)
+
+    def has_subscribers(self, channel):
+        return any(count for _, count in self.client.pubsub_numsub(channel))
+
+    def publish(self, channel, message):
+        self.client.publish(channel, message)
+
+    @asynccontextmanager
+    async def subscribe(self, channel):
+        import redis.asyncio
+
+        client = redis.asyncio.Redis.from_url(self.url)
+        pubsub = client.pubsub()
+        await pubsub.subscribe(channel)
+        try:
+            yield RedisSubscription(pubsub)
+        finally:
+            await pubsub.unsubscribe(channel)
+            await pubsub.aclose()
+            await client.aclose()
+
+
+def streams_slot_events():
+    """Whether the slot-events stream would see every slot change."""
+    return get_broker().shared or getattr(
+        settings, "SLOT_EVENTS_ALLOW_LOCAL_BROKER", False
+    )
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                path = getattr(
+                    settings, "SLOT_EVENTS_BROKER", "courts.realtime.InMemoryBroker"
+                )
+                _broker = import_string(path)()
+    return _broker
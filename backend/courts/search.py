@@ -0,0 +1,156 @@
+# courts/search.py
+"""
+Full-text court search behind ``?q=``.
+
+PostgreSQL keeps ``Court.search_vector`` current with a trigger, indexes it
+with GIN, and falls back to pg_trgm similarity on the name for typos. SQLite
+(tests/local dev) uses an FTS5 table kept in sync by triggers. Both backends
+annotate ``search_rank`` (higher is better) so results can be ordered by
+relevance. The DDL is installed by a post_migrate hook because neither
+structure can be expressed portably in model Meta.
+"""
+
+import re
+
+from django.db import connections, router
+from django.db.models import F, FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+
+from .models import Court
+
+SEARCH_CONFIG = "english"
+
+POSTGRES_DDL = f"""
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE OR REPLACE FUNCTION courts_court_search_vector() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(NEW.name, '')), 'A')
+        || setweight(to_tsvector('{SEARCH_CONFIG}',
+            coalesce(NEW.city, '') || ' ' || replace(NEW.sport_type, '_', ' ')
+        ), 'B')
+        || setweight(
+            to_tsvector('{SEARCH_CONFIG}', coalesce(NEW.location, '')), 'C'
+        )
+        || setweight(
+            to_tsvector('{SEARCH_CONFIG}', coalesce(NEW.description, '')), 'D'
+        );
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS courts_court_search_vector_trg ON courts_court;
+CREATE TRIGGER courts_court_search_vector_trg
+    BEFORE INSERT OR UPDATE OF name, city, sport_type, location, description
+    ON courts_court FOR EACH ROW EXECUTE FUNCTION courts_court_search_vector();
+
+CREATE INDEX IF NOT EXISTS courts_court_search_vector_gin
+    ON courts_court USING gin (search_vector);
+CREATE INDEX IF NOT EXISTS courts_court_name_trgm
+    ON courts_court USING gin (name gin_trgm_ops);
+"""
+
+POSTGRES_REBUILD = "UPDATE courts_court SET name = name"
+
+FTS_COLUMNS = "name, city, sport_type, location, description"
+SQLITE_DDL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS courts_court_fts USING fts5(
+        {FTS_COLUMNS}, content='courts_court', content_rowid='id'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS courts_court_fts_ai
+        AFTER INSERT ON courts_court BEGIN
+        INSERT INTO courts_court_fts(rowid, {FTS_COLUMNS})
+        VALUES (new.id, new.name, new.city, new.sport_type, new.location,
+                new.description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS courts_court_fts_ad
+        AFTER DELETE ON courts_court BEGIN
+        INSERT INTO courts_court_fts(courts_court_fts, rowid, {FTS_COLUMNS})
+        VALUES ('delete', old.id, old.name, old.city, old.sport_type,
+                old.location, old.description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS courts_court_fts_au
+        AFTER UPDATE ON courts_court BEGIN
+        INSERT INTO courts_court_fts(courts_court_fts, rowid, {FTS_COLUMNS})
+        VALUES ('delete', old.id, old.name, old.city, old.sport_type,
+                old.location, old.description);
+        INSERT INTO courts_court_fts(rowid, {FTS_COLUMNS})
+        VALUES (new.id, new.name, new.city, new.sport_type, new.location,
+                new.description);
+    END""",
+]
+
+SQLITE_REBUILD = "INSERT INTO courts_court_fts(courts_court_fts) VALUES ('rebuild')"
+
+
+def install_search_index(sender, using="default", **kwargs):
+    """post_migrate handler: create the backend's search structures."""
+    if not router.allow_migrate_model(using, Court):
+        return
+    connection = connections[using]
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            cursor.execute(POSTGRES_DDL)
+        elif connection.vendor == "sqlite":
+            for statement in SQLITE_DDL:
+                cursor.execute(statement)
+
+
+def rebuild_search_index(using="default"):
+    """Recompute search data for every court (e.g. after a bulk import)."""
+    connection = connections[using]
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            cursor.execute(POSTGRES_REBUILD)
+        elif connection.vendor == "sqlite":
+            cursor.execute(SQLITE_REBUILD)
+
+
+def fts5_query(text):
+    """Quote each term for FTS5 and allow prefix matches."""
+    terms = re.findall(r"\w+", text)
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def search_courts(queryset, text):
+    """Courts in ``queryset`` matching ``text``, annotated with ``search_rank``."""
+    vendor = connections[queryset.db].vendor
+    if vendor == "postgresql":
+        from django.contrib.postgres.search import (
+            SearchQuery,
+            SearchRank,
+            TrigramSimilarity,
+        )
+
+        query = SearchQuery(text, config=SEARCH_CONFIG, search_type="websearch")
+        return queryset.annotate(
+            search_rank=SearchRank(F("search_vector"), query)
+            + TrigramSimilarity("name", text)
+        ).filter(Q(search_vector=query) | Q(name__trigram_similar=text))
+
+    if vendor == "sqlite":
+        match = fts5_query(text)
+        if not match:
+            return queryset.annotate(search_rank=Value(0.0)).none()
+        # bm25() is lower-is-better, so negate it; weights mirror the
+        # A/B/B/C/D weighting used on PostgreSQL
+        rank = RawSQL(
+            "SELECT -bm25(courts_court_fts, 10.0, 4.0, 4.0, 2.0, 1.0) "
+            "FROM courts_court_fts "
+            "WHERE courts_court_fts MATCH %s AND rowid = courts_court.id",
+            [match],
+            output_field=FloatField(),
+        )
+        matches = RawSQL(
+            "SELECT rowid FROM courts_court_fts WHERE courts_court_fts MATCH %s",
+            [match],
+        )
+        return queryset.filter(pk__in=matches).annotate(search_rank=rank)
+
+    # other backends: substring match, unranked (pg_trgm's default
+    # similarity threshold of 0.3 applies to trigram_similar above)
+    condition = Q()
+    for field in ("name", "description", "city", "location", "sport_type"):
+        condition |= Q(**{f"{field}__icontains": text})
+    return queryset.annotate(search_rank=Value(0.0)).filter(condition)
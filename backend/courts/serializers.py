@@ -1,11 +1,25 @@
 from rest_framework import serializers
-from .models import Court, CourtImage, CourtAvailability
+from common.rows import RowSerializer, format_decimal, quantum
+from .models import Court, CourtImage, CourtAvailability, CourtPriceRule
+from .images import thumbnail_srcset, thumbnail_urls, validate_upload
 
 
 class CourtImageSerializer(serializers.ModelSerializer):
+    thumbnails = serializers.SerializerMethodField()
+    srcset = serializers.SerializerMethodField()
+
     class Meta:
         model = CourtImage
-        fields = ["id", "image"]
+        fields = ["id", "image", "thumbnails", "srcset"]
+
+    def validate_image(self, value):
+        return validate_upload(value)
+
+    def get_thumbnails(self, obj):
+        return thumbnail_urls(obj.image, obj.thumbnails)
+
+    def get_srcset(self, obj):
+        return thumbnail_srcset(obj.image, obj.thumbnails)
 
 
 class CourtAvailabilitySerializer(serializers.ModelSerializer):
@@ -14,6 +28,34 @@ class CourtAvailabilitySerializer(serializers.ModelSerializer):
         fields = ["id", "day_of_week", "start_time", "end_time"]
 
 
+class CourtPriceRuleSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = CourtPriceRule
+        fields = [
+            "id",
+            "court",
+            "label",
+            "day_of_week",
+            "date",
+            "start_time",
+            "end_time",
+            "price_per_hour",
+        ]
+        read_only_fields = ["court"]
+        extra_kwargs = {"price_per_hour": {"min_value": 0}}
+
+    def validate(self, data):
+        def current(field):
+            # partial updates validate against the stored values
+            return data.get(field, getattr(self.instance, field, None))
+
+        if current("day_of_week") and current("date"):
+            raise serializers.ValidationError("Give a day_of_week or a date, not both.")
+        if current("start_time") >= current("end_time"):
+            raise serializers.ValidationError("End time must be after start time.")
+        return data
+
+
 class CourtSerializer(serializers.ModelSerializer):
     images = CourtImageSerializer(many=True, read_only=True)
     availabilities = CourtAvailabilitySerializer(many=True, read_only=True)
@@ -42,6 +84,9 @@ class CourtCreateUpdateSerializer(serializers.ModelSerializer):
             "sport_type",
             "description",
             "location",
+            "city",
+            "lat",
+            "lng",
             "price_per_hour",
             "capacity",
             "is_active",
@@ -50,6 +95,9 @@ class CourtCreateUpdateSerializer(serializers.ModelSerializer):
 
 class CourtListSerializer(serializers.ModelSerializer):
     first_image = serializers.SerializerMethodField()
+    cover_thumbnails = serializers.SerializerMethodField()
+    cover_srcset = serializers.SerializerMethodField()
+    distance_km = serializers.SerializerMethodField()
 
     class Meta:
         model = Court
@@ -62,12 +110,74 @@ class CourtListSerializer(serializers.ModelSerializer):
             "price_per_hour",
             "capacity",
             "is_active",
+            "lat",
+            "lng",
             "first_image",
+            "cover_thumbnails",
+            "cover_srcset",
+            "distance_km",
         ]
 
+    # all read the denormalized cover on Court, so no per-row image query
     def get_first_image(self, obj):
-        img = obj.images.first()
-        return img.image.url if img else None
+        return obj.cover_image.url if obj.cover_image else None
+
+    def get_cover_thumbnails(self, obj):
+        return thumbnail_urls(obj.cover_image, obj.cover_thumbnails)
+
+    def get_cover_srcset(self, obj):
+        return thumbnail_srcset(obj.cover_image, obj.cover_thumbnails)
+
+    def get_distance_km(self, obj):
+        # only annotated for ?near= lookups
+        distance = getattr(obj, "distance_km", None)
+        return round(distance, 3) if distance is not None else None
+
+
+class CourtListRowSerializer(RowSerializer):
+    """CourtListSerializer's output from ``values()`` rows (list endpoints)."""
+
+    columns = (
+        "id",
+        "name",
+        "sport_type",
+        "city",
+        "location",
+        "price_per_hour",
+        "capacity",
+        "is_active",
+        "lat",
+        "lng",
+        "cover_image",
+        "cover_thumbnails",
+        # keyset pagination key
+        "created_at",
+    )
+    annotations = ("distance_km",)
+
+    cover_field = Court._meta.get_field("cover_image")
+    price_quantum = quantum(Court, "price_per_hour")
+    coordinate_quantum = quantum(Court, "lat")
+
+    def to_representation(self, row):
+        cover, thumbs = row["cover_image"], row["cover_thumbnails"]
+        distance = row.get("distance_km")
+        return {
+            "id": row["id"],
+            "name": row["name"],
+            "sport_type": row["sport_type"],
+            "city": row["city"],
+            "location": row["location"],
+            "price_per_hour": format_decimal(row["price_per_hour"], self.price_quantum),
+            "capacity": row["capacity"],
+            "is_active": row["is_active"],
+            "lat": format_decimal(row["lat"], self.coordinate_quantum),
+            "lng": format_decimal(row["lng"], self.coordinate_quantum),
+            "first_image": self.cover_field.storage.url(cover) if cover else None,
+            "cover_thumbnails": thumbnail_urls(self.cover_field, thumbs),
+            "cover_srcset": thumbnail_srcset(self.cover_field, thumbs),
+            "distance_km": round(distance, 3) if distance is not None else None,
+        }
 
 
 # Keep your existing CourtSerializer, CourtImageSerializer, CourtAvailabilitySerializer, etc.
@@ -0,0 +1,137 @@
+# courts/signals.py
+from django.db import transaction
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import Signal, receiver
+
+from bookings.models import Booking
+from bookings.signals import (
+    booking_days_changed,
+    bookings_bulk_created,
+    bookings_bulk_expired,
+    by_court,
+)
+from .cache import bump_court_version, bump_generation
+from .images import delete_thumbnails, refresh_cover
+from .models import Court, CourtAvailability, CourtImage, CourtPriceRule
+from .pricing import bump_price_version
+from .realtime import publish_slot_change
+from .tasks import (
+    build_court_image_thumbnails,
+    refresh_availability_days,
+    refresh_availability_weekdays,
+)
+
+# Sent inside the writing transaction when an availability window is saved or
+# deleted. Receivers get ``weekdays``: ``{court_id: {day_of_week, ...}}``, the
+# weekday the window was loaded with plus the one it has now.
+availability_weekdays_changed = Signal()
+
+
+@receiver(post_save, sender=Court)
+@receiver(post_delete, sender=Court)
+@receiver(post_save, sender=CourtImage)
+@receiver(post_delete, sender=CourtImage)
+@receiver(post_save, sender=CourtAvailability)
+@receiver(post_delete, sender=CourtAvailability)
+@receiver(post_save, sender=Booking)
+@receiver(post_delete, sender=Booking)
+def invalidate_court_listings(sender, **kwargs):
+    # after commit, so a concurrent read can't re-cache the pre-write rows
+    transaction.on_commit(bump_generation)
+
+
+@receiver(post_save, sender=Court)
+@receiver(post_delete, sender=Court)
+@receiver(post_save, sender=CourtImage)
+@receiver(post_delete, sender=CourtImage)
+@receiver(post_save, sender=CourtAvailability)
+@receiver(post_delete, sender=CourtAvailability)
+@receiver(post_save, sender=CourtPriceRule)
+@receiver(post_delete, sender=CourtPriceRule)
+def bump_court_versions(sender, instance, **kwargs):
+    # bookings bump theirs in refresh_booking_days
+    court_id = instance.pk if sender is Court else instance.court_id
+    if court_id is not None:
+        transaction.on_commit(lambda: bump_court_version(court_id))
+
+
+# Price tables (courts/pricing.py) are compiled from the court's base price,
+# which is part of their key, and its rules.
+
+
+@receiver(post_save, sender=CourtPriceRule)
+@receiver(post_delete, sender=CourtPriceRule)
+def invalidate_price_table(sender, instance, **kwargs):
+    court_id = instance.court_id
+    transaction.on_commit(lambda: bump_price_version(court_id))
+
+
+@receiver(post_save, sender=CourtImage)
+def queue_court_image_thumbnails(sender, instance, **kwargs):
+    # rendering takes seconds for large uploads; a job worker does it
+    if instance.image and not instance.thumbnails:
+        build_court_image_thumbnails.enqueue(image_id=instance.pk)
+    refresh_cover(instance.court_id)
+
+
+@receiver(post_delete, sender=CourtImage)
+def drop_court_image_thumbnails(sender, instance, **kwargs):
+    delete_thumbnails(instance.image, instance.thumbnails)
+    refresh_cover(instance.court_id)
+
+
+# Booking and schedule writes change the free time of their court-days: the
+# validators move and subscribers hear about it after commit, while the
+# availability index is recomputed by a job worker, outside the request.
+
+
+def queue_index_refresh(days):
+    """Have a job worker recompute the availability index on ``days``."""
+    for court_id, dates in days.items():
+        refresh_availability_days.enqueue(
+            court_id=court_id, dates=sorted(day.isoformat() for day in dates)
+        )
+
+
+@receiver(booking_days_changed)
+def refresh_booking_days(sender, days, **kwargs):
+    # a booking moved to another court changes the old court's slots too
+    for court_id, dates in days.items():
+        transaction.on_commit(lambda c=court_id: bump_court_version(c))
+        for day in dates:
+            transaction.on_commit(lambda c=court_id, d=day: publish_slot_change(c, d))
+    queue_index_refresh(days)
+
+
+@receiver(post_init, sender=CourtAvailability)
+def remember_availability_weekday(sender, instance, **kwargs):
+    instance._loaded_weekday = (instance.court_id, instance.day_of_week)
+
+
+@receiver(post_save, sender=CourtAvailability)
+@receiver(post_delete, sender=CourtAvailability)
+def announce_availability_weekdays(sender, instance, **kwargs):
+    current = (instance.court_id, instance.day_of_week)
+    weekdays = by_court({instance._loaded_weekday, current})
+    instance._loaded_weekday = current
+    if weekdays:
+        availability_weekdays_changed.send(sender=CourtAvailability, weekdays=weekdays)
+
+
+@receiver(availability_weekdays_changed)
+def refresh_availability_index_weekdays(sender, weekdays, **kwargs):
+    for court_id, names in weekdays.items():
+        refresh_availability_weekdays.enqueue(court_id=court_id, weekdays=sorted(names))
+
+
+@receiver(bookings_bulk_created)
+@receiver(bookings_bulk_expired)
+def handle_bulk_bookings(sender, bookings, **kwargs):
+    # already running after commit; bulk_create/update skipped the handlers above
+    bump_generation()
+    days = by_court((booking.court_id, booking.booking_date) for booking in bookings)
+    for court_id, dates in days.items():
+        bump_court_version(court_id)
+        for day in dates:
+            publish_slot_change(court_id, day)
+    queue_index_refresh(days)
@@ -0,0 +1,190 @@
+# courts/slots.py
+"""
+Slot engine for court-day availability.
+
+A court-day is represented as a single Python int used as a bitmap with one
+bit per minute of the day (bit ``m`` set => minute ``m`` is free). Availability
+windows are OR'ed in, bookings are masked out, and free slots are read back by
+walking the runs of set bits. Every step is a handful of big-int operations on
+a 1440-bit value, so the cost is O(windows + bookings + slots) instead of
+re-scanning bookings per availability window.
+"""
+
+from datetime import time
+
+MINUTES_PER_DAY = 24 * 60
+DEFAULT_SLOT_MINUTES = 30
+MIN_SLOT_MINUTES = 5
+MAX_SLOT_MINUTES = 4 * 60
+
+# Matches date.weekday() and the CourtAvailability.day_of_week choices.
+WEEKDAY_NAMES = (
+    "monday",
+    "tuesday",
+    "wednesday",
+    "thursday",
+    "friday",
+    "saturday",
+    "sunday",
+)
+
+# "HH:MM" label for every minute of the day (plus 24:00 for slots ending at
+# midnight), built once so formatting a slot never calls strftime.
+MINUTE_LABELS = tuple(f"{m // 60:02d}:{m % 60:02d}" for m in range(MINUTES_PER_DAY + 1))
+
+
+def to_minute(value: time, ceil: bool = False) -> int:
+    """Minute-of-day for a ``time``; ``ceil`` rounds partial minutes up."""
+    minute = value.hour * 60 + value.minute
+    if ceil and (value.second or value.microsecond):
+        minute += 1
+    return minute
+
+
+def weekday_name(day) -> str:
+    """``CourtAvailability.day_of_week`` value for a ``date``."""
+    return WEEKDAY_NAMES[day.weekday()]
+
+
+def span_mask(start: int, end: int) -> int:
+    """Bitmap with minutes ``[start, end)`` set."""
+    start = max(start, 0)
+    end = min(end, MINUTES_PER_DAY)
+    if end <= start:
+        return 0
+    return ((1 << (end - start)) - 1) << start
+
+
+def window_span(start: time, end: time) -> int:
+    """Bitmap for an availability window, shrunk to whole minutes."""
+    return span_mask(to_minute(start, ceil=True), to_minute(end))
+
+
+def busy_span(start: time, end: time) -> int:
+    """Bitmap for a booked range, widened so it never leaks a partial minute."""
+    return span_mask(to_minute(start), to_minute(end, ceil=True))
+
+
+def build_day_mask(windows, busy=()) -> int:
+    """
+    Free-minute bitmap for one court-day.
+
+    ``windows`` and ``busy`` are iterables of ``(start_time, end_time)`` pairs,
+    e.g. straight from ``values_list("start_time", "end_time")``.
+    """
+    mask = 0
+    for start, end in windows:
+        mask |= window_span(start, end)
+    if not mask:
+        return 0
+    for start, end in busy:
+        mask &= ~busy_span(start, end)
+    return mask
+
+
+def build_day_masks(court_ids, dates, windows, busy):
+    """
+    Free-minute bitmaps for many court-days from two flat row sets.
+
+    ``windows`` rows are ``(court_id, day_of_week, start_time, end_time)`` and
+    ``busy`` rows are ``(court_id, booking_date, start_time, end_time)``.
+    Window masks are built once per court-weekday and booking masks once per
+    court-day, so the cost stays linear in rows.
+    Returns ``{court_id: {date: mask}}``.
+    """
+    weekly = {}
+    for court_id, day_of_week, start, end in windows:
+        key = (court_id, day_of_week)
+        weekly[key] = weekly.get(key, 0) | window_span(start, end)
+
+    booked = {}
+    for court_id, booking_date, start, end in busy:
+        key = (court_id, booking_date)
+        booked[key] = booked.get(key, 0) | busy_span(start, end)
+
+    masks = {}
+    for court_id in court_ids:
+        days = masks[court_id] = {}
+        for day in dates:
+            mask = weekly.get((court_id, weekday_name(day)), 0)
+            if mask:
+                mask &= ~booked.get((court_id, day), 0)
+            days[day] = mask
+    return masks
+
+
+def build_slot_grids(court_ids, dates, windows, busy, slot_minutes, prices=None):
+    """
+    Slot grids for many courts over many dates (see ``build_day_masks``),
+    priced with ``prices`` (``{court_id: PriceTable}``) when given.
+    Returns ``{court_id: {date: [slot, ...]}}``.
+    """
+    return {
+        court_id: {
+            day: serialize_slots(
+                mask, slot_minutes, prices[court_id].quote(day) if prices else None
+            )
+            for day, mask in days.items()
+        }
+        for court_id, days in build_day_masks(court_ids, dates, windows, busy).items()
+    }
+
+
+def iter_free_runs(mask: int):
+    """Yield ``(start, end)`` minute ranges for each run of set bits."""
+    offset = 0
+    while mask:
+        # skip to the lowest set bit
+        low = (mask & -mask).bit_length() - 1
+        mask >>= low
+        offset += low
+        # length of the run of ones now sitting at bit 0
+        length = (mask ^ (mask + 1)).bit_length() - 1
+        yield offset, offset + length
+        mask >>= length
+        offset += length
+
+
+def iter_slots(mask: int, slot_minutes: int = DEFAULT_SLOT_MINUTES):
+    """Yield ``(start, end)`` minutes for every whole slot inside a free run."""
+    for start, end in iter_free_runs(mask):
+        last = end - slot_minutes
+        for cur in range(start, last + 1, slot_minutes):
+            yield cur, cur + slot_minutes
+
+
+def serialize_slots(mask: int, slot_minutes: int = DEFAULT_SLOT_MINUTES, quote=None):
+    """
+    Slots as ``[{"start": "HH:MM", "end": "HH:MM"}, ...]`` for API responses.
+    ``quote(start_minute, end_minute)`` (see courts/pricing.py) adds a
+    ``"price"`` to each slot.
+    """
+    labels = MINUTE_LABELS
+    if quote is None:
+        return [
+            {"start": labels[start], "end": labels[end]}
+            for start, end in iter_slots(mask, slot_minutes)
+        ]
+    return [
+        {"start": labels[start], "end": labels[end], "price": str(quote(start, end))}
+        for start, end in iter_slots(mask, slot_minutes)
+    ]
+
+
+def parse_slot_minutes(value) -> int:
+    """
+    Validate a ``slot_size`` query param. Returns the default when missing and
+    raises ``ValueError`` when it is not an int in the supported range.
+    """
+    if value in (None, ""):
+        return DEFAULT_SLOT_MINUTES
+    try:
+        minutes = int(value)
+    except (TypeError, ValueError):
+        raise ValueError("slot_size must be a whole number of minutes.")
+    if not MIN_SLOT_MINUTES <= minutes <= MAX_SLOT_MINUTES:
+        raise ValueError(
+            f"slot_size must be between {MIN_SLOT_MINUTES} and "
+            f"{MAX_SLOT_MINUTES} minutes."
+        )
+    return minutes
@@ -0,0 +1,59 @@
+# courts/tasks.py
+from datetime import date
+
+from jobs.queue import task
+
+from .availability_index import refresh_court_days, refresh_court_weekdays
+from .cache import bump_court_version, bump_generation
+from .images import (
+    delete_thumbnails,
+    generate_thumbnails,
+    open_source,
+    refresh_cover,
+    sanitize_original,
+)
+from .models import CourtImage
+
+
+@task(max_attempts=5)
+def build_court_image_thumbnails(image_id):
+    """
+    Process an upload (see courts.images): render its renditions, replace the
+    original with a sanitized re-encode, then refresh its court's cover.
+    """
+    image = CourtImage.objects.filter(pk=image_id).first()
+    if image is None or not image.image or image.thumbnails:
+        # deleted since, or already done by an earlier attempt
+        return
+    source = open_source(image.image)
+    if source is None:
+        return
+    thumbnails = generate_thumbnails(image.image, source)
+    original = sanitize_original(image.image, source)
+    storage = image.image.storage
+    if not CourtImage.objects.filter(pk=image_id, image=image.image.name).update(
+        image=original, thumbnails=thumbnails
+    ):
+        # deleted or replaced while we worked
+        delete_thumbnails(image.image, thumbnails)
+        storage.delete(original)
+        return
+    storage.delete(image.image.name)
+    refresh_cover(image.court_id)
+    # update() skips the signal handlers that invalidate listings and ETags
+    bump_generation()
+    bump_court_version(image.court_id)
+
+
+# Availability index refreshes after booking and schedule writes (see
+# courts.signals); dates travel as ISO strings.
+
+
+@task
+def refresh_availability_days(court_id, dates):
+    refresh_court_days(court_id, [date.fromisoformat(day) for day in dates])
+
+
+@task
+def refresh_availability_weekdays(court_id, weekdays):
+    refresh_court_weekdays(court_id, set(weekdays))
@@ -1,3 +1,683 @@
-from django.test import TestCase
+import asyncio
+import io
+from datetime import date, time, timedelta
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import transaction
+from django.test import (
+    SimpleTestCase,
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+)
+from django.test.client import BOUNDARY, MULTIPART_CONTENT, encode_multipart
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import parse_http_date
+from PIL import Image
+
+from bookings.models import Booking
+from common.db_routers import ReadReplicaRouter, _read_from_replica
+from common.querystats import assert_max_queries
+from users.views import CustomTokenObtainPairSerializer
+
+from . import cache as court_cache
+from .models import Court, CourtAvailability, CourtImage, CourtPriceRule
+from .pricing import get_price_table
+from .slots import (
+    MINUTES_PER_DAY,
+    build_day_mask,
+    build_day_masks,
+    iter_free_runs,
+    iter_slots,
+    parse_slot_minutes,
+    serialize_slots,
+    span_mask,
+    weekday_name,
+)
+
+User = get_user_model()
+
+# a Monday
+MONDAY = date(2030, 1, 7)
+
+
+def make_court(owner=None, **fields):
+    owner = owner or User.objects.create_user(
+        username=f"owner{User.objects.count()}", password="pw", role="owner"
+    )
+    return Court.objects.create(
+        owner=owner,
+        name=fields.pop("name", "Centre Court"),
+        sport_type=fields.pop("sport_type", "paddle"),
+        location=fields.pop("location", "Park"),
+        price_per_hour=fields.pop("price_per_hour", Decimal("20.00")),
+        **fields,
+    )
+
+
+def bearer(user):
+    """Authorization header value with a JWT access token for ``user``."""
+    return f"Bearer {CustomTokenObtainPairSerializer.get_token(user).access_token}"
+
+
+def login(client, user):
+    """Authenticate ``client``'s requests as ``user`` with a JWT access token."""
+    client.defaults["HTTP_AUTHORIZATION"] = bearer(user)
+
+
+def slots(mask, minutes=30):
+    return [(start, end) for start, end in iter_slots(mask, minutes)]
+
+
+class SlotEngineTests(SimpleTestCase):
+    def test_span_mask_is_clipped_to_the_day(self):
+        self.assertEqual(span_mask(-30, 10), span_mask(0, 10))
+        self.assertEqual(
+            span_mask(MINUTES_PER_DAY - 10, MINUTES_PER_DAY + 30),
+            span_mask(MINUTES_PER_DAY - 10, MINUTES_PER_DAY),
+        )
+        self.assertEqual(span_mask(60, 60), 0)
+        self.assertEqual(span_mask(90, 60), 0)
+
+    def test_windows_shrink_and_bookings_widen_to_whole_minutes(self):
+        mask = build_day_mask(
+            [(time(9, 0, 30), time(11, 0))], [(time(10, 0), time(10, 0, 1))]
+        )
+        # the window starts at 9:01; the booking blocks 10:00-10:01
+        self.assertEqual(list(iter_free_runs(mask)), [(541, 600), (601, 660)])
+
+    def test_overlapping_windows_merge(self):
+        mask = build_day_mask(
+            [(time(8, 0), time(10, 0)), (time(9, 0), time(11, 0))],
+        )
+        self.assertEqual(list(iter_free_runs(mask)), [(480, 660)])
+
+    def test_slots_never_straddle_a_booking_or_the_window_end(self):
+        mask = build_day_mask(
+            [(time(9, 0), time(11, 40))], [(time(10, 0), time(10, 15))]
+        )
+        self.assertEqual(slots(mask), [(540, 570), (570, 600), (615, 645), (645, 675)])
+
+    def test_booking_on_a_window_boundary_leaves_the_rest_free(self):
+        mask = build_day_mask([(time(9, 0), time(11, 0))], [(time(8, 0), time(9, 0))])
+        self.assertEqual(slots(mask, 60), [(540, 600), (600, 660)])
+
+    def test_last_minute_of_the_day(self):
+        mask = build_day_mask([(time(23, 0), time(23, 59, 59))])
+        self.assertEqual(list(iter_free_runs(mask)), [(1380, 1439)])
+        self.assertEqual(
+            serialize_slots(build_day_mask([(time(23, 30), time(23, 59))]), 29),
+            [{"start": "23:30", "end": "23:59"}],
+        )
+        self.assertEqual(
+            serialize_slots(span_mask(MINUTES_PER_DAY - 30, MINUTES_PER_DAY)),
+            [{"start": "23:30", "end": "24:00"}],
+        )
+
+    def test_no_windows_means_no_slots(self):
+        self.assertEqual(build_day_mask([], [(time(9, 0), time(10, 0))]), 0)
+        self.assertEqual(serialize_slots(0), [])
+
+    def test_serialize_slots_prices_each_slot(self):
+        mask = build_day_mask([(time(9, 0), time(10, 0))])
+        self.assertEqual(
+            serialize_slots(mask, 30, lambda start, end: Decimal(end - start)),
+            [
+                {"start": "09:00", "end": "09:30", "price": "30"},
+                {"start": "09:30", "end": "10:00", "price": "30"},
+            ],
+        )
+
+    def test_batch_masks_match_single_day_masks(self):
+        tuesday = MONDAY + timedelta(days=1)
+        windows = [
+            (1, "monday", time(9, 0), time(12, 0)),
+            (1, "tuesday", time(14, 0), time(16, 0)),
+            (2, "monday", time(7, 0), time(8, 0)),
+        ]
+        busy = [(1, MONDAY, time(10, 0), time(10, 30))]
+        masks = build_day_masks([1, 2, 3], [MONDAY, tuesday], windows, busy)
+        self.assertEqual(
+            masks[1][MONDAY],
+            build_day_mask([(time(9, 0), time(12, 0))], [(time(10, 0), time(10, 30))]),
+        )
+        self.assertEqual(
+            masks[1][tuesday], build_day_mask([(time(14, 0), time(16, 0))])
+        )
+        self.assertEqual(masks[2][tuesday], 0)
+        self.assertEqual(masks[3], {MONDAY: 0, tuesday: 0})
+
+    def test_weekday_name(self):
+        self.assertEqual(weekday_name(MONDAY), "monday")
+        self.assertEqual(weekday_name(MONDAY + timedelta(days=6)), "sunday")
+
+    def test_parse_slot_minutes(self):
+        self.assertEqual(parse_slot_minutes(None), 30)
+        self.assertEqual(parse_slot_minutes("45"), 45)
+        for value in ("abc", "4", "241", "1.5"):
+            with self.subTest(value=value), self.assertRaises(ValueError):
+                parse_slot_minutes(value)
+
+
+class AvailableSlotsTests(TestCase):
+    def setUp(self):
+        self.court = make_court()
+        CourtAvailability.objects.create(
+            court=self.court,
+            day_of_week="monday",
+            start_time=time(9, 0),
+            end_time=time(11, 0),
+        )
+        self.player = User.objects.create_user(username="player", password="pw")
+        self.url = reverse("court-available-slots", args=[self.court.pk])
+
+    def test_slots_for_the_requested_weekday(self):
+        Booking.objects.create(
+            user=self.player,
+            court=self.court,
+            booking_date=MONDAY,
+            start_time=time(9, 30),
+            end_time=time(10, 0),
+            status="confirmed",
+        )
+        response = self.client.get(self.url, {"date": MONDAY.isoformat()})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [(slot["start"], slot["end"]) for slot in response.json()["slots"]],
+            [("09:00", "09:30"), ("10:00", "10:30"), ("10:30", "11:00")],
+        )
+
+    def test_other_weekdays_have_no_slots(self):
+        tuesday = MONDAY + timedelta(days=1)
+        response = self.client.get(self.url, {"date": tuesday.isoformat()})
+        self.assertEqual(response.json(), {"date": tuesday.isoformat(), "slots": []})
+
+    def test_bad_parameters(self):
+        self.assertEqual(self.client.get(self.url).status_code, 400)
+        response = self.client.get(
+            self.url, {"date": MONDAY.isoformat(), "slot_size": "2"}
+        )
+        self.assertEqual(response.status_code, 400)
+
+
+class ListingCacheTests(TestCase):
+    def setUp(self):
+        court_cache.get_cache().clear()
+        self.court = make_court(name="First")
+        self.url = reverse("court-list")
+
+    def names(self):
+        return [court["name"] for court in self.client.get(self.url).json()["results"]]
+
+    def test_anonymous_listing_is_served_from_the_cache(self):
+        self.assertEqual(self.names(), ["First"])
+        with self.assertNumQueries(0):
+            self.assertEqual(self.names(), ["First"])
+        # a write that bypasses the signals is not seen until invalidation
+        Court.objects.filter(pk=self.court.pk).update(name="Renamed")
+        self.assertEqual(self.names(), ["First"])
+
+    def test_equivalent_query_strings_share_an_entry(self):
+        self.client.get(self.url, {"sport_type": "paddle", "city": ""})
+        with self.assertNumQueries(0):
+            self.client.get(self.url, {"sport_type": "paddle"})
+
+    def test_court_writes_invalidate(self):
+        self.assertEqual(self.names(), ["First"])
+        with self.captureOnCommitCallbacks(execute=True):
+            make_court(owner=self.court.owner, name="Second")
+        self.assertEqual(self.names(), ["Second", "First"])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.court.name = "Renamed"
+            self.court.save()
+        self.assertEqual(self.names(), ["Second", "Renamed"])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.court.delete()
+        self.assertEqual(self.names(), ["Second"])
+
+    def test_booking_writes_invalidate(self):
+        player = User.objects.create_user(username="player", password="pw")
+        self.names()
+        generation = court_cache.current_generation()
+        with self.captureOnCommitCallbacks(execute=True):
+            booking = Booking.objects.create(
+                user=player,
+                court=self.court,
+                booking_date=MONDAY,
+                start_time=time(9, 0),
+                end_time=time(10, 0),
+            )
+        self.assertNotEqual(court_cache.current_generation(), generation)
+        generation = court_cache.current_generation()
+        with self.captureOnCommitCallbacks(execute=True):
+            booking.delete()
+        self.assertNotEqual(court_cache.current_generation(), generation)
+
+    def test_nothing_is_invalidated_before_commit(self):
+        self.names()
+        generation = court_cache.current_generation()
+        with self.captureOnCommitCallbacks(execute=False):
+            make_court(owner=self.court.owner, name="Second")
+            self.assertEqual(court_cache.current_generation(), generation)
+
+    def test_lost_generation_is_reseeded(self):
+        self.names()
+        Court.objects.filter(pk=self.court.pk).update(name="Renamed")
+        court_cache.get_cache().delete(court_cache.GENERATION_KEY)
+        court_cache.bump_generation()
+        self.assertEqual(self.names(), ["Renamed"])
+
+    def test_authenticated_requests_bypass_the_cache(self):
+        self.names()
+        Court.objects.filter(pk=self.court.pk).update(name="Renamed")
+        login(self.client, self.court.owner)
+        self.assertEqual(self.names(), ["Renamed"])
+
+
+class ReadReplicaTests(TransactionTestCase):
+    # the replica is a separate test database (see test_settings)
+    databases = {"default", "replica"}
+
+    def setUp(self):
+        self.court = make_court(name="Primary only")
+        login(self.client, self.court.owner)
+
+    def test_safe_methods_read_from_the_replica(self):
+        response = self.client.get(reverse("court-list"))
+        self.assertEqual(response.json()["results"], [])
+        detail = reverse("court-detail", args=[self.court.pk])
+        self.assertEqual(self.client.get(detail).status_code, 404)
+        bookings = self.client.get(reverse("booking-list"))
+        self.assertEqual(bookings.status_code, 200)
+
+    def test_writes_and_their_reads_use_default(self):
+        player = User.objects.create_user(username="player", password="pw")
+        login(self.client, player)
+        response = self.client.post(
+            reverse("booking-list"),
+            {
+                "court": self.court.pk,
+                "booking_date": (MONDAY + timedelta(weeks=520)).isoformat(),
+                "start_time": "09:00",
+                "end_time": "10:00",
+            },
+            content_type="application/json",
+        )
+        # the serializer looked the court up on default
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(Booking.objects.using("default").exists())
+        self.assertFalse(Booking.objects.using("replica").exists())
+
+    def test_router(self):
+        router = ReadReplicaRouter()
+        self.assertEqual(router.db_for_read(Court), "default")
+        token = _read_from_replica.set(True)
+        try:
+            self.assertEqual(router.db_for_read(Court), "replica")
+            self.assertEqual(router.db_for_write(Court), "default")
+            # reads inside a transaction must see its writes
+            with transaction.atomic():
+                self.assertEqual(router.db_for_read(Court), "default")
+        finally:
+            _read_from_replica.reset(token)
+
+    def test_the_flag_does_not_outlive_the_request(self):
+        self.client.get(reverse("court-list"))
+        self.assertFalse(_read_from_replica.get())
+
+
+def forbid_blocking_cache_calls():
+    """Fail any cache call made on an event loop's thread (use the a* API)."""
+
+    def guard(method):
+        def guarded(self, *args, **kwargs):
+            try:
+                asyncio.get_running_loop()
+            except RuntimeError:
+                return method(self, *args, **kwargs)
+            raise AssertionError(f"blocking cache.{method.__name__}() in async code")
+
+        return guarded
+
+    return mock.patch.multiple(
+        LocMemCache,
+        **{
+            name: guard(getattr(LocMemCache, name))
+            for name in ("get", "set", "add", "incr", "get_or_set", "get_many")
+        },
+    )
+
+
+class AsyncBrowseTests(TestCase):
+    def setUp(self):
+        court_cache.get_cache().clear()
+        self.court = make_court(name="First")
+        CourtAvailability.objects.create(
+            court=self.court,
+            day_of_week="monday",
+            start_time=time(9, 0),
+            end_time=time(10, 0),
+        )
+
+    def test_listing_is_cached_without_blocking_the_loop(self):
+        url = reverse("court-browse")
+        with forbid_blocking_cache_calls():
+            first = self.client.get(url)
+            with self.assertNumQueries(0):
+                second = self.client.get(url)
+        self.assertEqual(first.json(), second.json())
+        self.assertEqual([row["name"] for row in first.json()["results"]], ["First"])
+
+    def test_detail_validators_without_blocking_the_loop(self):
+        url = reverse("court-browse-detail", args=[self.court.pk])
+        with forbid_blocking_cache_calls():
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            # just the validators
+            with self.assertNumQueries(1):
+                cached = self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(cached.status_code, 304)
+        # the same validators as the DRF view
+        self.assertEqual(
+            self.client.get(reverse("court-detail", args=[self.court.pk]))["ETag"],
+            response["ETag"],
+        )
+
+    def test_slots_use_the_court_weekday(self):
+        url = reverse("court-browse-available-slots", args=[self.court.pk])
+        with forbid_blocking_cache_calls():
+            response = self.client.get(url, {"date": MONDAY.isoformat()})
+        self.assertEqual(
+            [(slot["start"], slot["end"]) for slot in response.json()["slots"]],
+            [("09:00", "09:30"), ("09:30", "10:00")],
+        )
+
+
+class SlotEventsTests(TestCase):
+    def setUp(self):
+        self.court = make_court()
+        self.url = reverse("court-browse-slot-events", args=[self.court.pk])
+
+    async def test_stream_starts_with_the_current_state(self):
+        response = await self.async_client.get(self.url, {"date": MONDAY.isoformat()})
+        self.assertEqual(response.status_code, 200)
+        first = await anext(aiter(response.streaming_content))
+        await response.streaming_content.aclose()
+        self.assertTrue(first.startswith(b"event: slots\n"))
+
+    @override_settings(SLOT_EVENTS_ALLOW_LOCAL_BROKER=False)
+    def test_process_local_broker_refuses_to_stream(self):
+        # it would miss changes made by other workers and job runners
+        response = self.client.get(self.url, {"date": MONDAY.isoformat()})
+        self.assertEqual(response.status_code, 503)
+
+
+class PriceTableCacheTests(TestCase):
+    def setUp(self):
+        self.court = make_court()
+        # two workers, each with its own local-memory cache
+        self.workers = [LocMemCache(f"worker{i}", {}) for i in range(2)]
+
+    def price(self, worker):
+        with mock.patch("courts.pricing.get_cache", return_value=worker):
+            court = Court.objects.get(pk=self.court.pk)
+            return get_price_table(court).price(MONDAY, time(18, 0), time(19, 0))
+
+    def test_rule_changes_reach_every_worker(self):
+        self.assertEqual(self.price(self.workers[0]), Decimal("20.00"))
+        with self.captureOnCommitCallbacks(execute=True):
+            rule = CourtPriceRule.objects.create(
+                court=self.court,
+                start_time=time(17, 0),
+                end_time=time(20, 0),
+                price_per_hour=Decimal("30.00"),
+            )
+        # the write ran on the other worker; this one still has the old table
+        self.assertEqual(self.price(self.workers[0]), Decimal("30.00"))
+        with self.captureOnCommitCallbacks(execute=True):
+            rule.delete()
+        self.assertEqual(self.price(self.workers[0]), Decimal("20.00"))
+
+    def test_base_price_is_part_of_the_key(self):
+        self.assertEqual(self.price(self.workers[0]), Decimal("20.00"))
+        Court.objects.filter(pk=self.court.pk).update(price_per_hour=Decimal("25"))
+        self.assertEqual(self.price(self.workers[0]), Decimal("25.00"))
+
+    def test_cached_tables_cost_no_query(self):
+        court = Court.objects.get(pk=self.court.pk)
+        with mock.patch("courts.pricing.get_cache", return_value=self.workers[0]):
+            get_price_table(court)
+            with self.assertNumQueries(0):
+                get_price_table(court)
+
+
+class ListQueryCountTests(TestCase):
+    """The court list endpoints stay within their QUERY_BUDGETS, N+1 free."""
+
+    @classmethod
+    def setUpTestData(cls):
+        owner = User.objects.create_user(username="owner", password="pw", role="owner")
+        cls.courts = [make_court(owner, name=f"Court {n}") for n in range(5)]
+        for court in cls.courts:
+            for day_of_week in ("monday", "tuesday"):
+                CourtAvailability.objects.create(
+                    court=court,
+                    day_of_week=day_of_week,
+                    start_time=time(9, 0),
+                    end_time=time(12, 0),
+                )
+        cls.player = User.objects.create_user(username="player", password="pw")
+
+    def setUp(self):
+        court_cache.get_cache().clear()
+
+    def assert_within_budget(self, name, *args, **params):
+        with assert_max_queries(settings.QUERY_BUDGETS[name], max_duplicates=0):
+            response = self.client.get(reverse(name, args=args), params)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_court_list(self):
+        response = self.assert_within_budget("court-list")
+        self.assertEqual(response.json()["count"], 5)
+        login(self.client, self.player)
+        self.assert_within_budget("court-list", sport_type="paddle")
+        self.assert_within_budget("court-list", pagination="cursor")
+
+    def test_court_browse(self):
+        response = self.assert_within_budget("court-browse")
+        self.assertEqual(response.json()["count"], 5)
+        self.assert_within_budget("court-browse", pagination="cursor")
+
+    def test_slot_grids(self):
+        court = self.courts[0]
+        self.assert_within_budget(
+            "court-available-slots", court.pk, date=MONDAY.isoformat()
+        )
+        self.assert_within_budget(
+            "court-browse-available-slots", court.pk, date=MONDAY.isoformat()
+        )
+        response = self.assert_within_budget(
+            "court-batch-available-slots",
+            courts=",".join(str(court.pk) for court in self.courts),
+            start_date=MONDAY.isoformat(),
+            end_date=(MONDAY + timedelta(days=6)).isoformat(),
+        )
+        self.assertEqual(response.status_code, 200)
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        self.court = make_court()
+        CourtAvailability.objects.create(
+            court=self.court,
+            day_of_week="monday",
+            start_time=time(9, 0),
+            end_time=time(11, 0),
+        )
+        self.player = User.objects.create_user(username="player", password="pw")
+        self.day = MONDAY + timedelta(weeks=520)
+        self.url = reverse("court-available-slots", args=[self.court.pk])
+
+    def get(self, etag=None):
+        headers = {"HTTP_IF_NONE_MATCH": etag} if etag else {}
+        return self.client.get(self.url, {"date": self.day.isoformat()}, **headers)
+
+    def book(self, **fields):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Booking.objects.create(
+                user=self.player,
+                court=self.court,
+                booking_date=self.day,
+                start_time=time(9, 0),
+                end_time=time(10, 0),
+                **fields,
+            )
+
+    def test_unchanged_court_answers_304(self):
+        etag = self.get()["ETag"]
+        # the validator lives in the database, not in a per-process cache
+        court_cache.get_cache().clear()
+        self.assertEqual(self.get(etag).status_code, 304)
+
+    def test_writes_change_the_validators(self):
+        response = self.get()
+        self.book(status="confirmed")
+        changed = self.get(response["ETag"])
+        self.assertEqual(changed.status_code, 200)
+        self.assertEqual(len(changed.json()["slots"]), 2)
+        self.assertGreaterEqual(
+            parse_http_date(changed["Last-Modified"]),
+            parse_http_date(response["Last-Modified"]),
+        )
+
+    def test_lapsed_hold_changes_the_validators_without_a_write(self):
+        deadline = timezone.now() + timedelta(minutes=10)
+        self.book(hold_expires_at=deadline)
+        response = self.get()
+        self.assertEqual(len(response.json()["slots"]), 2)
+        self.assertEqual(self.get(response["ETag"]).status_code, 304)
+
+        later = deadline + timedelta(seconds=1)
+        with mock.patch("django.utils.timezone.now", return_value=later):
+            lapsed = self.get(response["ETag"])
+        self.assertEqual(lapsed.status_code, 200)
+        self.assertEqual(len(lapsed.json()["slots"]), 4)
+        self.assertEqual(
+            parse_http_date(lapsed["Last-Modified"]), int(deadline.timestamp())
+        )
+
+    def test_variants_validate_separately(self):
+        etag = self.get()["ETag"]
+        response = self.client.get(
+            self.url,
+            {"date": self.day.isoformat(), "slot_size": "60"},
+            HTTP_IF_NONE_MATCH=etag,
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_unknown_court_has_no_validators(self):
+        url = reverse("court-detail", args=[self.court.pk + 100])
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(response.has_header("ETag"))
+
+
+def png_upload(name="court.png"):
+    buffer = io.BytesIO()
+    Image.new("RGB", (8, 8), "green").save(buffer, "PNG")
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type="image/png")
+
+
+class CourtManagementTests(TestCase):
+    """Owners manage their own court's images, availability and prices."""
+
+    def setUp(self):
+        self.court = make_court()
+        self.owner = self.court.owner
+        login(self.client, self.owner)
+
+    def test_owner_manages_images(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse("court-image-list"),
+                {"court": self.court.pk, "image": png_upload()},
+            )
+        self.assertEqual(response.status_code, 201, response.content)
+        url = reverse("court-image-detail", args=[response.json()["id"]])
+        response = self.client.patch(
+            url,
+            encode_multipart(BOUNDARY, {"image": png_upload("new.png")}),
+            content_type=MULTIPART_CONTENT,
+        )
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(self.client.delete(url).status_code, 204)
+        self.assertFalse(CourtImage.objects.exists())
+
+    def test_owner_manages_availability(self):
+        response = self.client.post(
+            reverse("court-availability-list"),
+            {
+                "court": self.court.pk,
+                "day_of_week": "monday",
+                "start_time": "09:00",
+                "end_time": "12:00",
+            },
+        )
+        self.assertEqual(response.status_code, 201, response.content)
+        url = reverse("court-availability-detail", args=[response.json()["id"]])
+        response = self.client.patch(
+            url, {"end_time": "13:00"}, content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(self.client.delete(url).status_code, 204)
+        self.assertFalse(CourtAvailability.objects.exists())
+
+    def test_owner_manages_price_rules(self):
+        response = self.client.post(
+            reverse("court-price-rule-list"),
+            {
+                "court": self.court.pk,
+                "label": "Peak",
+                "day_of_week": "monday",
+                "start_time": "17:00",
+                "end_time": "20:00",
+                "price_per_hour": "30.00",
+            },
+        )
+        self.assertEqual(response.status_code, 201, response.content)
+        url = reverse("court-price-rule-detail", args=[response.json()["id"]])
+        response = self.client.patch(
+            url, {"price_per_hour": "35.00"}, content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(self.client.delete(url).status_code, 204)
+        self.assertFalse(CourtPriceRule.objects.exists())
+
+    def test_other_owners_cannot(self):
+        rule = CourtPriceRule.objects.create(
+            court=self.court,
+            day_of_week="monday",
+            start_time=time(17, 0),
+            end_time=time(20, 0),
+            price_per_hour=Decimal("30.00"),
+        )
+        login(self.client, make_court().owner)
+        response = self.client.post(
+            reverse("court-availability-list"),
+            {
+                "court": self.court.pk,
+                "day_of_week": "monday",
+                "start_time": "09:00",
+                "end_time": "12:00",
+            },
+        )
+        self.assertEqual(response.status_code, 403)
+        url = reverse("court-price-rule-detail", args=[rule.pk])
+        self.assertEqual(self.client.delete(url).status_code, 403)
@@ -1,5 +1,12 @@
+from django.urls import path
 from rest_framework.routers import DefaultRouter
-from .views import CourtViewSet, CourtImageViewSet, CourtAvailabilityViewSet
+from .views import (
+    CourtViewSet,
+    CourtImageViewSet,
+    CourtAvailabilityViewSet,
+    CourtPriceRuleViewSet,
+)
+from . import async_views
 
 router = DefaultRouter()
 router.register(r"courts", CourtViewSet, basename="court")
@@ -7,5 +14,20 @@ router.register(r"court-images", CourtImageViewSet, basename="court-image")
 router.register(
     r"court-availability", CourtAvailabilityViewSet, basename="court-availability"
 )
+router.register(r"court-prices", CourtPriceRuleViewSet, basename="court-price-rule")
 
-urlpatterns = router.urls
+urlpatterns = [
+    # async read path for public browsing (courts/async_views.py)
+    path("browse/", async_views.court_list, name="court-browse"),
+    path("browse/<int:pk>/", async_views.court_detail, name="court-browse-detail"),
+    path(
+        "browse/<int:pk>/available-slots/",
+        async_views.court_available_slots,
+        name="court-browse-available-slots",
+    ),
+    path(
+        "browse/<int:pk>/slot-events/",
+        async_views.court_slot_events,
+        name="court-browse-slot-events",
+    ),
+] + router.urls
@@ -1,16 +1,35 @@
 from rest_framework import viewsets, permissions, decorators, response, status, filters
 from django.db.models import Exists, OuterRef
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
+from django_filters.rest_framework import DjangoFilterBackend
 from datetime import datetime, timedelta
-from .models import Court, CourtImage, CourtAvailability
+from .models import Court, CourtImage, CourtAvailability, CourtPriceRule
 from .serializers import (
     CourtSerializer,
     CourtCreateUpdateSerializer,
     CourtImageSerializer,
     CourtAvailabilitySerializer,
     CourtListSerializer,
+    CourtListRowSerializer,
+    CourtPriceRuleSerializer,
 )
-from .filters import CourtFilter
+from . import cache as court_cache
+from .filters import CourtFilter, CourtOrderingFilter
+from .pricing import PRICE_FIELDS, get_price_table, get_price_tables
+from .slots import (
+    build_day_mask,
+    build_slot_grids,
+    parse_slot_minutes,
+    serialize_slots,
+    weekday_name,
+)
+from bookings.holds import occupying
 from bookings.models import Booking
+from common.db_routers import ReplicaReadMixin
+from common.pagination import CourtKeysetPagination, SelectablePaginationMixin
+from common.rows import RowListMixin
+from users.authentication import db_user
 from users.permissions import (
     IsOwnerRole,
     IsCourtObjectOwner,
@@ -18,8 +37,23 @@ from users.permissions import (
     IsAdmin,
 )
 
+# ETag/Last-Modified from the per-court version (courts/cache.py): a matching
+# If-None-Match is answered with a 304 before any query or serialization.
+conditional_on_court = method_decorator(
+    condition(
+        etag_func=court_cache.court_etag,
+        last_modified_func=court_cache.court_last_modified,
+    )
+)
+
+# Upper bounds for one batch availability request.
+MAX_BATCH_COURTS = 50
+MAX_BATCH_DAYS = 31
 
-class CourtViewSet(viewsets.ModelViewSet):
+
+class CourtViewSet(
+    ReplicaReadMixin, SelectablePaginationMixin, RowListMixin, viewsets.ModelViewSet
+):
     queryset = (
         Court.objects.filter(is_active=True)
         .select_related("owner")
@@ -27,22 +61,31 @@ class CourtViewSet(viewsets.ModelViewSet):
     )
     filterset_class = CourtFilter
     filter_backends = [
+        DjangoFilterBackend,
         filters.SearchFilter,
-        filters.OrderingFilter,
+        CourtOrderingFilter,
     ]
     search_fields = ["name", "description", "city", "location", "sport_type"]
     ordering_fields = ["price_per_hour", "created_at"]
     ordering = ["-created_at"]
+    keyset_pagination_class = CourtKeysetPagination
+    # list pages are served from values() rows (common/rows.py)
+    row_serializer_class = CourtListRowSerializer
 
     def get_permissions(self):
-        if self.action in ["list", "retrieve", "available_slots"]:
+        if self.action in [
+            "list",
+            "retrieve",
+            "available_slots",
+            "batch_available_slots",
+        ]:
             return [IsAuthenticatedOrReadOnly()]
         if self.action == "create":
             # Only users with owner role can create courts
             return [permissions.IsAuthenticated(), IsOwnerRole()]
         if self.action in ["update", "partial_update", "destroy"]:
             # Must be the court's owner or admin
-            return [permissions.IsAuthenticated(), IsCourtObjectOwner() | IsAdmin()]
+            return [permissions.IsAuthenticated(), (IsCourtObjectOwner | IsAdmin)()]
         return [permissions.IsAuthenticated()]
 
     def get_queryset(self):
@@ -51,12 +94,32 @@ class CourtViewSet(viewsets.ModelViewSet):
         if user.is_authenticated and (
             user.is_staff or getattr(user, "role", "") == "admin"
         ):
-            return (
+            queryset = (
                 Court.objects.all()
                 .select_related("owner")
                 .prefetch_related("images", "availabilities")
             )
-        return super().get_queryset()
+        else:
+            queryset = super().get_queryset()
+        if self.action in ("list", "available_slots"):
+            # list rows read the denormalized cover only, and
+            # available_slots queries windows/bookings itself
+            queryset = queryset.prefetch_related(None)
+        return queryset
+
+    def list(self, request, *args, **kwargs):
+        # anonymous browse traffic is served from the listing cache
+        if request.user.is_authenticated:
+            return super().list(request, *args, **kwargs)
+        cache = court_cache.get_cache()
+        key = court_cache.listing_cache_key(request)
+        data = cache.get(key)
+        if data is not None:
+            return response.Response(data)
+        resp = super().list(request, *args, **kwargs)
+        if resp.status_code == status.HTTP_200_OK:
+            cache.set(key, resp.data, court_cache.get_timeout())
+        return resp
 
     def get_serializer_class(self):
         if self.action == "list":
@@ -67,7 +130,11 @@ class CourtViewSet(viewsets.ModelViewSet):
 
     def perform_create(self, serializer):
         # ensure authenticated owner is set as court owner
-        serializer.save(owner=self.request.user)
+        serializer.save(owner=db_user(self.request.user))
+
+    @conditional_on_court
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
 
     @decorators.action(
         detail=True,
@@ -75,6 +142,7 @@ class CourtViewSet(viewsets.ModelViewSet):
         url_path="available-slots",
         permission_classes=[IsAuthenticatedOrReadOnly],
     )
+    @conditional_on_court
     def available_slots(self, request, pk=None):
         court = self.get_object()
         date_str = request.query_params.get("date")
@@ -84,66 +152,125 @@ class CourtViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        booking_date = datetime.strptime(date_str, "%Y-%m-%d").date()
-        weekday_name = booking_date.strftime("%A").lower()
+        try:
+            booking_date = datetime.strptime(date_str, "%Y-%m-%d").date()
+            slot_minutes = parse_slot_minutes(request.query_params.get("slot_size"))
+        except ValueError as exc:
+            return response.Response(
+                {"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST
+            )
 
-        day_avails = court.availabilities.filter(day_of_week=weekday_name).order_by(
-            "start_time"
+        windows = list(
+            court.availabilities.filter(
+                day_of_week=weekday_name(booking_date)
+            ).values_list("start_time", "end_time")
         )
-        if not day_avails.exists():
+        if not windows:
             return response.Response({"date": date_str, "slots": []})
 
-        bookings = Booking.objects.filter(
-            court=court, booking_date=booking_date, status__in=["pending", "confirmed"]
-        ).order_by("start_time")
-
-        def to_dt(t):
-            return datetime.combine(booking_date, t)
-
-        increments = timedelta(minutes=30)
-        free_slots = []
-
-        for av in day_avails:
-            window_start = to_dt(av.start_time)
-            window_end = to_dt(av.end_time)
-
-            busy = []
-            for b in bookings:
-                b_start = to_dt(b.start_time)
-                b_end = to_dt(b.end_time)
-                if b_end <= window_start or b_start >= window_end:
-                    continue
-                busy.append((max(window_start, b_start), min(window_end, b_end)))
-            busy.sort()
-            merged = []
-            for s, e in busy:
-                if not merged or s > merged[-1][1]:
-                    merged.append((s, e))
-                else:
-                    merged[-1] = (merged[-1][0], max(merged[-1][1], e))
-
-            cursor = window_start
-            for s, e in merged:
-                if cursor < s:
-                    free_slots.append((cursor, s))
-                cursor = max(cursor, e)
-            if cursor < window_end:
-                free_slots.append((cursor, window_end))
-
-        discrete = []
-        for s, e in free_slots:
-            cur = s
-            while cur + increments <= e:
-                discrete.append(
-                    {
-                        "start": cur.strftime("%H:%M"),
-                        "end": (cur + increments).strftime("%H:%M"),
-                    }
-                )
-                cur += increments
+        busy = Booking.objects.filter(
+            occupying(), court=court, booking_date=booking_date
+        ).values_list("start_time", "end_time")
+
+        mask = build_day_mask(windows, busy)
+        quote = get_price_table(court).quote(booking_date)
+        return response.Response(
+            {
+                "date": date_str,
+                "slot_size_minutes": slot_minutes,
+                "slots": serialize_slots(mask, slot_minutes, quote),
+            }
+        )
+
+    @decorators.action(
+        detail=False,
+        methods=["get"],
+        url_path="available-slots",
+        permission_classes=[IsAuthenticatedOrReadOnly],
+    )
+    def batch_available_slots(self, request):
+        """
+        Slot grids for several courts over a date range in one response.
+        Query params: courts=1,2,3&start_date=YYYY-MM-DD[&end_date=YYYY-MM-DD]
+        [&slot_size=30]. Always three queries regardless of courts x days.
+        """
+        params = request.query_params
+        if not (params.get("courts") and params.get("start_date")):
+            return response.Response(
+                {"detail": "courts and start_date are required."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        try:
+            court_ids = {int(pk) for pk in params["courts"].split(",") if pk}
+            start_date = datetime.strptime(params["start_date"], "%Y-%m-%d").date()
+            end_date = datetime.strptime(
+                params.get("end_date") or params["start_date"], "%Y-%m-%d"
+            ).date()
+            slot_minutes = parse_slot_minutes(params.get("slot_size"))
+        except ValueError as exc:
+            return response.Response(
+                {"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        num_days = (end_date - start_date).days + 1
+        if num_days < 1:
+            return response.Response(
+                {"detail": "end_date must not be before start_date."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if num_days > MAX_BATCH_DAYS or len(court_ids) > MAX_BATCH_COURTS:
+            return response.Response(
+                {
+                    "detail": f"At most {MAX_BATCH_COURTS} courts and "
+                    f"{MAX_BATCH_DAYS} days per request."
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # only courts this user may see (inactive ones are hidden from players)
+        prices = list(
+            self.get_queryset()
+            .prefetch_related(None)
+            .filter(pk__in=court_ids)
+            .values_list(*PRICE_FIELDS)
+        )
+        visible_ids = sorted(row[0] for row in prices)
+        dates = [start_date + timedelta(days=i) for i in range(num_days)]
+
+        windows = CourtAvailability.objects.filter(
+            court_id__in=visible_ids,
+            day_of_week__in={weekday_name(day) for day in dates},
+        ).values_list("court_id", "day_of_week", "start_time", "end_time")
+        busy = Booking.objects.filter(
+            occupying(),
+            court_id__in=visible_ids,
+            booking_date__range=(start_date, end_date),
+        ).values_list("court_id", "booking_date", "start_time", "end_time")
 
+        grids = build_slot_grids(
+            visible_ids,
+            dates,
+            windows,
+            busy,
+            slot_minutes,
+            get_price_tables(prices),
+        )
         return response.Response(
-            {"date": date_str, "slot_size_minutes": 30, "slots": discrete}
+            {
+                "start_date": start_date.isoformat(),
+                "end_date": end_date.isoformat(),
+                "slot_size_minutes": slot_minutes,
+                "courts": [
+                    {
+                        "court": court_id,
+                        "days": [
+                            {"date": day.isoformat(), "slots": slots}
+                            for day, slots in grids[court_id].items()
+                        ],
+                    }
+                    for court_id in visible_ids
+                ],
+            }
         )
 
 
@@ -157,7 +284,7 @@ class CourtImageViewSet(viewsets.ModelViewSet):
         if self.action == "create":
             return [permissions.IsAuthenticated(), IsOwnerRole()]
         # For update/delete: must own the underlying court or be admin
-        return [permissions.IsAuthenticated(), IsCourtObjectOwner() | IsAdmin()]
+        return [permissions.IsAuthenticated(), (IsCourtObjectOwner | IsAdmin)()]
 
     def perform_create(self, serializer):
         court_id = self.request.data.get("court")
@@ -185,7 +312,7 @@ class CourtAvailabilityViewSet(viewsets.ModelViewSet):
         if self.action == "create":
             return [permissions.IsAuthenticated(), IsOwnerRole()]
         # For update/delete: must own the court or be admin
-        return [permissions.IsAuthenticated(), IsCourtObjectOwner() | IsAdmin()]
+        return [permissions.IsAuthenticated(), (IsCourtObjectOwner | IsAdmin)()]
 
     def perform_create(self, serializer):
         court_id = self.request.data.get("court")
@@ -200,3 +327,27 @@ class CourtAvailabilityViewSet(viewsets.ModelViewSet):
 
             raise PermissionDenied("You can only set availability for your own court.")
         serializer.save(court=court)
+
+
+class CourtPriceRuleViewSet(viewsets.ModelViewSet):
+    queryset = CourtPriceRule.objects.select_related("court")
+    serializer_class = CourtPriceRuleSerializer
+
+    def get_permissions(self):
+        if self.action in ["list", "retrieve"]:
+            return [IsAuthenticatedOrReadOnly()]
+        if self.action == "create":
+            return [permissions.IsAuthenticated(), IsOwnerRole()]
+        # For update/delete: must own the court or be admin
+        return [permissions.IsAuthenticated(), (IsCourtObjectOwner | IsAdmin)()]
+
+    def perform_create(self, serializer):
+        court = Court.objects.get(pk=self.request.data.get("court"))
+        if court.owner_id != self.request.user.id and not (
+            self.request.user.is_staff
+            or getattr(self.request.user, "role", "") == "admin"
+        ):
+            from rest_framework.exceptions import PermissionDenied
+
+            raise PermissionDenied("You can only set prices for your own court.")
+        serializer.save(court=court)
@@ -0,0 +1,31 @@
+# gunicorn.conf.py
+# The default is the WSGI app on threaded workers, which serves every endpoint
+# (the DRF viewsets are sync).
+# GUNICORN_APP=asgi:application serves the ASGI app on uvicorn workers instead
+# (one event loop per process; async views such as courts/async_views.py don't
+# hold a thread while waiting). Sync views run there one at a time per worker,
+# so only route the async browse and slot-events paths to such a deployment
+# (the "async" compose profile). Persistent connections don't carry over to
+# ASGI, so run it with DB_POOL=True.
+# With threaded WSGI workers each thread holds its own DB connection, so keep
+# DB_POOL_MAX_SIZE (or Postgres max_connections / workers) >= GUNICORN_THREADS.
+import multiprocessing
+import os
+
+wsgi_app = os.environ.get("GUNICORN_APP", "wsgi:application")
+asgi = wsgi_app.startswith("asgi:")
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:8000")
+cpus = multiprocessing.cpu_count()
+workers = int(
+    os.environ.get("GUNICORN_WORKERS", str(cpus + 1 if asgi else cpus * 2 + 1))
+)
+worker_class = os.environ.get(
+    "GUNICORN_WORKER_CLASS",
+    "uvicorn_worker.UvicornWorker" if asgi else "gthread",
+)
+threads = int(os.environ.get("GUNICORN_THREADS", "4"))
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", "30"))
+# recycle workers periodically to bound memory growth
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", "2000"))
+max_requests_jitter = 200
@@ -0,0 +1,41 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from jobs.queue import DEFAULT_BATCH_SIZE, get_backend
+
+
+class Command(BaseCommand):
+    help = (
+        "Work through queued background jobs. Runs until stopped, polling "
+        "every --interval seconds when the queue is empty; start as many "
+        "workers as needed. --once drains due jobs and exits (e.g. from cron)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help="Jobs claimed at a time.",
+        )
+        parser.add_argument("--interval", type=float, default=1.0)
+        parser.add_argument(
+            "--once", action="store_true", help="Exit when no job is due."
+        )
+
+    def handle(self, *args, **opts):
+        backend = get_backend()
+        total = 0
+        while True:
+            # long-lived process: drop connections the way a request would
+            close_old_connections()
+            ran = backend.run_pending(opts["batch_size"])
+            total += ran
+            if ran:
+                continue
+            if opts["once"]:
+                break
+            time.sleep(opts["interval"])
+        self.stdout.write(f"Ran {total} jobs.")
@@ -0,0 +1,36 @@
+from django.db import models
+from django.db.models import Q
+
+from common.models import BaseModel
+
+
+class Job(BaseModel):
+    STATUS_CHOICES = [
+        ("queued", "Queued"),
+        ("running", "Running"),
+        ("done", "Done"),
+        ("failed", "Failed"),
+    ]
+
+    # registered task name (see jobs.queue.task)
+    name = models.CharField(max_length=200)
+    kwargs = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="queued")
+    run_at = models.DateTimeField()
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=3)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+
+    class Meta:
+        indexes = [
+            # the worker's claim query only ever looks at unfinished jobs
+            models.Index(
+                fields=["run_at"],
+                condition=Q(status__in=["queued", "running"]),
+                name="job_pending_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.name} #{self.pk} ({self.status})"
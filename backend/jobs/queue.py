@@ -0,0 +1,245 @@
+# jobs/queue.py
+"""
+Background jobs for work that should not hold a request worker (image
+renditions, notifications, ...).
+
+Declare a job with ``@task`` in an app's ``tasks.py`` (picked up at start-up)
+and enqueue it with keyword arguments that are JSON-serializable::
+
+    @task(max_attempts=5)
+    def build_thumbnails(image_id): ...
+
+    build_thumbnails.enqueue(image_id=image.pk)
+
+The backend is pluggable (``JOBS_BACKEND``, a dotted path):
+
+* ``DatabaseBackend`` — jobs are rows of ``jobs.Job``, inserted in the
+  caller's transaction (so a rolled-back request never runs its jobs).
+  ``manage.py run_jobs`` workers claim due rows with
+  ``SELECT ... FOR UPDATE SKIP LOCKED``, so any number of workers share the
+  queue without handing out a job twice.
+* ``InMemoryBackend`` — a per-process list, for tests: enqueue after commit,
+  then ``get_backend().run_pending()`` runs whatever is due.
+
+A ``DatabaseBackend`` job that succeeds is deleted, so the table only holds
+outstanding work. A job that raises is retried with exponential backoff
+until it has run ``max_attempts`` times, then left ``failed`` with its
+traceback for inspection. A job whose worker died mid-run is handed out
+again once ``JOBS_LOCK_TIMEOUT`` passes, so tasks must be safe to run more
+than once.
+"""
+
+import logging
+import threading
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ATTEMPTS = 3
+# retry n waits RETRY_BASE_SECONDS * 2 ** (n - 1)
+RETRY_BASE_SECONDS = 30
+DEFAULT_LOCK_TIMEOUT = 15 * 60
+DEFAULT_BATCH_SIZE = 10
+
+_tasks = {}
+
+
+class Task:
+    def __init__(self, func, name, max_attempts):
+        self.func = func
+        self.name = name
+        self.max_attempts = max_attempts
+
+    def __call__(self, **kwargs):
+        return self.func(**kwargs)
+
+    def enqueue(self, run_at=None, **kwargs):
+        """Queue ``func(**kwargs)`` to run at ``run_at`` (default: now)."""
+        return get_backend().enqueue(self, kwargs, run_at or timezone.now())
+
+
+def task(func=None, *, name=None, max_attempts=DEFAULT_MAX_ATTEMPTS):
+    """Register ``func`` as a background task (usable with or without args)."""
+
+    def register(func):
+        registered = Task(
+            func, name or f"{func.__module__}.{func.__qualname__}", max_attempts
+        )
+        _tasks[registered.name] = registered
+        return registered
+
+    return register(func) if func else register
+
+
+def get_task(name):
+    return _tasks[name]
+
+
+def retry_delay(attempts):
+    return timedelta(seconds=RETRY_BASE_SECONDS * 2 ** (attempts - 1))
+
+
+def lock_timeout():
+    return timedelta(
+        seconds=getattr(settings, "JOBS_LOCK_TIMEOUT", DEFAULT_LOCK_TIMEOUT)
+    )
+
+
+def execute(name, kwargs):
+    """Run one job; returns None on success or the formatted traceback."""
+    try:
+        get_task(name)(**kwargs)
+    except Exception:
+        logger.exception("job %s failed", name)
+        return traceback.format_exc()
+    return None
+
+
+class Backend:
+    def enqueue(self, task, kwargs, run_at):
+        raise NotImplementedError
+
+    def run_pending(self, limit=None):
+        """Run due jobs (at most ``limit``); returns the number run."""
+        raise NotImplementedError
+
+
+class DatabaseBackend(Backend):
+    def enqueue(self, task, kwargs, run_at):
+        return Job.objects.create(
+            name=task.name, kwargs=kwargs, run_at=run_at, max_attempts=task.max_attempts
+        )
+
+    def claim(self, limit):
+        """
+        Lock up to ``limit`` due jobs for this worker: queued ones, plus
+        running ones whose worker has not reported back within the lock
+        timeout. Rows other workers are claiming are skipped, not waited on.
+        """
+        now = timezone.now()
+        with transaction.atomic():
+            jobs = list(
+                Job.objects.filter(
+                    Q(status="queued")
+                    | Q(status="running", locked_at__lt=now - lock_timeout()),
+                    run_at__lte=now,
+                )
+                .order_by("run_at")
+                .select_for_update(skip_locked=True)
+                .values_list("pk", "name", "kwargs", "attempts", "max_attempts")[:limit]
+            )
+            Job.objects.filter(pk__in=[job[0] for job in jobs]).update(
+                status="running",
+                locked_at=now,
+                attempts=F("attempts") + 1,
+                updated_at=now,
+            )
+        return [
+            (pk, name, kwargs, attempts + 1, max_attempts)
+            for pk, name, kwargs, attempts, max_attempts in jobs
+        ]
+
+    def finish(self, pk, attempts, max_attempts, error):
+        if error is None:
+            # nothing reads finished jobs, and every write queues a few
+            Job.objects.filter(pk=pk).delete()
+            return
+        now = timezone.now()
+        if attempts < max_attempts:
+            fields = {"status": "queued", "run_at": now + retry_delay(attempts)}
+        else:
+            fields = {"status": "failed"}
+        Job.objects.filter(pk=pk).update(
+            locked_at=None, last_error=error, updated_at=now, **fields
+        )
+
+    def run_pending(self, limit=None):
+        claimed = self.claim(limit or DEFAULT_BATCH_SIZE)
+        for pk, name, kwargs, attempts, max_attempts in claimed:
+            self.finish(pk, attempts, max_attempts, execute(name, kwargs))
+        return len(claimed)
+
+
+class InMemoryBackend(Backend):
+    def __init__(self):
+        self.lock = threading.Lock()
+        # dicts with name, kwargs, run_at, attempts, max_attempts, status, error
+        self.jobs = []
+
+    def enqueue(self, task, kwargs, run_at):
+        job = {
+            "name": task.name,
+            "kwargs": kwargs,
+            "run_at": run_at,
+            "attempts": 0,
+            "max_attempts": task.max_attempts,
+            "status": "queued",
+            "error": "",
+        }
+
+        def add():
+            with self.lock:
+                self.jobs.append(job)
+
+        transaction.on_commit(add)
+        return job
+
+    def run_pending(self, limit=None):
+        now = timezone.now()
+        with self.lock:
+            due = [
+                job
+                for job in self.jobs
+                if job["status"] == "queued" and job["run_at"] <= now
+            ][:limit]
+            for job in due:
+                job["status"] = "running"
+        for job in due:
+            job["attempts"] += 1
+            error = execute(job["name"], job["kwargs"])
+            job["error"] = error or ""
+            if error is None:
+                job["status"] = "done"
+            elif job["attempts"] < job["max_attempts"]:
+                job["status"] = "queued"
+                job["run_at"] = now + retry_delay(job["attempts"])
+            else:
+                job["status"] = "failed"
+        return len(due)
+
+    def clear(self):
+        with self.lock:
+            self.jobs.clear()
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                path = getattr(settings, "JOBS_BACKEND", "jobs.queue.DatabaseBackend")
+                _backend = import_string(path)()
+    return _backend
+
+
+@receiver(setting_changed)
+def reset_backend(setting, **kwargs):
+    # lets tests switch backends with override_settings(JOBS_BACKEND=...)
+    global _backend
+    if setting == "JOBS_BACKEND":
+        _backend = None
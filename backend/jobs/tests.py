@@ -0,0 +1,122 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from .models import Job
+from .queue import RETRY_BASE_SECONDS, get_backend, task
+
+calls = []
+
+
+@task
+def record(value):
+    calls.append(value)
+
+
+@task(max_attempts=2)
+def fail(value):
+    calls.append(value)
+    raise ValueError(f"cannot handle {value}")
+
+
+def later(seconds):
+    return mock.patch(
+        "django.utils.timezone.now",
+        return_value=timezone.now() + timedelta(seconds=seconds),
+    )
+
+
+class InMemoryBackendTests(TestCase):
+    def setUp(self):
+        calls.clear()
+        self.backend = get_backend()
+        self.backend.clear()
+        self.addCleanup(self.backend.clear)
+
+    def enqueue(self, job, **kwargs):
+        with self.captureOnCommitCallbacks(execute=True):
+            return job.enqueue(**kwargs)
+
+    def test_jobs_run_after_commit(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            record.enqueue(value=1)
+            self.assertEqual(self.backend.run_pending(), 0)
+        for callback in callbacks:
+            callback()
+        self.assertEqual(self.backend.run_pending(), 1)
+        self.assertEqual(calls, [1])
+        self.assertEqual(self.backend.jobs[0]["status"], "done")
+
+    def test_delayed_jobs_wait(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            record.enqueue(run_at=timezone.now() + timedelta(minutes=5), value=1)
+        self.assertEqual(self.backend.run_pending(), 0)
+        with later(301):
+            self.assertEqual(self.backend.run_pending(), 1)
+
+    def test_failures_retry_with_backoff_then_fail(self):
+        # failures are logged with their traceback
+        with self.assertLogs("jobs.queue", "ERROR"):
+            job = self.enqueue(fail, value=1)
+            self.assertEqual(self.backend.run_pending(), 1)
+            self.assertEqual((job["status"], job["attempts"]), ("queued", 1))
+            self.assertIn("ValueError: cannot handle 1", job["error"])
+            # not due before the backoff
+            self.assertEqual(self.backend.run_pending(), 0)
+            with later(RETRY_BASE_SECONDS + 1):
+                self.assertEqual(self.backend.run_pending(), 1)
+            self.assertEqual((job["status"], job["attempts"]), ("failed", 2))
+            with later(3600):
+                self.assertEqual(self.backend.run_pending(), 0)
+            self.assertEqual(calls, [1, 1])
+
+    def test_limit(self):
+        for value in range(3):
+            self.enqueue(record, value=value)
+        self.assertEqual(self.backend.run_pending(limit=2), 2)
+        self.assertEqual(self.backend.run_pending(), 1)
+        self.assertEqual(calls, [0, 1, 2])
+
+
+@override_settings(JOBS_BACKEND="jobs.queue.DatabaseBackend", JOBS_LOCK_TIMEOUT=60)
+class DatabaseBackendTests(TestCase):
+    def setUp(self):
+        calls.clear()
+        self.backend = get_backend()
+
+    def test_jobs_are_rows(self):
+        record.enqueue(value=1)
+        job = Job.objects.get()
+        self.assertEqual((job.name, job.kwargs), (record.name, {"value": 1}))
+        self.assertEqual(self.backend.run_pending(), 1)
+        self.assertEqual(calls, [1])
+        # finished jobs do not pile up
+        self.assertFalse(Job.objects.exists())
+
+    def test_failures_retry_with_backoff_then_fail(self):
+        # failures are logged with their traceback
+        with self.assertLogs("jobs.queue", "ERROR"):
+            fail.enqueue(value=1)
+            self.backend.run_pending()
+            job = Job.objects.get()
+            self.assertEqual((job.status, job.attempts), ("queued", 1))
+            self.assertIn("ValueError: cannot handle 1", job.last_error)
+            self.assertGreater(
+                job.run_at, timezone.now() + timedelta(seconds=RETRY_BASE_SECONDS - 5)
+            )
+            self.assertEqual(self.backend.run_pending(), 0)
+            with later(RETRY_BASE_SECONDS + 1):
+                self.assertEqual(self.backend.run_pending(), 1)
+            job.refresh_from_db()
+            self.assertEqual((job.status, job.attempts), ("failed", 2))
+
+    def test_jobs_of_dead_workers_are_handed_out_again(self):
+        record.enqueue(value=1)
+        Job.objects.update(status="running", locked_at=timezone.now(), attempts=1)
+        self.assertEqual(self.backend.run_pending(), 0)
+        with later(61):
+            self.assertEqual(self.backend.run_pending(), 1)
+        self.assertEqual(calls, [1])
+        self.assertFalse(Job.objects.exists())
@@ -38,14 +38,19 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "users",
     "courts",
     "bookings",
     "payments",
     "common",
+    "jobs",
+    "analytics",
 ]
 
 MIDDLEWARE = [
+    "common.middleware.QueryBudgetMiddleware",
+    "common.middleware.CompressionMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -87,21 +92,169 @@ DATABASES = {
         "PASSWORD": os.environ.get("POSTGRES_PASSWORD", "password"),
         "HOST": os.environ.get("POSTGRES_HOST", "localhost"),
         "PORT": os.environ.get("POSTGRES_PORT", "5432"),
+        # reuse connections across requests; checked before reuse
+        "CONN_MAX_AGE": int(os.environ.get("DB_CONN_MAX_AGE", "60")),
+        "CONN_HEALTH_CHECKS": True,
     }
 }
 
+# Native psycopg 3 connection pool (one per worker process). Django requires
+# CONN_MAX_AGE = 0 when the pool is enabled.
+if os.environ.get("DB_POOL", "False") == "True":
+    DATABASES["default"]["CONN_MAX_AGE"] = 0
+    DATABASES["default"]["OPTIONS"] = {
+        "pool": {
+            "min_size": int(os.environ.get("DB_POOL_MIN_SIZE", "2")),
+            "max_size": int(os.environ.get("DB_POOL_MAX_SIZE", "10")),
+            "timeout": int(os.environ.get("DB_POOL_TIMEOUT", "10")),
+        }
+    }
+
+# SQLite instead of PostgreSQL, for running without a database server:
+# SQLITE_PATH is the database file. PostgreSQL-only features (the overlap
+# exclusion constraint, partitions) fall back as documented in their modules.
+if os.environ.get("SQLITE_PATH"):
+    DATABASES["default"] = {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": os.environ["SQLITE_PATH"],
+        "CONN_MAX_AGE": DATABASES["default"]["CONN_MAX_AGE"],
+    }
+
+# Optional read replica. Safe-method requests to views using
+# common.db_routers.ReplicaReadMixin read from it (see DATABASE_ROUTERS).
+# With SQLite, SQLITE_REPLICA_PATH names a second file standing in for the
+# replica (refresh it with a copy of SQLITE_PATH); otherwise
+# POSTGRES_REPLICA_HOST points at a streaming replica of the primary.
+if os.environ.get("SQLITE_PATH") and os.environ.get("SQLITE_REPLICA_PATH"):
+    DATABASES["replica"] = {
+        **DATABASES["default"],
+        "NAME": os.environ["SQLITE_REPLICA_PATH"],
+        "TEST": {"MIRROR": "default"},
+    }
+elif os.environ.get("POSTGRES_REPLICA_HOST"):
+    DATABASES["replica"] = {
+        **DATABASES["default"],
+        "HOST": os.environ["POSTGRES_REPLICA_HOST"],
+        "PORT": os.environ.get("POSTGRES_REPLICA_PORT", DATABASES["default"]["PORT"]),
+        "TEST": {"MIRROR": "default"},
+    }
+
+DATABASE_ROUTERS = ["common.db_routers.ReadReplicaRouter"]
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Per-process LRU by default; set REDIS_URL to share the cache (and its
+# invalidations) across workers.
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "courtconnect",
+        "OPTIONS": {"MAX_ENTRIES": 2000},
+    }
+}
+REDIS_URL = os.environ.get("REDIS_URL", "")
+if REDIS_URL:
+    CACHES["default"] = {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": REDIS_URL,
+    }
+    # token revocations (users/authentication.py), apart from the listing
+    # churn; the Redis server must not evict them (maxmemory-policy
+    # noeviction, or volatile-* with the cached listings elsewhere)
+    CACHES["auth"] = {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": os.environ.get("AUTH_REDIS_URL", REDIS_URL),
+        "KEY_PREFIX": "auth",
+    }
+
+# JWT requests are served from token claims only while revocations are
+# shared between processes; otherwise each one loads its user row
+AUTH_REVOCATION_CACHE_ALIAS = "auth" if REDIS_URL else None
+
+# Checkout holds (bookings/holds.py): seconds a new pending booking keeps its
+# slot before the checkout must confirm it
+BOOKING_HOLD_SECONDS = int(os.environ.get("BOOKING_HOLD_SECONDS", "600"))
+
+# Booking history (bookings/archive.py, bookings/partitions.py): finished
+# bookings older than this many days move to the archive table, and on
+# PostgreSQL this many months of partitions are kept ahead of today
+BOOKING_ARCHIVE_AFTER_DAYS = int(os.environ.get("BOOKING_ARCHIVE_AFTER_DAYS", "90"))
+BOOKING_PARTITION_MONTHS_AHEAD = int(
+    os.environ.get("BOOKING_PARTITION_MONTHS_AHEAD", "12")
+)
+
+# Background jobs (jobs/queue.py), run by `manage.py run_jobs` workers. A job
+# still marked running after JOBS_LOCK_TIMEOUT seconds is handed out again.
+JOBS_BACKEND = "jobs.queue.DatabaseBackend"
+JOBS_LOCK_TIMEOUT = int(os.environ.get("JOBS_LOCK_TIMEOUT", "900"))
+
+# Slot push channel (courts/realtime.py); the in-memory broker only reaches
+# subscribers on the same worker process, so without REDIS_URL the
+# slot-events stream answers 503 unless SLOT_EVENTS_ALLOW_LOCAL_BROKER is set
+SLOT_EVENTS_BROKER = (
+    "courts.realtime.RedisBroker" if REDIS_URL else "courts.realtime.InMemoryBroker"
+)
+SLOT_EVENTS_ALLOW_LOCAL_BROKER = (
+    os.environ.get("SLOT_EVENTS_ALLOW_LOCAL_BROKER", str(DEBUG)) == "True"
+)
+
+# Anonymous court listing cache (courts/cache.py)
+COURT_LIST_CACHE_ALIAS = "default"
+COURT_LIST_CACHE_TIMEOUT = int(os.environ.get("COURT_LIST_CACHE_TIMEOUT", "60"))
+
+# Days of free time kept in the court availability index
+# (courts/availability_index.py)
+AVAILABILITY_INDEX_DAYS = int(os.environ.get("AVAILABILITY_INDEX_DAYS", "60"))
+
+# Per-request query accounting (common/middleware.py). Budgets are keyed by URL
+# name for GET/HEAD, or by "METHOD url-name" for other methods; set
+# QUERY_BUDGET_STRICT=True in CI to turn overruns into errors.
+QUERY_BUDGET_STRICT = os.environ.get("QUERY_BUDGET_STRICT", "False") == "True"
+QUERY_STATS_HEADERS = DEBUG
+# (with a revocation cache, JWT requests build the user from token claims,
+# without a query; see users/authentication.py; detail and slot responses
+# spend one on their ETag, see courts/cache.py)
+QUERY_BUDGETS = {
+    "court-list": 3,
+    "court-detail": 4,
+    "court-available-slots": 5,
+    "court-batch-available-slots": 4,
+    "court-browse": 3,
+    "court-browse-detail": 4,
+    "court-browse-available-slots": 5,
+    "booking-list": 2,
+    "booking-archived": 2,
+    # rollups and the availability index are refreshed by jobs; the request
+    # only inserts them (analytics/signals.py, courts/signals.py)
+    "POST booking-list": 12,
+    "court-analytics-summary": 1,
+    "court-analytics-daily": 1,
+    "court-analytics-hourly": 1,
+}
+
+# Seconds a process trusts its last look at a user's token revocation
+# (users/authentication.py)
+AUTH_REVOCATION_CHECK_SECONDS = int(
+    os.environ.get("AUTH_REVOCATION_CHECK_SECONDS", "5")
+)
+
 REST_FRAMEWORK = {
     "DEFAULT_PERMISSION_CLASSES": [
         "users.permissions.IsAuthenticatedOrReadOnly",
     ],
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "users.authentication.StatelessJWTAuthentication",
     ),
     "DEFAULT_FILTER_BACKENDS": [
         "django_filters.rest_framework.DjangoFilterBackend",
         "rest_framework.filters.SearchFilter",
         "rest_framework.filters.OrderingFilter",
     ],
+    "DEFAULT_RENDERER_CLASSES": [
+        "common.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
     "PAGE_SIZE": 12,  # tweak as you like
 }
@@ -0,0 +1,56 @@
+"""
+Settings for the test suite, run from this directory with
+``python manage.py test -t . --settings=test_settings``.
+
+Tests run on SQLite by default. Set TEST_POSTGRES=True (with the usual
+POSTGRES_* variables) to run them on PostgreSQL, which also runs the
+PostgreSQL-only tests (booking partitions).
+"""
+
+import os
+import tempfile
+
+from settings import *  # noqa: F401,F403
+from settings import DATABASES, INSTALLED_APPS
+
+SECRET_KEY = "test-secret-key-not-for-production-use"
+DEBUG = False
+ALLOWED_HOSTS = ["testserver"]
+
+# The read replica is a database of its own rather than a test mirror, so a
+# read that reaches it only sees the rows a test put there (see the replica
+# routing tests in courts/tests.py).
+if os.environ.get("TEST_POSTGRES", "False") == "True":
+    DATABASES["replica"] = {
+        **DATABASES["default"],
+        "TEST": {"NAME": f"test_{DATABASES['default']['NAME']}_replica"},
+    }
+else:
+    for alias, name in [("default", "test"), ("replica", "test-replica")]:
+        DATABASES[alias] = {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": os.path.join(tempfile.gettempdir(), f"courtconnect-{name}.sqlite3"),
+        }
+
+# roles (player/owner/admin) live on users.User
+AUTH_USER_MODEL = "users.User"
+
+# the local apps ship no migration files, so every table is built from the
+# models in one pass (users.User's foreign keys need auth's tables alongside)
+MIGRATION_MODULES = {app.rsplit(".", 1)[-1]: None for app in INSTALLED_APPS}
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "courtconnect-test",
+    }
+}
+# one process: the local cache is shared by every request
+AUTH_REVOCATION_CACHE_ALIAS = "default"
+SLOT_EVENTS_BROKER = "courts.realtime.InMemoryBroker"
+# a single test process sees every publish
+SLOT_EVENTS_ALLOW_LOCAL_BROKER = True
+JOBS_BACKEND = "jobs.queue.InMemoryBackend"
+
+MEDIA_ROOT = os.path.join(tempfile.gettempdir(), "courtconnect-test-media")
+PASSWORD_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
@@ -24,6 +24,7 @@ urlpatterns = [
     path("api/users/", include("users.urls")),  # users app
     path("api/courts/", include("courts.urls")),  # courts app
     path("api/bookings/", include("bookings.urls")),  # bookings app
+    path("api/analytics/", include("analytics.urls")),  # owner dashboards
 ]
 # Note: Ensure that the 'payments' app is included if it has URLs defined.
 # If you have a payments app, you can add it similarly:
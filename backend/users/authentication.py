@@ -0,0 +1,135 @@
+# users/authentication.py
+"""
+Stateless JWT authentication.
+
+Access tokens carry ``role`` and ``is_staff`` (see
+``CustomTokenObtainPairSerializer``), so the request user is built from the
+claims (``ClaimsUser``) instead of loading the ``User`` row on every request.
+Everything that only needs ``id``/``pk``, ``role`` or ``is_staff`` — the role
+permissions and the role-scoped querysets — works on it unchanged; write
+paths that need a real row call ``db_user()``.
+
+Claims are fixed when a user logs in (refreshed access tokens copy them), so
+deactivating a user or changing their role, staff flag or password records a
+revocation (``revoke_tokens``, wired to ``User`` saves in users.signals):
+tokens issued up to that moment are rejected, and the user logs in again to
+get fresh claims. Revocations are kept for the refresh token lifetime in the
+``AUTH_REVOCATION_CACHE_ALIAS`` cache, which every process must share and
+which must not evict them (settings.py points it at Redis when ``REDIS_URL``
+is set). Each process re-checks a user's revocation at most every
+``AUTH_REVOCATION_CHECK_SECONDS``.
+
+Without that cache, a revocation recorded by one process would not reach
+the others, so requests fail closed: every one loads its user from the
+database, as do tokens issued before the claims were added.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+
+REVOKED_KEY = "users:revoked:{}"
+USER_CLAIMS = {"role", "is_staff"}
+DEFAULT_REVOCATION_CHECK_SECONDS = 5
+# users whose revocation status one process remembers
+REVOCATION_MEMO_SIZE = 10_000
+
+_memo = OrderedDict()
+_memo_lock = threading.Lock()
+
+
+class ClaimsUser(TokenUser):
+    """Request user backed by validated token claims; no database row."""
+
+    # TokenUser returns the claim as is, which may be a string; compared with
+    # owner_id/user_id columns it has to be the integer primary key
+    @cached_property
+    def id(self):
+        return int(self.token[api_settings.USER_ID_CLAIM])
+
+    @cached_property
+    def pk(self):
+        return self.id
+
+    @cached_property
+    def role(self):
+        return self.token.get("role", "")
+
+
+def db_user(user):
+    """The ``User`` row behind ``user`` (a ClaimsUser or already a model)."""
+    if isinstance(user, TokenUser):
+        return get_user_model().objects.get(pk=user.pk)
+    return user
+
+
+def check_interval():
+    return getattr(
+        settings, "AUTH_REVOCATION_CHECK_SECONDS", DEFAULT_REVOCATION_CHECK_SECONDS
+    )
+
+
+def revocation_cache():
+    """The shared revocation cache, or None when claims must not be trusted."""
+    alias = getattr(settings, "AUTH_REVOCATION_CACHE_ALIAS", None)
+    return caches[alias] if alias else None
+
+
+def revoke_tokens(user_id):
+    """Reject every token issued to ``user_id`` until now."""
+    cache = revocation_cache()
+    if cache is None:
+        # requests load the user row, which already reflects the change
+        return
+    cache.set(
+        REVOKED_KEY.format(user_id),
+        time.time(),
+        api_settings.REFRESH_TOKEN_LIFETIME.total_seconds(),
+    )
+    with _memo_lock:
+        _memo.pop(str(user_id), None)
+
+
+def revoked_at(user_id):
+    """When ``user_id``'s tokens were last revoked (epoch seconds), or None."""
+    # the user id claim may be a string
+    user_id = str(user_id)
+    now = time.monotonic()
+    with _memo_lock:
+        hit = _memo.get(user_id)
+    if hit is not None and now - hit[0] < check_interval():
+        return hit[1]
+    value = revocation_cache().get(REVOKED_KEY.format(user_id))
+    with _memo_lock:
+        _memo[user_id] = (now, value)
+        _memo.move_to_end(user_id)
+        if len(_memo) > REVOCATION_MEMO_SIZE:
+            _memo.popitem(last=False)
+    return value
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    def get_user(self, validated_token):
+        if revocation_cache() is None or not USER_CLAIMS.issubset(
+            validated_token.payload
+        ):
+            return super().get_user(validated_token)
+        user = ClaimsUser(validated_token)
+        revoked = revoked_at(user.id)
+        # iat has whole-second precision: a token from the same second is
+        # treated as revoked
+        if revoked is not None and validated_token.get("iat", 0) <= revoked:
+            raise AuthenticationFailed(
+                _("Token has been revoked."), code="token_revoked"
+            )
+        return user
@@ -0,0 +1,44 @@
+# users/signals.py
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from .authentication import revoke_tokens
+
+User = get_user_model()
+
+# fields baked into tokens, or that must end existing sessions when changed
+TOKEN_FIELDS = ("role", "is_staff", "is_active", "password")
+
+
+def token_state(instance):
+    return tuple(getattr(instance, field, None) for field in TOKEN_FIELDS)
+
+
+@receiver(post_init, sender=User)
+def remember_token_state(sender, instance, **kwargs):
+    instance._token_state = token_state(instance)
+
+
+def rehashed(instance, update_fields):
+    # check_password() upgrading the stored hash of the password just checked
+    # (it clears _password before saving; set_password() leaves it set)
+    return instance._password is None and update_fields == frozenset({"password"})
+
+
+@receiver(post_save, sender=User)
+def revoke_stale_tokens(sender, instance, created, update_fields=None, **kwargs):
+    state = token_state(instance)
+    if rehashed(instance, update_fields):
+        # same password: keep the tokens, including the one being issued
+        instance._token_state = state
+        return
+    if not created and state != instance._token_state:
+        transaction.on_commit(lambda: revoke_tokens(instance.pk))
+    instance._token_state = state
+
+
+@receiver(post_delete, sender=User)
+def revoke_deleted_user_tokens(sender, instance, **kwargs):
+    transaction.on_commit(lambda: revoke_tokens(instance.pk))
@@ -1,3 +1,78 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import MD5PasswordHasher
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from courts.tests import login, make_court
+
+from . import authentication
+
+User = get_user_model()
+
+
+class TokenRevocationTests(TestCase):
+    def setUp(self):
+        # revocations outlive the test database's user ids
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.addCleanup(authentication._memo.clear)
+        self.court = make_court(is_active=False)
+        self.admin = User.objects.create_user(
+            username="admin", password="secret", role="admin"
+        )
+        login(self.client, self.admin)
+
+    def listed(self):
+        response = self.client.get(reverse("court-list"))
+        self.assertEqual(response.status_code, 200)
+        return len(response.json()["results"])
+
+    def demote(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.admin.role = "player"
+            self.admin.save()
+
+    def test_claims_are_trusted_until_revoked(self):
+        self.assertEqual(self.listed(), 1)
+        User.objects.filter(pk=self.admin.pk).update(role="player")
+        # no save signal, so the token's claims still stand
+        self.assertEqual(self.listed(), 1)
+        self.demote()
+        response = self.client.get(reverse("court-list"))
+        self.assertEqual(response.status_code, 401)
+
+    @override_settings(AUTH_REVOCATION_CACHE_ALIAS=None)
+    def test_without_a_revocation_cache_users_are_loaded(self):
+        self.assertEqual(self.listed(), 1)
+        User.objects.filter(pk=self.admin.pk).update(role="player")
+        self.assertEqual(self.listed(), 0)
+        User.objects.filter(pk=self.admin.pk).update(is_active=False)
+        response = self.client.get(reverse("court-list"))
+        self.assertEqual(response.status_code, 401)
+
+    def log_in(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse("login"), {"username": "admin", "password": "secret"}
+            )
+        self.assertEqual(response.status_code, 200)
+        self.client.defaults["HTTP_AUTHORIZATION"] = f"Bearer {response.data['access']}"
+
+    def test_upgrading_the_password_hash_keeps_tokens(self):
+        old_hash = self.admin.password
+        with mock.patch.object(MD5PasswordHasher, "must_update", return_value=True):
+            self.log_in()
+        self.admin.refresh_from_db()
+        self.assertNotEqual(self.admin.password, old_hash)
+        self.assertEqual(self.listed(), 1)
+
+    def test_changing_the_password_revokes_tokens(self):
+        self.log_in()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.admin.set_password("changed")
+            self.admin.save()
+        response = self.client.get(reverse("court-list"))
+        self.assertEqual(response.status_code, 401)
@@ -7,12 +7,13 @@ from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 User = get_user_model()
 
 
-# JWT Custom Token Serializer (adds role to token)
+# JWT Custom Token Serializer (adds the claims users.authentication reads)
 class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
     @classmethod
     def get_token(cls, user):
         token = super().get_token(user)
         token["role"] = user.role
+        token["is_staff"] = user.is_staff
         return token
 
 